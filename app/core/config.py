@@ -9,6 +9,19 @@ class Settings:
         self.app_env = os.getenv("APP_ENV", "local")
         self.database_url = os.getenv("DATABASE_URL", "sqlite+pysqlite:///./buildit.db")
         self.cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
+        self.run_workers = int(os.getenv("RUN_WORKERS", "2"))
+        self.pareto_workers = int(os.getenv("PARETO_WORKERS", str(os.cpu_count() or 1)))
+        self.run_cache_size = int(os.getenv("RUN_CACHE_SIZE", "256"))
+        # Queued/running runs whose owning process stops renewing for this long are failed.
+        self.run_lease_s = float(os.getenv("RUN_LEASE_S", "60"))
+        self.run_event_retention_s = float(os.getenv("RUN_EVENT_RETENTION_S", "600"))
+        self.rule_index_ttl_s = float(os.getenv("RULE_INDEX_TTL_S", "300"))
+        self.solar_storage = os.getenv("SOLAR_STORAGE", "columnar")
+        self.result_cache_enabled = os.getenv("RESULT_CACHE_ENABLED", "true").lower() in {"1", "true", "yes"}
+        # Admin-only: allows ?profile=true on evaluate and serves /api/debug profiles.
+        self.profiling_enabled = os.getenv("PROFILING_ENABLED", "false").lower() in {"1", "true", "yes"}
+        # Records tracemalloc peak/retained bytes per stage in runtime_profile; slows every run.
+        self.memory_profiling = os.getenv("MEMORY_PROFILING", "false").lower() in {"1", "true", "yes"}
 
 
 settings = Settings()
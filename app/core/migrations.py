@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from sqlalchemy import Engine, inspect, text
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+from app.core.database import Base
+
+# Columns added to tables that existing databases already have. create_all only creates
+# missing tables, so these are added with ALTER TABLE on every backend, SQLite included;
+# db/schema.sql carries the same changes for Postgres.
+ADDED_COLUMNS: list[tuple[str, str]] = [
+    ("project_rule_snapshots", "content_hash"),
+    ("option_meshes", "coarse_payload"),
+    ("design_runs", "owner_id"),
+    ("design_runs", "lease_expires_at"),
+]
+
+
+def _missing_columns(engine: Engine) -> dict[str, list[str]]:
+    inspector = inspect(engine)
+    missing: dict[str, list[str]] = {}
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        names = [column.name for column in table.columns if column.name not in existing]
+        if names:
+            missing[table.name] = names
+    return missing
+
+
+def init_schema(engine: Engine) -> list[str]:
+    Base.metadata.create_all(bind=engine)
+    missing = _missing_columns(engine)
+    applied: list[str] = []
+    with engine.begin() as conn:
+        for table_name, column_name in ADDED_COLUMNS:
+            if column_name not in missing.get(table_name, []):
+                continue
+            column = Base.metadata.tables[table_name].c[column_name]
+            ddl_type = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl_type}"))
+            # SQLite cannot add a UNIQUE column, so uniqueness comes from an index.
+            if column.unique:
+                conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table_name}_{column_name} ON {table_name} ({column_name})"))
+            applied.append(f"{table_name}.{column_name}")
+
+    unresolved = _missing_columns(engine)
+    if unresolved:
+        detail = ", ".join(f"{table}({', '.join(names)})" for table, names in sorted(unresolved.items()))
+        raise RuntimeError(f"database schema is out of date, missing columns: {detail}; apply db/schema.sql or recreate the database")
+    return applied
@@ -2,13 +2,22 @@ from __future__ import annotations
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import settings
-from app.core.database import Base, engine
+from app.core.database import SessionLocal, engine
+from app.core.metrics import EXPOSITION_MEDIA_TYPE, metrics
+from app.core.migrations import init_schema
+from app.routers.debug import router as debug_router
 from app.routers.projects import router as projects_router
 from app.routers.rules import router as rules_router
 from app.routers.runs import router as runs_router
 from app.routers.users import router as users_router
+from app.services.orchestrator import fail_interrupted_runs, renew_run_leases
+from app.services.pareto import pareto_pool
+from app.services.run_lease import run_lease_keeper
+from app.services.run_queue import run_queue
+from app.services.solar import SOLAR_STORAGE_MODES
 
 app = FastAPI(title="buildit", version="0.2.0")
 
@@ -21,9 +30,29 @@ app.add_middleware(
 )
 
 
+def maintain_run_leases() -> None:
+    db = SessionLocal()
+    try:
+        renew_run_leases(db)
+        fail_interrupted_runs(db)
+    finally:
+        db.close()
+
+
 @app.on_event("startup")
 def startup() -> None:
-    Base.metadata.create_all(bind=engine)
+    if settings.solar_storage not in SOLAR_STORAGE_MODES:
+        raise RuntimeError(f"unsupported SOLAR_STORAGE '{settings.solar_storage}' (expected one of {', '.join(sorted(SOLAR_STORAGE_MODES))})")
+    init_schema(engine)
+    maintain_run_leases()
+    run_lease_keeper.start(maintain_run_leases)
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    run_lease_keeper.stop()
+    run_queue.shutdown(wait=False)
+    pareto_pool.shutdown(wait=False)
 
 
 @app.get("/health")
@@ -31,7 +60,13 @@ def health() -> dict[str, str]:
     return {"status": "ok", "env": settings.app_env}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type=EXPOSITION_MEDIA_TYPE)
+
+
 app.include_router(users_router, prefix="/api")
 app.include_router(rules_router, prefix="/api")
 app.include_router(projects_router, prefix="/api")
 app.include_router(runs_router, prefix="/api")
+app.include_router(debug_router, prefix="/api")
@@ -5,7 +5,7 @@ from enum import Enum
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import JSON, Date, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import JSON, Date, DateTime, Float, ForeignKey, Integer, LargeBinary, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -135,6 +135,7 @@ class ProjectRuleSnapshot(Base):
     evaluation_date: Mapped[date] = mapped_column(Date, nullable=False)
     frozen_rule_set_ids: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
     frozen_rule_definition_ids: Mapped[list[str]] = mapped_column(JSON, nullable=False, default=list)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, unique=True, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     project: Mapped["Project"] = relationship(back_populates="snapshots")
@@ -152,6 +153,8 @@ class DesignRun(Base):
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    owner_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     project: Mapped["Project"] = relationship(back_populates="runs")
     snapshot: Mapped["ProjectRuleSnapshot"] = relationship(back_populates="runs")
@@ -173,6 +176,8 @@ class DesignOption(Base):
 
     run: Mapped["DesignRun"] = relationship(back_populates="options")
     solar_results: Mapped[list["SolarResult"]] = relationship(back_populates="option", cascade="all, delete-orphan")
+    solar_series: Mapped[Optional["SolarSeries"]] = relationship(back_populates="option", cascade="all, delete-orphan")
+    packed_mesh: Mapped[Optional["OptionMesh"]] = relationship(back_populates="option", cascade="all, delete-orphan")
 
 
 class SolarResult(Base):
@@ -187,3 +192,45 @@ class SolarResult(Base):
     shadow_ratio: Mapped[float] = mapped_column(Float, nullable=False)
 
     option: Mapped["DesignOption"] = relationship(back_populates="solar_results")
+
+
+class SolarSeries(Base):
+    __tablename__ = "solar_series"
+
+    option_id: Mapped[str] = mapped_column(String, ForeignKey("design_options.id"), primary_key=True)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    option: Mapped["DesignOption"] = relationship(back_populates="solar_series")
+
+
+class OptionMesh(Base):
+    __tablename__ = "option_meshes"
+
+    option_id: Mapped[str] = mapped_column(String, ForeignKey("design_options.id"), primary_key=True)
+    box_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Only written by older versions; coarse meshes are now derived from payload on read.
+    coarse_payload: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+
+    option: Mapped["DesignOption"] = relationship(back_populates="packed_mesh")
+
+
+class RunProfile(Base):
+    __tablename__ = "run_profiles"
+
+    run_id: Mapped[str] = mapped_column(String, ForeignKey("design_runs.id"), primary_key=True)
+    wall_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    top_functions: Mapped[list] = mapped_column(JSON, nullable=False)
+    stats: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class OptimizerResult(Base):
+    __tablename__ = "optimizer_results"
+
+    cache_key: Mapped[str] = mapped_column(String, primary_key=True)
+    engine_version: Mapped[str] = mapped_column(String, nullable=False)
+    options: Mapped[list] = mapped_column(JSON, nullable=False)
+    optimizer_profile: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
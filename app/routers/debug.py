@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models import RunProfile
+from app.schemas import RunProfileRead
+from app.services.orchestrator import get_run_profile
+
+
+def require_profiling() -> None:
+    # Hidden entirely unless an admin turned profiling on for this deployment.
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(prefix="/debug", tags=["debug"], dependencies=[Depends(require_profiling)])
+
+
+def _load_profile(db: Session, run_id: str) -> RunProfile:
+    profile = get_run_profile(db, run_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/runs/{run_id}/profile", response_model=RunProfileRead)
+def run_profile_endpoint(run_id: str, db: Session = Depends(get_db)) -> RunProfileRead:
+    return RunProfileRead.model_validate(_load_profile(db, run_id), from_attributes=True)
+
+
+@router.get("/runs/{run_id}/profile.pstats")
+def run_profile_stats_endpoint(run_id: str, db: Session = Depends(get_db)) -> Response:
+    profile = _load_profile(db, run_id)
+    return Response(
+        content=profile.stats,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="run-{run_id}.pstats"'},
+    )
@@ -1,33 +1,113 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.models import RunStatus
 from app.schemas import EvaluateRequest, RunRead
-from app.services.orchestrator import get_project, get_run_response, run_evaluation
+from app.services.mesh_codec import MESH_MEDIA_TYPE
+from app.services.orchestrator import (
+    execute_queued_run,
+    get_option_mesh,
+    get_project,
+    get_run,
+    get_run_json,
+    get_run_meshes,
+    get_run_response,
+    iter_batch_results,
+    queue_batch_evaluation,
+    queue_evaluation,
+    submit_batch_runs,
+)
+from app.services.run_events import run_event_stream
+from app.services.run_json import JSON_MEDIA_TYPE
+from app.services.run_queue import run_queue
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 
-@router.post("/projects/{project_id}/evaluate", response_model=RunRead)
-def evaluate_project_endpoint(project_id: str, payload: EvaluateRequest, db: Session = Depends(get_db)) -> RunRead:
+@router.post("/projects/{project_id}/evaluate", response_model=RunRead, status_code=202)
+def evaluate_project_endpoint(project_id: str, payload: EvaluateRequest, profile: bool = False, db: Session = Depends(get_db)) -> RunRead:
+    if profile and not settings.profiling_enabled:
+        raise HTTPException(status_code=403, detail="Profiling is disabled")
     project = get_project(db, project_id)
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     try:
-        run = run_evaluation(db, project=project, payload=payload)
+        run, stage_ms = queue_evaluation(db, project=project, payload=payload)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     response = get_run_response(db, run.id)
     if response is None:
         raise HTTPException(status_code=500, detail="Run created but not found")
+    run_queue.submit(execute_queued_run, run.id, payload, stage_ms, profile=profile)
     return response
 
 
+@router.post("/projects/{project_id}/evaluate-batch")
+def evaluate_batch_endpoint(project_id: str, payload: list[EvaluateRequest], db: Session = Depends(get_db)) -> StreamingResponse:
+    project = get_project(db, project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not payload:
+        raise HTTPException(status_code=400, detail="At least one scenario is required")
+    scenarios = queue_batch_evaluation(db, project=project, payloads=payload)
+    # Runs are submitted before streaming starts, so they finish even if the client disconnects.
+    futures = submit_batch_runs(scenarios, run_queue.submit)
+    lines = (item.model_dump_json() + "\n" for item in iter_batch_results(scenarios, futures))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
 @router.get("/{run_id}", response_model=RunRead)
-def get_run_endpoint(run_id: str, db: Session = Depends(get_db)) -> RunRead:
-    response = get_run_response(db, run_id)
-    if response is None:
+def get_run_endpoint(run_id: str, include_mesh: bool = False, db: Session = Depends(get_db)) -> Response:
+    # Encoded directly from the stored rows; RunRead documents the shape. Meshes are served
+    # packed by the /mesh endpoints, so the JSON mesh_payload is opt-in.
+    document = get_run_json(db, run_id, include_mesh=include_mesh)
+    if document is None:
         raise HTTPException(status_code=404, detail="Run not found")
-    return response
+    return Response(content=document, media_type=JSON_MEDIA_TYPE)
+
+
+@router.get("/{run_id}/events")
+def run_events_endpoint(run_id: str, last_event_id: Optional[int] = Header(default=None), db: Session = Depends(get_db)) -> StreamingResponse:
+    run = get_run(db, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return StreamingResponse(
+        run_event_stream(run_id, status=run.status, after=last_event_id or 0),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{run_id}/meshes")
+def run_meshes_endpoint(run_id: str, lod: str = "coarse", db: Session = Depends(get_db)) -> Response:
+    run = get_run(db, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    try:
+        payload = get_run_meshes(db, run_id, lod)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    # A run's options are only final once it stops running.
+    cache_control = "no-cache" if run.status in {RunStatus.QUEUED.value, RunStatus.RUNNING.value} else IMMUTABLE_CACHE_CONTROL
+    return Response(content=payload, media_type=MESH_MEDIA_TYPE, headers={"Cache-Control": cache_control})
+
+
+@router.get("/options/{option_id}/mesh")
+def option_mesh_endpoint(option_id: str, lod: str = "fine", db: Session = Depends(get_db)) -> Response:
+    try:
+        payload = get_option_mesh(db, option_id, lod)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Option not found")
+    # Options are never rewritten once stored.
+    return Response(content=payload, media_type=MESH_MEDIA_TYPE, headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Any, Optional
+from typing import Annotated, Any, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 
+SearchMode = Literal["preset", "grid", "pareto"]
+SolarMode = Literal["hours", "dates", "seasonal", "annual"]
+
+
 class UserCreate(BaseModel):
     email: str
     name: Optional[str] = None
@@ -95,7 +99,11 @@ class EvaluateRequest(BaseModel):
     evaluation_date: date
     category: str = "zoning"
     objective: str = "maximize_far"
-    hours: list[int] = Field(default_factory=lambda: [9, 12, 15])
+    # Checked here rather than in solar_columns so bad hours get a 422 before the run is queued.
+    hours: list[Annotated[float, Field(ge=0, lt=24)]] = Field(default_factory=lambda: [9, 12, 15], min_length=1)
+    search_mode: SearchMode = "preset"
+    solar_mode: SolarMode = "hours"
+    solar_dates: list[date] = Field(default_factory=list)
 
 
 class ConstraintCheck(BaseModel):
@@ -112,7 +120,8 @@ class DesignOptionRead(BaseModel):
     score: float
     parameters: dict[str, Any]
     checks: list[ConstraintCheck]
-    mesh_payload: dict[str, Any]
+    # Only with include_mesh; viewers read the packed /mesh endpoints instead.
+    mesh_payload: Optional[dict[str, Any]] = None
 
 
 class SolarPoint(BaseModel):
@@ -134,3 +143,26 @@ class RunRead(BaseModel):
     error_message: Optional[str]
     options: list[DesignOptionRead] = Field(default_factory=list)
     solar: dict[str, list[SolarPoint]] = Field(default_factory=dict)
+
+
+class ProfiledFunction(BaseModel):
+    function: str
+    file: str
+    line: int
+    calls: int
+    primitive_calls: int
+    self_ms: float
+    cumulative_ms: float
+
+
+class RunProfileRead(BaseModel):
+    run_id: str
+    wall_ms: float
+    created_at: datetime
+    top_functions: list[ProfiledFunction]
+
+
+class BatchRunResult(BaseModel):
+    scenario: int
+    run: Optional[RunRead] = None
+    error: Optional[str] = None
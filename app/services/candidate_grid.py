@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any
+
+import numpy as np
+
+RESIDENTIAL_PARAMETER_AXES: dict[str, tuple[float, float, int]] = {
+    "far_factor": (0.8, 1.0, 9),
+    "height_factor": (0.6, 1.0, 9),
+    "base_floorplate": (440.0, 880.0, 12),
+    "slenderness": (1.2, 2.6, 8),
+    "spacing_factor": (1.0, 1.5, 6),
+}
+
+# Plan families are derived from slenderness so the grid spans the same archetypes
+# as the preset variants (tower 1.35, hybrid 1.75, plate 2.25).
+PLAN_FAMILIES = ("tower", "hybrid", "plate")
+PLAN_OPTION_TYPES = ("apartment_tower_cluster", "apartment_hybrid_cluster", "apartment_linear_cluster")
+PLAN_ARTICULATION = np.array([88.0, 90.0, 81.0])
+PLAN_SKYLINE_HARMONY = np.array([86.0, 76.0, 82.0])
+SLENDERNESS_BREAKS = np.array([1.55, 2.0])
+
+FLOOR_TO_FLOOR_M = 3.1
+
+
+@dataclass
+class AestheticContext:
+    has_landmark_bias: bool
+    has_context_bias: bool
+    reference_count: int
+    input_count: int
+    mean_weight: float
+
+
+def aesthetic_context(aesthetic_inputs: list[Any]) -> AestheticContext:
+    all_text = " ".join(item.content.lower() for item in aesthetic_inputs)
+    return AestheticContext(
+        has_landmark_bias=any(token in all_text for token in ["랜드마크", "iconic", "상징"]),
+        has_context_bias=any(token in all_text for token in ["맥락", "조화", "context", "street"]),
+        reference_count=sum(1 for item in aesthetic_inputs if item.reference_url),
+        input_count=len(aesthetic_inputs),
+        mean_weight=sum(item.weight for item in aesthetic_inputs) / max(len(aesthetic_inputs), 1),
+    )
+
+
+@dataclass
+class CandidateColumns:
+    far_factor: np.ndarray
+    height_factor: np.ndarray
+    base_floorplate: np.ndarray
+    slenderness: np.ndarray
+    spacing_factor: np.ndarray
+    plan_code: np.ndarray
+    far: np.ndarray
+    height: np.ndarray
+    coverage: np.ndarray
+    open_space_ratio: np.ndarray
+    sky_exposure: np.ndarray
+    articulation_index: np.ndarray
+    block_count: np.ndarray
+    floorplate_area_m2: np.ndarray
+    floors: np.ndarray
+    building_spacing_m: np.ndarray
+    max_block_length_m: np.ndarray
+    footprint_width_m: np.ndarray
+    footprint_depth_m: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.far.shape[0])
+
+    def take(self, indices: np.ndarray) -> "CandidateColumns":
+        return CandidateColumns(**{item.name: getattr(self, item.name)[indices] for item in fields(self)})
+
+    def search_parameters(self, idx: int) -> dict[str, float]:
+        return {
+            "far_factor": round(float(self.far_factor[idx]), 4),
+            "height_factor": round(float(self.height_factor[idx]), 4),
+            "base_floorplate": round(float(self.base_floorplate[idx]), 2),
+            "slenderness": round(float(self.slenderness[idx]), 4),
+            "spacing_factor": round(float(self.spacing_factor[idx]), 4),
+        }
+
+
+def residential_parameter_grid(axes: dict[str, tuple[float, float, int]] = RESIDENTIAL_PARAMETER_AXES) -> dict[str, np.ndarray]:
+    names = list(axes.keys())
+    spans = [np.linspace(low, high, count) for low, high, count in axes.values()]
+    mesh = np.meshgrid(*spans, indexing="ij")
+    return {name: values.ravel() for name, values in zip(names, mesh)}
+
+
+def evaluate_residential_columns(
+    params: dict[str, np.ndarray],
+    *,
+    far_upper: float,
+    height_upper: float,
+    coverage_upper: float,
+    open_space_min: float,
+    site_metrics: dict,
+    min_spacing: float,
+    country_code: str,
+) -> CandidateColumns:
+    # Column-wise port of optimizer._residential_candidates; keep the two in sync.
+    site_area_m2 = site_metrics["area_m2"]
+    site_width_m = site_metrics["width_m"]
+    site_depth_m = site_metrics["depth_m"]
+
+    far_factor = np.asarray(params["far_factor"], dtype=np.float64)
+    height_factor = np.asarray(params["height_factor"], dtype=np.float64)
+    base_floorplate = np.asarray(params["base_floorplate"], dtype=np.float64)
+    slenderness = np.asarray(params["slenderness"], dtype=np.float64)
+    spacing_factor = np.asarray(params["spacing_factor"], dtype=np.float64)
+
+    target_far = far_upper * far_factor
+    height = height_upper * height_factor
+    floors = np.clip((height / FLOOR_TO_FLOOR_M).astype(np.int64), 8, 35)
+
+    gfa_target = site_area_m2 * (target_far / 100.0)
+    initial_blocks = np.maximum(2, np.ceil(gfa_target / np.maximum(1.0, base_floorplate * floors)).astype(np.int64))
+    block_count = np.minimum(8, initial_blocks)
+
+    spacing_ratio = 0.55 if country_code.upper() == "KR" else 0.45
+    spacing = np.maximum(min_spacing, height * spacing_ratio) * spacing_factor
+
+    base_width = np.sqrt(np.maximum(base_floorplate, 300.0)) * slenderness
+    base_depth = np.maximum(11.0, base_floorplate / np.maximum(base_width, 1.0))
+
+    footprint_width = np.minimum(base_width, site_width_m * 0.42)
+    footprint_depth = np.minimum(base_depth, site_depth_m * 0.42)
+
+    cols_capacity = np.maximum(1, np.floor((site_width_m + spacing) / np.maximum(1.0, footprint_width + spacing)).astype(np.int64))
+    rows_capacity = np.maximum(1, np.floor((site_depth_m + spacing) / np.maximum(1.0, footprint_depth + spacing)).astype(np.int64))
+    block_count = np.minimum(block_count, np.maximum(1, cols_capacity * rows_capacity))
+
+    max_floorplate_by_coverage = (site_area_m2 * (coverage_upper / 100.0)) / np.maximum(block_count, 1)
+    floorplate = np.minimum(np.minimum(base_floorplate, max_floorplate_by_coverage), footprint_width * footprint_depth)
+    footprint_depth = np.maximum(10.0, floorplate / np.maximum(footprint_width, 1.0))
+
+    achieved_gfa = floorplate * floors * block_count
+    achieved_far = np.minimum(target_far, (achieved_gfa / site_area_m2) * 100.0)
+    coverage = (floorplate * block_count / site_area_m2) * 100.0
+    open_space = np.maximum(open_space_min, 100.0 - coverage)
+
+    plan_code = np.searchsorted(SLENDERNESS_BREAKS, slenderness, side="right").astype(np.int8)
+
+    return CandidateColumns(
+        far_factor=far_factor,
+        height_factor=height_factor,
+        base_floorplate=base_floorplate,
+        slenderness=slenderness,
+        spacing_factor=spacing_factor,
+        plan_code=plan_code,
+        far=achieved_far,
+        height=height,
+        coverage=coverage,
+        open_space_ratio=open_space,
+        sky_exposure=np.minimum(0.9, height / np.maximum(20.0, spacing * 2.95)),
+        articulation_index=PLAN_ARTICULATION[plan_code],
+        block_count=np.maximum(1, block_count),
+        floorplate_area_m2=floorplate,
+        floors=floors,
+        building_spacing_m=spacing,
+        max_block_length_m=np.maximum(footprint_width, footprint_depth),
+        footprint_width_m=footprint_width,
+        footprint_depth_m=footprint_depth,
+    )
+
+
+def qualitative_totals(columns: CandidateColumns, *, aesthetic: AestheticContext, avg_unit_area_m2: float) -> np.ndarray:
+    # Column-wise port of optimizer._qualitative_score for residential candidates.
+    skyline_harmony = PLAN_SKYLINE_HARMONY[columns.plan_code].copy()
+    if not aesthetic.has_landmark_bias:
+        skyline_harmony -= np.where(columns.height > 85.0, 8.0, 0.0)
+    if aesthetic.has_context_bias:
+        skyline_harmony += 4.0
+
+    street_scale_fit = np.maximum(40.0, 100.0 - np.abs(columns.coverage - 45.0) * 1.4)
+    open_space_quality = np.clip(columns.open_space_ratio * 1.7 + 15.0, 40.0, 100.0)
+    reference_maturity = max(45.0, min(100.0, 46.0 + (aesthetic.reference_count * 9.0) + (aesthetic.input_count * 2.0)))
+
+    size_fit = max(40.0, 100.0 - abs(avg_unit_area_m2 - 80.0) * 1.6)
+    market_fit = np.minimum(100.0, size_fit + 8.0 + np.minimum(18.0, columns.block_count * 2.5))
+
+    total = (
+        skyline_harmony * 0.3
+        + street_scale_fit * 0.24
+        + open_space_quality * 0.22
+        + market_fit * 0.16
+        + reference_maturity * 0.08
+    )
+    return np.clip(total * (0.9 + (aesthetic.mean_weight * 0.1)), 0.0, 100.0)
+
+
+def score_columns(columns: CandidateColumns, qualitative_total: np.ndarray) -> np.ndarray:
+    massing_penalty = np.maximum(0.0, columns.coverage - 58.0) * 2.0
+    long_block_penalty = np.maximum(0.0, columns.max_block_length_m - 70.0) * 0.9
+    return columns.far * 0.6 + qualitative_total - massing_penalty - long_block_penalty
+
+
+def select_top_rows(scores: np.ndarray, plan_code: np.ndarray, top_n: int) -> list[int]:
+    # Best row of each plan family first so the shortlist keeps distinct archetypes,
+    # then fill the remaining slots by global score.
+    finite = np.isfinite(scores)
+    order = np.argsort(-np.where(finite, scores, -np.inf), kind="stable")
+    order = order[finite[order]]
+    if order.size == 0 or top_n <= 0:
+        return []
+
+    selected: list[int] = []
+    for code in range(len(PLAN_FAMILIES)):
+        family_rows = order[plan_code[order] == code]
+        if family_rows.size:
+            selected.append(int(family_rows[0]))
+    selected.sort(key=lambda idx: -scores[idx])
+    selected = selected[:top_n]
+
+    chosen = set(selected)
+    for idx in order:
+        if len(selected) >= top_n:
+            break
+        if int(idx) not in chosen:
+            selected.append(int(idx))
+            chosen.add(int(idx))
+    return selected
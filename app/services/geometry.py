@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Upper bound on (points x slab width) cells materialized per query chunk.
+QUERY_CELL_BUDGET = 2_000_000
+# Rings with more distinct vertex z values share slab boundaries to bound table size.
+MAX_SLABS = 512
+
+
+class PreparedPolygon:
+    """Even-odd containment index for one projected site ring.
+
+    Edges are bucketed into horizontal z-slabs bounded by vertex z values, so a query
+    only tests the few edges overlapping its slab instead of walking the whole ring.
+    """
+
+    def __init__(self, ring: list[tuple[float, float]]) -> None:
+        points = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+        if len(points) and not np.array_equal(points[0], points[-1]):
+            points = np.vstack([points, points[:1]])
+        self.ring = points
+        self.min_x, self.min_z = points.min(axis=0) if len(points) else (0.0, 0.0)
+        self.max_x, self.max_z = points.max(axis=0) if len(points) else (0.0, 0.0)
+
+        x1, z1 = points[:-1, 0], points[:-1, 1]
+        x2, z2 = points[1:, 0], points[1:, 1]
+        # Horizontal edges never satisfy the (z1 > z) != (z2 > z) crossing test.
+        keep = z1 != z2
+        x1, z1, x2, z2 = x1[keep], z1[keep], x2[keep], z2[keep]
+        slope = (x2 - x1) / (z2 - z1)
+        z_low = np.minimum(z1, z2)
+        z_high = np.maximum(z1, z2)
+
+        breaks = np.unique(np.concatenate([z_low, z_high]))
+        if len(breaks) > MAX_SLABS + 1:
+            breaks = np.unique(breaks[np.linspace(0, len(breaks) - 1, MAX_SLABS + 1).astype(np.int64)])
+        self._breaks = breaks
+        slab_count = max(len(breaks) - 1, 0)
+        first = np.searchsorted(breaks, z_low, side="right") - 1
+        last = np.searchsorted(breaks, z_high, side="left")
+        counts = np.maximum(last - first, 0)
+        edge_ids = np.repeat(np.arange(len(x1)), counts)
+        run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+        slab_ids = np.repeat(first, counts) + (np.arange(int(counts.sum())) - run_starts)
+
+        per_slab = np.bincount(slab_ids, minlength=slab_count) if slab_count else np.zeros(0, dtype=np.int64)
+        width = int(per_slab.max()) if per_slab.size else 0
+        order = np.argsort(slab_ids, kind="stable")
+        slot = np.arange(len(order)) - np.repeat(np.cumsum(per_slab) - per_slab, per_slab)
+
+        # Padded (slab, k) edge tables; padding has an empty z span so it never counts.
+        self._slab_x1 = np.zeros((slab_count, width))
+        self._slab_z1 = np.zeros((slab_count, width))
+        self._slab_slope = np.zeros((slab_count, width))
+        self._slab_z_low = np.full((slab_count, width), np.inf)
+        self._slab_z_high = np.full((slab_count, width), -np.inf)
+        sorted_slabs = slab_ids[order]
+        sorted_edges = edge_ids[order]
+        self._slab_x1[sorted_slabs, slot] = x1[sorted_edges]
+        self._slab_z1[sorted_slabs, slot] = z1[sorted_edges]
+        self._slab_slope[sorted_slabs, slot] = slope[sorted_edges]
+        self._slab_z_low[sorted_slabs, slot] = z_low[sorted_edges]
+        self._slab_z_high[sorted_slabs, slot] = z_high[sorted_edges]
+        self.edge_count = int(keep.sum())
+
+    def contains(self, x: float, z: float) -> bool:
+        return bool(self.contains_points(np.array([x]), np.array([z]))[0])
+
+    def contains_points(self, xs: np.ndarray, zs: np.ndarray) -> np.ndarray:
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        zs = np.asarray(zs, dtype=np.float64).ravel()
+        inside = np.zeros(xs.shape, dtype=bool)
+        if self._slab_x1.size == 0:
+            return inside
+        candidates = np.nonzero((xs >= self.min_x) & (xs <= self.max_x) & (zs >= self.min_z) & (zs < self.max_z))[0]
+        step = max(256, QUERY_CELL_BUDGET // max(self._slab_x1.shape[1], 1))
+        for start in range(0, len(candidates), step):
+            chunk = candidates[start : start + step]
+            px = xs[chunk]
+            pz = zs[chunk]
+            slab = np.searchsorted(self._breaks, pz, side="right") - 1
+            column_z = pz[:, None]
+            spans = (self._slab_z_low[slab] <= column_z) & (column_z < self._slab_z_high[slab])
+            x_cross = self._slab_x1[slab] + self._slab_slope[slab] * (column_z - self._slab_z1[slab])
+            crossings = np.count_nonzero(spans & (px[:, None] < x_cross), axis=1)
+            inside[chunk] = (crossings % 2) == 1
+        return inside
+
+    def contains_rects(
+        self,
+        xs: np.ndarray,
+        zs: np.ndarray,
+        widths: np.ndarray,
+        depths: np.ndarray,
+        safety_offset: float = 0.6,
+    ) -> np.ndarray:
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        zs = np.asarray(zs, dtype=np.float64).ravel()
+        half_w = np.broadcast_to(np.asarray(widths, dtype=np.float64) / 2.0 + safety_offset, xs.shape)
+        half_d = np.broadcast_to(np.asarray(depths, dtype=np.float64) / 2.0 + safety_offset, xs.shape)
+        corner_x = np.stack([xs - half_w, xs + half_w, xs + half_w, xs - half_w], axis=1)
+        corner_z = np.stack([zs - half_d, zs - half_d, zs + half_d, zs + half_d], axis=1)
+        return self.contains_points(corner_x, corner_z).reshape(-1, 4).all(axis=1)
+
+
+# Occupancy raster of a site with a summed-area table for O(1) rectangle probes. A cell
+# counts as buildable when all four corners are inside the polygon and no ring vertex
+# falls in it, which keeps the mask conservative along concave notches.
+class BuildableMask:
+    def __init__(self, polygon: PreparedPolygon, *, max_cells_per_side: int = 160, min_cell_size: float = 0.25) -> None:
+        span_x = float(polygon.max_x - polygon.min_x)
+        span_z = float(polygon.max_z - polygon.min_z)
+        self.cell_size = max(min_cell_size, max(span_x, span_z, 1e-6) / max_cells_per_side)
+        self.origin_x = float(polygon.min_x)
+        self.origin_z = float(polygon.min_z)
+        nx = max(1, int(np.ceil(span_x / self.cell_size)))
+        nz = max(1, int(np.ceil(span_z / self.cell_size)))
+
+        grid_x, grid_z = np.meshgrid(
+            self.origin_x + np.arange(nx + 1) * self.cell_size,
+            self.origin_z + np.arange(nz + 1) * self.cell_size,
+        )
+        corners = polygon.contains_points(grid_x, grid_z).reshape(nz + 1, nx + 1)
+        cells = corners[:-1, :-1] & corners[1:, :-1] & corners[:-1, 1:] & corners[1:, 1:]
+
+        vertex_i = np.clip(((polygon.ring[:, 1] - self.origin_z) / self.cell_size).astype(np.int64), 0, nz - 1)
+        vertex_j = np.clip(((polygon.ring[:, 0] - self.origin_x) / self.cell_size).astype(np.int64), 0, nx - 1)
+        cells[vertex_i, vertex_j] = False
+
+        self.occupancy = cells
+        self._table = np.zeros((nz + 1, nx + 1), dtype=np.int64)
+        self._table[1:, 1:] = cells.cumsum(axis=0).cumsum(axis=1)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.occupancy.shape
+
+    @property
+    def buildable_area_m2(self) -> float:
+        return float(self.occupancy.sum()) * self.cell_size * self.cell_size
+
+    def fits_rects(
+        self,
+        xs: np.ndarray,
+        zs: np.ndarray,
+        widths: np.ndarray,
+        depths: np.ndarray,
+        safety_offset: float = 0.6,
+    ) -> np.ndarray:
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        zs = np.asarray(zs, dtype=np.float64).ravel()
+        half_w = np.asarray(widths, dtype=np.float64) / 2.0 + safety_offset
+        half_d = np.asarray(depths, dtype=np.float64) / 2.0 + safety_offset
+        nz, nx = self.shape
+
+        j0 = np.floor((xs - half_w - self.origin_x) / self.cell_size).astype(np.int64)
+        j1 = np.ceil((xs + half_w - self.origin_x) / self.cell_size).astype(np.int64)
+        i0 = np.floor((zs - half_d - self.origin_z) / self.cell_size).astype(np.int64)
+        i1 = np.ceil((zs + half_d - self.origin_z) / self.cell_size).astype(np.int64)
+        in_bounds = (j0 >= 0) & (i0 >= 0) & (j1 <= nx) & (i1 <= nz)
+
+        j0, j1 = np.clip(j0, 0, nx), np.clip(j1, 0, nx)
+        i0, i1 = np.clip(i0, 0, nz), np.clip(i1, 0, nz)
+        table = self._table
+        covered = table[i1, j1] - table[i0, j1] - table[i1, j0] + table[i0, j0]
+        return in_bounds & (covered == (i1 - i0) * (j1 - j0))
+
+    def lattice_placements(
+        self,
+        *,
+        width: float,
+        depth: float,
+        pitch_x: float,
+        pitch_z: float,
+        phase_steps: int = 8,
+        safety_offset: float = 0.6,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Lattice anchored on the projected site origin; every phase shift within one
+        # pitch is probed in a single batch and the phase fitting the most blocks wins.
+        nz, nx = self.shape
+        min_x, max_x = self.origin_x, self.origin_x + nx * self.cell_size
+        min_z, max_z = self.origin_z, self.origin_z + nz * self.cell_size
+        cols = np.arange(np.floor(min_x / pitch_x) - 1, np.ceil(max_x / pitch_x) + 1)
+        rows = np.arange(np.floor(min_z / pitch_z) - 1, np.ceil(max_z / pitch_z) + 1)
+        phases = np.arange(phase_steps) / phase_steps
+
+        # Axes: (phase_z, phase_x, row, col)
+        xs = (cols[None, None, None, :] + phases[None, :, None, None]) * pitch_x
+        zs = (rows[None, None, :, None] + phases[:, None, None, None]) * pitch_z
+        xs, zs = np.broadcast_arrays(xs, zs)
+        fits = self.fits_rects(xs, zs, width, depth, safety_offset).reshape(xs.shape)
+
+        counts = fits.sum(axis=(2, 3))
+        distance = np.where(fits, np.hypot(xs, zs), 0.0).sum(axis=(2, 3)) / np.maximum(counts, 1)
+        # Most blocks first, then the phase whose blocks sit closest to the site centre.
+        best = np.lexsort((distance.ravel(), -counts.ravel()))[0]
+        phase_z, phase_x = np.unravel_index(best, counts.shape)
+        chosen = fits[phase_z, phase_x]
+        return xs[phase_z, phase_x][chosen], zs[phase_z, phase_x][chosen]
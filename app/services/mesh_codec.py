@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.shadow import mesh_boxes
+
+# Packed mesh: magic, format version, mesh type code, box count, outline point count,
+# then float32 box rows (x, z, width, depth, base_y, top_y) and float32 outline (x, z)
+# pairs. Every mesh type is stored as the axis-aligned boxes it renders as, so a
+# viewer can upload the box buffer as instance transforms of one unit cube.
+MESH_HEADER = struct.Struct("<4sHHII")
+MESH_MAGIC = b"BLDM"
+MESH_VERSION = 1
+MESH_TYPES = ("multi_block", "stacked", "courtyard")
+MESH_MEDIA_TYPE = "application/octet-stream"
+# Fine is every box plus the site outline. Coarse merges each row of a multi-block
+# layout into one envelope and drops the outline, for overviews of a whole run.
+MESH_LODS = ("fine", "coarse")
+
+
+@dataclass
+class PackedMesh:
+    mesh_type: str
+    boxes: np.ndarray
+    outline: np.ndarray
+
+    def pack(self) -> bytes:
+        header = MESH_HEADER.pack(MESH_MAGIC, MESH_VERSION, MESH_TYPES.index(self.mesh_type), len(self.boxes), len(self.outline))
+        return header + self.boxes.astype("<f4").tobytes() + self.outline.astype("<f4").tobytes()
+
+
+def packed_mesh(mesh_payload: dict, lod: str = "fine") -> PackedMesh:
+    mesh_type = mesh_payload.get("type")
+    if mesh_type not in MESH_TYPES:
+        raise ValueError(f"unsupported mesh type '{mesh_type}'")
+    if lod not in MESH_LODS:
+        raise ValueError(f"unsupported mesh lod '{lod}'")
+    fine = PackedMesh(
+        mesh_type=mesh_type,
+        boxes=mesh_boxes(mesh_payload).astype(np.float32),
+        outline=np.asarray(mesh_payload.get("site_outline") or [], dtype=np.float32).reshape(-1, 2),
+    )
+    return coarse_mesh(fine) if lod == "coarse" else fine
+
+
+def coarse_mesh(fine: PackedMesh) -> PackedMesh:
+    # Derived from the fine boxes, so only the fine mesh needs storing.
+    boxes = row_envelopes(fine.boxes.astype(np.float64)) if fine.mesh_type == "multi_block" else fine.boxes
+    return PackedMesh(mesh_type=fine.mesh_type, boxes=boxes.astype(np.float32), outline=np.empty((0, 2), dtype=np.float32))
+
+
+def row_envelopes(boxes: np.ndarray) -> np.ndarray:
+    # Blocks are laid out on a lattice, so a row is every box sharing a centre z.
+    rows = np.round(boxes[:, 1], 2)
+    envelopes = []
+    for row in np.unique(rows):
+        members = boxes[rows == row]
+        left, right = (members[:, 0] - members[:, 2] / 2.0).min(), (members[:, 0] + members[:, 2] / 2.0).max()
+        near, far = (members[:, 1] - members[:, 3] / 2.0).min(), (members[:, 1] + members[:, 3] / 2.0).max()
+        envelopes.append(((left + right) / 2.0, (near + far) / 2.0, right - left, far - near, members[:, 4].min(), members[:, 5].max()))
+    return np.asarray(envelopes, dtype=np.float64).reshape(-1, 6)
+
+
+def _unpack_at(payload: bytes, offset: int) -> tuple[PackedMesh, int]:
+    magic, version, type_code, box_count, outline_count = MESH_HEADER.unpack_from(payload, offset)
+    if magic != MESH_MAGIC or version != MESH_VERSION:
+        raise ValueError("unrecognized mesh encoding")
+    offset += MESH_HEADER.size
+    boxes = np.frombuffer(payload, dtype="<f4", count=6 * box_count, offset=offset).reshape(box_count, 6)
+    offset += 24 * box_count
+    outline = np.frombuffer(payload, dtype="<f4", count=2 * outline_count, offset=offset).reshape(outline_count, 2)
+    return PackedMesh(mesh_type=MESH_TYPES[type_code], boxes=boxes, outline=outline), offset + 8 * outline_count
+
+
+def unpack_mesh(payload: bytes) -> PackedMesh:
+    return _unpack_at(payload, 0)[0]
+
+
+def unpack_meshes(payload: bytes) -> list[PackedMesh]:
+    # A run's meshes are packed records back to back, in option rank order.
+    meshes: list[PackedMesh] = []
+    offset = 0
+    while offset < len(payload):
+        mesh, offset = _unpack_at(payload, offset)
+        meshes.append(mesh)
+    return meshes
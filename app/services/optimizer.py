@@ -1,14 +1,36 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import date, datetime, time, timezone
-from math import ceil, cos, floor, pi, sin, sqrt
+from dataclasses import dataclass, field, replace
+from datetime import date
+from math import ceil, cos, floor, pi, sqrt
 from time import perf_counter
-from typing import Optional
+from types import SimpleNamespace
+from typing import Callable, Optional, get_args
+
+import numpy as np
 
 from app.models import ProjectAestheticInput, ProjectRequirement, RuleDefinition
-from app.schemas import ConstraintCheck
-from app.services.rule_dsl import evaluate_expression
+from app.schemas import ConstraintCheck, SearchMode
+from app.services.candidate_grid import (
+    PLAN_FAMILIES,
+    PLAN_OPTION_TYPES,
+    RESIDENTIAL_PARAMETER_AXES,
+    AestheticContext,
+    CandidateColumns,
+    aesthetic_context,
+    evaluate_residential_columns,
+    qualitative_totals,
+    residential_parameter_grid,
+    score_columns,
+    select_top_rows,
+)
+from app.services.geometry import BuildableMask, PreparedPolygon
+from app.services.pareto import PARETO_FRONT_LIMIT, nsga2, pareto_pool
+from app.services.profiling import StageMemory
+from app.services.rule_dsl import CompiledRule, compile_rules, hard_rules_mask
+from app.services.shadow import mesh_boxes
+from app.services.solar import SolarColumns, solar_columns
+from app.services.sunlight import min_continuous_sun_hours, winter_solstice_samples
 
 
 @dataclass
@@ -30,6 +52,11 @@ class Candidate:
     avg_unit_area_m2: float
     footprint_width_m: float
     footprint_depth_m: float
+    search_parameters: dict[str, float] = field(default_factory=dict)
+
+
+SEARCH_MODES = set(get_args(SearchMode))
+ENGINE_VERSION = "residential-multi-block-v6-full-cluster-fit"
 
 
 def _requirement_map(requirements: list[ProjectRequirement]) -> dict[str, ProjectRequirement]:
@@ -54,6 +81,9 @@ def _site_metrics(site_geojson: dict) -> dict:
             "width_m": 50.0,
             "depth_m": 50.0,
             "ring_m": ring_m,
+            "polygon": PreparedPolygon(ring_m),
+            "lat": 37.5665,
+            "lng": 126.9780,
         }
 
     ring_ll = coordinates[0]
@@ -88,38 +118,16 @@ def _site_metrics(site_geojson: dict) -> dict:
         "width_m": width,
         "depth_m": depth,
         "ring_m": ring_m,
+        "polygon": PreparedPolygon(ring_m),
+        "lat": lat_center,
+        "lng": lng_center,
     }
 
 
-def _point_in_polygon(x: float, z: float, ring: list[tuple[float, float]]) -> bool:
-    inside = False
-    for idx in range(len(ring) - 1):
-        x1, z1 = ring[idx]
-        x2, z2 = ring[idx + 1]
-        intersects = ((z1 > z) != (z2 > z)) and (x < (x2 - x1) * (z - z1) / ((z2 - z1) or 1e-9) + x1)
-        if intersects:
-            inside = not inside
-    return inside
-
-
-def _block_inside_polygon(
-    *,
-    x: float,
-    z: float,
-    width: float,
-    depth: float,
-    ring: list[tuple[float, float]],
-    safety_offset: float = 0.6,
-) -> bool:
-    half_w = (width / 2.0) + safety_offset
-    half_d = (depth / 2.0) + safety_offset
-    corners = [
-        (x - half_w, z - half_d),
-        (x + half_w, z - half_d),
-        (x + half_w, z + half_d),
-        (x - half_w, z + half_d),
-    ]
-    return all(_point_in_polygon(cx, cz, ring) for cx, cz in corners)
+def prepare_site(site_geojson: dict) -> dict:
+    # Projected site geometry that callers evaluating one site many times can compute
+    # once and hand back to optimize_options.
+    return _site_metrics(site_geojson)
 
 
 def _country_defaults(country_code: str) -> dict[str, float]:
@@ -272,6 +280,207 @@ def _residential_candidates(
     return candidates
 
 
+def _candidate_from_columns(columns: CandidateColumns, idx: int, country_code: str) -> Candidate:
+    unit_mix, avg_unit_area = _residential_unit_model(country_code)
+    plan_code = int(columns.plan_code[idx])
+    return Candidate(
+        far=float(columns.far[idx]),
+        height=float(columns.height[idx]),
+        coverage=float(columns.coverage[idx]),
+        open_space_ratio=float(columns.open_space_ratio[idx]),
+        sky_exposure=float(columns.sky_exposure[idx]),
+        articulation_index=float(columns.articulation_index[idx]),
+        option_type=PLAN_OPTION_TYPES[plan_code],
+        block_count=int(columns.block_count[idx]),
+        floorplate_area_m2=float(columns.floorplate_area_m2[idx]),
+        floors=int(columns.floors[idx]),
+        building_spacing_m=float(columns.building_spacing_m[idx]),
+        max_block_length_m=float(columns.max_block_length_m[idx]),
+        plan_family=PLAN_FAMILIES[plan_code],
+        unit_mix=unit_mix,
+        avg_unit_area_m2=avg_unit_area,
+        footprint_width_m=float(columns.footprint_width_m[idx]),
+        footprint_depth_m=float(columns.footprint_depth_m[idx]),
+        search_parameters=columns.search_parameters(idx),
+    )
+
+
+def _state_columns(columns: CandidateColumns) -> dict[str, np.ndarray]:
+    return {
+        "far": columns.far,
+        "height": columns.height,
+        "coverage": columns.coverage,
+        "open_space": columns.open_space_ratio,
+        "sky_exposure": columns.sky_exposure,
+        "articulation_index": columns.articulation_index,
+        "block_count": columns.block_count,
+        "max_block_length": columns.max_block_length_m,
+        "min_block_spacing": columns.building_spacing_m,
+    }
+
+
+def _residential_grid_candidates(
+    *,
+    far_upper: float,
+    height_upper: float,
+    coverage_upper: float,
+    open_space_min: float,
+    sky_exposure_max: float,
+    site_metrics: dict,
+    min_spacing: float,
+    country_code: str,
+    aesthetic_inputs: list[ProjectAestheticInput],
+    user_far_min: Optional[float],
+    user_qualitative_min: Optional[float],
+    compiled_rules: list[CompiledRule],
+    top_n: int,
+) -> tuple[list[Candidate], int]:
+    columns = evaluate_residential_columns(
+        residential_parameter_grid(),
+        far_upper=far_upper,
+        height_upper=height_upper,
+        coverage_upper=coverage_upper,
+        open_space_min=open_space_min,
+        site_metrics=site_metrics,
+        min_spacing=min_spacing,
+        country_code=country_code,
+    )
+    _, avg_unit_area = _residential_unit_model(country_code)
+    qualitative = qualitative_totals(columns, aesthetic=aesthetic_context(aesthetic_inputs), avg_unit_area_m2=avg_unit_area)
+    scores = score_columns(columns, qualitative)
+
+    # Screen the grid against limits and hard rules before layout; layout can still
+    # drop blocks, so shortlisted options are re-checked on the regular path.
+    feasible = (columns.sky_exposure <= sky_exposure_max) & (columns.block_count >= 2) & (columns.building_spacing_m >= min_spacing)
+    if user_far_min is not None:
+        feasible &= columns.far >= user_far_min
+    if user_qualitative_min is not None:
+        feasible &= qualitative >= user_qualitative_min
+    # Rules on massing-derived fields (e.g. min_continuous_sun_hours) have no column
+    # here and are only checked once the shortlisted options are laid out.
+    state_columns = _state_columns(columns)
+    screened_rules = [rule for rule in compiled_rules if rule.field in state_columns]
+    feasible &= hard_rules_mask(screened_rules, state_columns, len(columns))
+    if not feasible.any():
+        # Nothing passes the screen: still return the best rows so the caller reports failed checks.
+        feasible = np.ones(len(columns), dtype=bool)
+
+    rows = select_top_rows(np.where(feasible, scores, -np.inf), columns.plan_code, top_n)
+    return [_candidate_from_columns(columns, idx, country_code) for idx in rows], len(columns)
+
+
+@dataclass
+class ParetoContext:
+    far_upper: float
+    height_upper: float
+    coverage_upper: float
+    open_space_min: float
+    sky_exposure_max: float
+    min_spacing: float
+    site_metrics: dict
+    country_code: str
+    occupancy_type: str
+    aesthetic: AestheticContext
+    # Plain (rule_key, rule_type, expression) records: compiled rules hold closures and
+    # cannot be sent to pool processes, so each chunk compiles its own.
+    rule_definitions: list[SimpleNamespace]
+    user_far_min: Optional[float]
+    user_qualitative_min: Optional[float]
+    solstice: SolarColumns
+
+
+def _pareto_columns(params: dict[str, np.ndarray], context: ParetoContext) -> CandidateColumns:
+    return evaluate_residential_columns(
+        params,
+        far_upper=context.far_upper,
+        height_upper=context.height_upper,
+        coverage_upper=context.coverage_upper,
+        open_space_min=context.open_space_min,
+        site_metrics=context.site_metrics,
+        min_spacing=context.min_spacing,
+        country_code=context.country_code,
+    )
+
+
+def _pareto_scores(columns: CandidateColumns, continuous_sun: np.ndarray, context: ParetoContext) -> tuple[np.ndarray, np.ndarray]:
+    # Objectives (all maximized): FAR, qualitative total, open space and winter-solstice
+    # continuous sun on the north boundary. Violation counts the hard checks a row fails;
+    # rules on a field without values (NaN sunlight) are left out.
+    size = len(columns)
+    _, avg_unit_area = _residential_unit_model(context.country_code)
+    qualitative = qualitative_totals(columns, aesthetic=context.aesthetic, avg_unit_area_m2=avg_unit_area)
+
+    state = _state_columns(columns)
+    if not np.isnan(continuous_sun).all():
+        state["min_continuous_sun_hours"] = continuous_sun
+    failures = [
+        columns.sky_exposure > context.sky_exposure_max,
+        columns.block_count < 2,
+        columns.building_spacing_m < context.min_spacing,
+    ]
+    if context.user_far_min is not None:
+        failures.append(columns.far < context.user_far_min)
+    if context.user_qualitative_min is not None:
+        failures.append(qualitative < context.user_qualitative_min)
+    failures.extend(~rule.test_columns(state, size) for rule in compile_rules(context.rule_definitions) if rule.hard and rule.field in state)
+
+    objectives = np.stack([columns.far, qualitative, columns.open_space_ratio, continuous_sun], axis=1)
+    return objectives, np.sum(failures, axis=0).astype(np.float64)
+
+
+def _pareto_screen(params: dict[str, np.ndarray], context: ParetoContext) -> tuple[np.ndarray, np.ndarray]:
+    # Nominal columns without layout or ray test; nsga2 estimates the sunlight.
+    columns = _pareto_columns(params, context)
+    return _pareto_scores(columns, np.full(len(columns), np.nan), context)
+
+
+def _pareto_objectives(params: dict[str, np.ndarray], context: ParetoContext) -> tuple[np.ndarray, np.ndarray]:
+    # Exact scores, measured on the laid-out blocks like the regular option loop.
+    columns = _pareto_columns(params, context)
+    size = len(columns)
+    actual_blocks = np.empty(size, dtype=np.int64)
+    continuous_sun = np.empty(size)
+    for idx in range(size):
+        candidate = _candidate_from_columns(columns, idx, context.country_code)
+        mesh_payload = _build_mesh(candidate, context.site_metrics, context.occupancy_type)
+        actual_blocks[idx] = len(mesh_payload.get("instances", [])) if mesh_payload.get("type") == "multi_block" else candidate.block_count
+        continuous_sun[idx] = min_continuous_sun_hours(mesh_boxes(mesh_payload), context.site_metrics["ring_m"], context.solstice)
+
+    block_ratio = actual_blocks / np.maximum(columns.block_count, 1)
+    coverage = columns.coverage * block_ratio
+    effective = replace(
+        columns,
+        far=columns.far * block_ratio,
+        coverage=coverage,
+        open_space_ratio=np.maximum(context.open_space_min, 100.0 - coverage),
+        block_count=actual_blocks,
+    )
+    return _pareto_scores(effective, continuous_sun, context)
+
+
+def _residential_pareto_candidates(context: ParetoContext, *, front_limit: int = PARETO_FRONT_LIMIT) -> tuple[list[Candidate], dict[str, int]]:
+    bounds = {name: (low, high) for name, (low, high, _) in RESIDENTIAL_PARAMETER_AXES.items()}
+    result = nsga2(_pareto_objectives, bounds, context, pool=pareto_pool, screen=_pareto_screen)
+    front = np.asarray(result.front(front_limit), dtype=np.int64)
+    columns = evaluate_residential_columns(
+        {name: values[front] for name, values in result.params.items()},
+        far_upper=context.far_upper,
+        height_upper=context.height_upper,
+        coverage_upper=context.coverage_upper,
+        open_space_min=context.open_space_min,
+        site_metrics=context.site_metrics,
+        min_spacing=context.min_spacing,
+        country_code=context.country_code,
+    )
+    search_stats = {
+        "pareto_evaluations": int(result.evaluations),
+        "pareto_screened": int(result.screened),
+        "pareto_front_size": len(front),
+        "pareto_workers": pareto_pool.max_workers,
+    }
+    return [_candidate_from_columns(columns, idx, context.country_code) for idx in range(len(columns))], search_stats
+
+
 def _non_residential_candidates(
     *,
     far_upper: float,
@@ -350,12 +559,11 @@ def _market_fit_score(candidate: Candidate, occupancy_type: str) -> float:
 
 
 def _qualitative_score(candidate: Candidate, aesthetic_inputs: list[ProjectAestheticInput], occupancy_type: str) -> dict[str, float]:
-    all_text = " ".join(item.content.lower() for item in aesthetic_inputs)
-    has_landmark_bias = any(token in all_text for token in ["랜드마크", "iconic", "상징"])
-    has_context_bias = any(token in all_text for token in ["맥락", "조화", "context", "street"])
-
-    reference_count = sum(1 for item in aesthetic_inputs if item.reference_url)
-    mean_weight = sum(item.weight for item in aesthetic_inputs) / max(len(aesthetic_inputs), 1)
+    context = aesthetic_context(aesthetic_inputs)
+    has_landmark_bias = context.has_landmark_bias
+    has_context_bias = context.has_context_bias
+    reference_count = context.reference_count
+    mean_weight = context.mean_weight
 
     skyline_harmony = 76.0
     if "tower" in candidate.option_type:
@@ -427,43 +635,50 @@ def _legal_basis(country_code: str, occupancy_type: str) -> list[str]:
     return base
 
 
+def _buildable_mask(site_metrics: dict) -> BuildableMask:
+    # Rasterized lazily: only multi-block layouts probe the mask.
+    mask = site_metrics.get("mask")
+    if mask is None:
+        mask = BuildableMask(site_metrics["polygon"])
+        site_metrics["mask"] = mask
+    return mask
+
+
 def _layout_blocks_within_polygon(
     *,
     block_count: int,
     width: float,
     depth: float,
     spacing: float,
-    ring: list[tuple[float, float]],
+    mask: BuildableMask,
 ) -> list[dict]:
-    # Try several shrink ratios to guarantee blocks stay inside polygon.
+    # Shrink until a lattice phase holds every block. If no size does, fall back to the
+    # largest size that held the most blocks, as long as that is a cluster of two.
+    best: Optional[tuple[np.ndarray, np.ndarray, float, float]] = None
     for ratio in [1.0, 0.93, 0.87, 0.82, 0.76, 0.7, 0.62, 0.54, 0.46]:
         local_width = width * ratio
         local_depth = depth * ratio
         local_spacing = spacing * ratio
 
-        cols = int(ceil(sqrt(block_count)))
-        rows = int(ceil(block_count / cols))
-        span_x = (cols - 1) * (local_width + local_spacing)
-        span_z = (rows - 1) * (local_depth + local_spacing)
-
-        blocks: list[dict] = []
-        for idx in range(block_count):
-            row = idx // cols
-            col = idx % cols
-            x = (col - (cols - 1) / 2.0) * (local_width + local_spacing)
-            z = (row - (rows - 1) / 2.0) * (local_depth + local_spacing)
-
-            if _block_inside_polygon(x=x, z=z, width=local_width, depth=local_depth, ring=ring):
-                blocks.append({"x": x, "z": z, "width": local_width, "depth": local_depth})
-
-        if len(blocks) >= block_count:
-            return blocks[:block_count]
-
-        # If full fit fails, accept a reduced count but still keep minimum livable cluster.
-        if len(blocks) >= 2:
-            return blocks
+        xs, zs = mask.lattice_placements(
+            width=local_width,
+            depth=local_depth,
+            pitch_x=local_width + local_spacing,
+            pitch_z=local_depth + local_spacing,
+        )
+        if len(xs) >= block_count:
+            best = (xs, zs, local_width, local_depth)
+            break
+        if len(xs) >= 2 and (best is None or len(xs) > len(best[0])):
+            best = (xs, zs, local_width, local_depth)
 
-    return []
+    if best is None:
+        return []
+    xs, zs, local_width, local_depth = best
+    # Keep the blocks nearest the site centre, then emit them row by row.
+    nearest = np.argsort(np.hypot(xs, zs), kind="stable")[:block_count]
+    ordered = nearest[np.lexsort((xs[nearest], zs[nearest]))]
+    return [{"x": float(xs[idx]), "z": float(zs[idx]), "width": local_width, "depth": local_depth} for idx in ordered]
 
 
 def _build_mesh(candidate: Candidate, site_metrics: dict, occupancy_type: str) -> dict:
@@ -476,25 +691,22 @@ def _build_mesh(candidate: Candidate, site_metrics: dict, occupancy_type: str) -
             width=candidate.footprint_width_m,
             depth=candidate.footprint_depth_m,
             spacing=candidate.building_spacing_m,
-            ring=ring,
+            mask=_buildable_mask(site_metrics),
         )
 
-        blocks = []
-        for idx, block in enumerate(laid_out):
-            height_scale = 1.0 - (0.06 * (idx % 2))
-            blocks.append(
-                {
-                    "x": round(block["x"], 2),
-                    "z": round(block["z"], 2),
-                    "width": round(block["width"], 2),
-                    "depth": round(block["depth"], 2),
-                    "height": round(candidate.height * height_scale, 2),
-                }
-            )
+        # Every block of a layout shares one footprint; instances carry their position and
+        # a height scale that alternates between neighbours.
+        prototype = {
+            "width": round(laid_out[0]["width"], 2) if laid_out else round(candidate.footprint_width_m, 2),
+            "depth": round(laid_out[0]["depth"], 2) if laid_out else round(candidate.footprint_depth_m, 2),
+            "height": round(candidate.height, 2),
+        }
+        instances = [[round(block["x"], 2), round(block["z"], 2), round(1.0 - (0.06 * (idx % 2)), 4)] for idx, block in enumerate(laid_out)]
 
         return {
             "type": "multi_block",
-            "blocks": blocks,
+            "prototype": prototype,
+            "instances": instances,
             "site_outline": [[round(x, 2), round(z, 2)] for x, z in ring],
             "origin": [0, 0, 0],
         }
@@ -564,9 +776,19 @@ def optimize_options(
     country_code: str,
     occupancy_type: str,
     aesthetic_inputs: list[ProjectAestheticInput],
+    evaluation_date: date,
+    search_mode: str = "preset",
+    top_n: int = 3,
+    site_metrics: Optional[dict] = None,
+    on_option: Optional[Callable[[dict], None]] = None,
+    memory: Optional[StageMemory] = None,
 ) -> tuple[list[dict], dict[str, float]]:
+    if search_mode not in SEARCH_MODES:
+        raise ValueError(f"unsupported search_mode '{search_mode}'")
+    memory = memory or StageMemory(enabled=False)
     t_total = perf_counter()
     t_phase = perf_counter()
+    memory.start()
     req_map = _requirement_map(requirements)
     user_far_min = req_map.get("far").min_value if req_map.get("far") else None
     user_far_max = req_map.get("far").max_value if req_map.get("far") else None
@@ -586,13 +808,61 @@ def optimize_options(
     sky_exposure_max = min(x for x in [rule_sky_exposure_max, defaults["sky_exposure_max"]] if x is not None)
     open_space_min = max(x for x in [rule_open_space_min, defaults["open_space_min"]] if x is not None)
 
-    site_metrics = _site_metrics(site_geojson)
+    compiled_rules = compile_rules(rule_definitions)
+    site_metrics = site_metrics or _site_metrics(site_geojson)
+    # The ray test is the most expensive per-option step, so it only runs when a rule
+    # constrains its result or the pareto search optimizes it.
+    needs_sunlight = search_mode == "pareto" or any(rule.field == "min_continuous_sun_hours" for rule in compiled_rules)
+    solstice = winter_solstice_samples(site_metrics["lat"], site_metrics["lng"], evaluation_date.year) if needs_sunlight else None
     timings: dict[str, float] = {
         "prepare_inputs_ms": round((perf_counter() - t_phase) * 1000.0, 3),
     }
+    memory.finish("prepare_inputs")
 
+    # Search sizes are counts, kept apart from the *_ms phase timings.
+    search_stats: dict[str, int] = {}
     t_phase = perf_counter()
-    if occupancy_type in {"residential", "mixed_use"}:
+    memory.start()
+    if occupancy_type in {"residential", "mixed_use"} and search_mode == "grid":
+        raw_candidates, grid_size = _residential_grid_candidates(
+            far_upper=far_upper,
+            height_upper=height_upper,
+            coverage_upper=coverage_upper,
+            open_space_min=open_space_min,
+            sky_exposure_max=sky_exposure_max,
+            site_metrics=site_metrics,
+            min_spacing=defaults["min_building_spacing"],
+            country_code=country_code,
+            aesthetic_inputs=aesthetic_inputs,
+            user_far_min=user_far_min,
+            user_qualitative_min=user_qualitative_min,
+            compiled_rules=compiled_rules,
+            top_n=top_n,
+        )
+        search_stats["candidate_grid_size"] = int(grid_size)
+    elif occupancy_type in {"residential", "mixed_use"} and search_mode == "pareto":
+        raw_candidates, search_stats = _residential_pareto_candidates(
+            ParetoContext(
+                far_upper=far_upper,
+                height_upper=height_upper,
+                coverage_upper=coverage_upper,
+                open_space_min=open_space_min,
+                sky_exposure_max=sky_exposure_max,
+                min_spacing=defaults["min_building_spacing"],
+                site_metrics=site_metrics,
+                country_code=country_code,
+                occupancy_type=occupancy_type,
+                aesthetic=aesthetic_context(aesthetic_inputs),
+                rule_definitions=[
+                    SimpleNamespace(rule_key=item.rule_key, rule_type=item.rule_type, expression=item.expression)
+                    for item in rule_definitions
+                ],
+                user_far_min=user_far_min,
+                user_qualitative_min=user_qualitative_min,
+                solstice=solstice,
+            )
+        )
+    elif occupancy_type in {"residential", "mixed_use"}:
         raw_candidates = _residential_candidates(
             far_upper=far_upper,
             height_upper=height_upper,
@@ -610,9 +880,13 @@ def optimize_options(
             open_space_min=open_space_min,
         )
     timings["candidate_generation_ms"] = round((perf_counter() - t_phase) * 1000.0, 3)
+    memory.finish("candidate_generation")
 
+    # The per-candidate steps interleave, so memory is accounted for the loop as a whole.
+    memory.start()
     options: list[dict] = []
     mesh_ms = 0.0
+    sunlight_ms = 0.0
     qualitative_ms = 0.0
     checks_ms = 0.0
     for candidate in raw_candidates:
@@ -620,9 +894,15 @@ def optimize_options(
         mesh_payload = _build_mesh(candidate, site_metrics, occupancy_type)
         mesh_ms += perf_counter() - t_step
 
+        continuous_sun: Optional[float] = None
+        if solstice is not None:
+            t_step = perf_counter()
+            continuous_sun = min_continuous_sun_hours(mesh_boxes(mesh_payload), site_metrics["ring_m"], solstice)
+            sunlight_ms += perf_counter() - t_step
+
         actual_block_count = candidate.block_count
         if mesh_payload.get("type") == "multi_block":
-            actual_block_count = len(mesh_payload.get("blocks", []))
+            actual_block_count = len(mesh_payload.get("instances", []))
 
         block_ratio = actual_block_count / max(candidate.block_count, 1)
         effective_far = candidate.far * block_ratio
@@ -648,21 +928,12 @@ def optimize_options(
             "max_block_length": candidate.max_block_length_m,
             "min_block_spacing": candidate.building_spacing_m,
         }
+        if continuous_sun is not None:
+            state["min_continuous_sun_hours"] = continuous_sun
 
+        rule_passes = [rule.test(state) for rule in compiled_rules]
+        feasible = all(passed or not rule.hard for rule, passed in zip(compiled_rules, rule_passes))
         checks: list[ConstraintCheck] = []
-        feasible = True
-        for definition in rule_definitions:
-            passed, detail = evaluate_expression(definition.expression, state)
-            checks.append(
-                ConstraintCheck(
-                    rule_key=definition.rule_key,
-                    rule_type=definition.rule_type,
-                    passed=passed,
-                    detail=detail,
-                )
-            )
-            if definition.rule_type == "hard" and not passed:
-                feasible = False
 
         if candidate.sky_exposure > sky_exposure_max:
             feasible = False
@@ -738,7 +1009,7 @@ def optimize_options(
                 "option_type": candidate.option_type,
                 "score": round(score, 4),
                 "parameters": {
-                    "engine_version": "residential-multi-block-v2-boundary-fit",
+                    "engine_version": ENGINE_VERSION,
                     "far": round(effective_far, 2),
                     "height_m": round(candidate.height, 2),
                     "coverage_percent": round(effective_coverage, 2),
@@ -747,6 +1018,7 @@ def optimize_options(
                     "floors": candidate.floors,
                     "building_spacing_m": round(candidate.building_spacing_m, 2),
                     "max_block_length_m": round(candidate.max_block_length_m, 2),
+                    "min_continuous_sun_hours": round(continuous_sun, 3) if continuous_sun is not None else None,
                     "plan_family": candidate.plan_family,
                     "avg_unit_area_m2": round(candidate.avg_unit_area_m2, 2),
                     "unit_mix": candidate.unit_mix,
@@ -754,42 +1026,40 @@ def optimize_options(
                     "objective": objective,
                     "feasible": feasible,
                     "legal_basis_tags": _legal_basis(country_code, occupancy_type),
+                    "search_mode": search_mode,
+                    "search_parameters": candidate.search_parameters,
+                    "search_stats": search_stats,
                 },
                 "checks": [item.model_dump() for item in checks],
                 "mesh_payload": mesh_payload,
+                "_rule_results": (state, rule_passes),
             }
         )
+        if on_option is not None:
+            on_option(options[-1])
 
+    memory.finish("evaluate_candidates")
     timings["mesh_build_ms"] = round(mesh_ms * 1000.0, 3)
+    timings["continuous_sunlight_ms"] = round(sunlight_ms * 1000.0, 3)
     timings["qualitative_eval_ms"] = round(qualitative_ms * 1000.0, 3)
     timings["constraint_checks_ms"] = round(checks_ms * 1000.0, 3)
     t_phase = perf_counter()
+    memory.start()
     options.sort(key=lambda item: item["score"], reverse=True)
     timings["sort_ms"] = round((perf_counter() - t_phase) * 1000.0, 3)
+    memory.finish("sort")
+
+    # Rule detail strings are only formatted for the options that are returned.
+    t_phase = perf_counter()
+    memory.start()
+    for option in options:
+        state, rule_passes = option.pop("_rule_results")
+        option["checks"] = [rule.check(state, passed) for rule, passed in zip(compiled_rules, rule_passes)] + option["checks"]
+    timings["check_details_ms"] = round((perf_counter() - t_phase) * 1000.0, 3)
+    memory.finish("check_details")
     timings["total_ms"] = round((perf_counter() - t_total) * 1000.0, 3)
     return options, timings
 
 
 def compute_solar_profile(latitude: float, longitude: float, evaluation_date: date, hours: list[int]) -> list[dict]:
-    day_of_year = evaluation_date.timetuple().tm_yday
-    decl = 23.44 * sin((2 * pi / 365.0) * (day_of_year - 81))
-    longitude_shift = (longitude - 127.0) / 30.0
-    results: list[dict] = []
-
-    for hour in hours:
-        hour_angle = ((hour + longitude_shift) - 12) * 15
-        altitude = max(0.0, 52.0 * cos((hour_angle / 180.0) * pi) * (1 - abs(latitude) / 130.0) + (decl / 2.8))
-        azimuth = (180.0 + hour_angle) % 360.0
-        insolation = max(0.0, altitude / 90.0) * 0.95
-        shadow_ratio = max(0.0, min(1.0, 1.0 - altitude / 72.0))
-        results.append(
-            {
-                "timestamp_utc": datetime.combine(evaluation_date, time(hour=hour, minute=0, tzinfo=timezone.utc)),
-                "sun_altitude": round(altitude, 3),
-                "sun_azimuth": round(azimuth, 3),
-                "insolation_kwh_m2": round(insolation, 4),
-                "shadow_ratio": round(shadow_ratio, 4),
-            }
-        )
-
-    return results
+    return solar_columns(latitude, longitude, [evaluation_date], hours).rows()
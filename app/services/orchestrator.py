@@ -1,27 +1,69 @@
 from __future__ import annotations
 
-from datetime import datetime
+import cProfile
+import hashlib
+import json
+import logging
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import partial
 from time import perf_counter
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, defer
 
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
 from app.models import (
     DesignOption,
     DesignRun,
+    OptionMesh,
     Project,
     ProjectAestheticInput,
     ProjectRequirement,
     ProjectRuleSnapshot,
     RuleDefinition,
     RuleSet,
+    RunProfile,
     RunStatus,
     SolarResult,
+    SolarSeries,
     User,
+    id_str,
 )
-from app.schemas import AestheticInputValue, EvaluateRequest, ProjectCreate, RequirementValue, RunRead
-from app.services.optimizer import compute_solar_profile, optimize_options
+from app.schemas import AestheticInputValue, BatchRunResult, EvaluateRequest, ProjectCreate, RequirementValue, RunRead
+from app.services.cache import LRUCache
+from app.services.mesh_codec import MESH_LODS, coarse_mesh, packed_mesh, unpack_mesh
+from app.services.optimizer import optimize_options, prepare_site
+from app.services.profiling import StageMemory, capture_profile
+from app.services.result_cache import load_cached_result, result_cache_key, store_result
+from app.services.rule_index import IndexedRuleDefinition, IndexedRuleSet, RuleIndex
+from app.services.run_events import run_events
+from app.services.run_json import option_fragment, run_document, solar_fragment
+from app.services.run_lease import INSTANCE_ID, lease_deadline
+from app.services.shadow import cast_shadows
+from app.services.solar import ANNUAL_HOURS, SolarColumns, sample_hours, solar_columns, solar_sample_dates, unpack_solar_columns
+
+logger = logging.getLogger(__name__)
+CACHE_LOOKUPS = metrics.counter("buildit_cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+
+
+def _count_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# Keyed by (run_id, include_mesh).
+completed_run_cache: LRUCache[tuple[str, bool], RunRead] = LRUCache(settings.run_cache_size, on_lookup=partial(_count_cache_lookup, "completed_run"))
+completed_run_json_cache: LRUCache[tuple[str, bool], bytes] = LRUCache(settings.run_cache_size, on_lookup=partial(_count_cache_lookup, "completed_run_json"))
+STAGE_MS = metrics.histogram("buildit_run_stage_ms", "Latency of each design run stage in milliseconds.", ("stage",))
+OPTIMIZER_PHASE_MS = metrics.histogram("buildit_optimizer_phase_ms", "Latency of each optimizer phase in milliseconds.", ("phase",))
+ACTIVE_RUN_STATUSES = (RunStatus.QUEUED.value, RunStatus.RUNNING.value)
+RUNS = metrics.counter("buildit_runs_total", "Design runs by status reached.", ("status",))
+rule_index = RuleIndex(settings.rule_index_ttl_s)
 
 
 def create_user(db: Session, *, email: str, name: Optional[str]) -> User:
@@ -84,6 +126,7 @@ def create_ruleset(db: Session, payload) -> RuleSet:
     db.add(row)
     db.commit()
     db.refresh(row)
+    rule_index.invalidate((row.country_code, row.jurisdiction_code, row.category))
     return row
 
 
@@ -92,139 +135,539 @@ def create_rule_definition(db: Session, payload) -> RuleDefinition:
     db.add(row)
     db.commit()
     db.refresh(row)
+    rule_set = db.get(RuleSet, row.rule_set_id)
+    rule_index.invalidate((rule_set.country_code, rule_set.jurisdiction_code, rule_set.category) if rule_set else None)
     return row
 
 
-def resolve_active_rules(db: Session, *, project: Project, evaluation_date, category: str) -> tuple[list[RuleSet], list[RuleDefinition]]:
-    stmt = (
-        select(RuleSet)
-        .where(RuleSet.country_code == project.country_code)
-        .where(RuleSet.jurisdiction_code == project.jurisdiction_code)
-        .where(RuleSet.category == category)
-        .where(RuleSet.status == "active")
-        .where(RuleSet.effective_from <= evaluation_date)
-        .where((RuleSet.effective_to.is_(None)) | (RuleSet.effective_to >= evaluation_date))
-        .order_by(RuleSet.effective_from.desc())
+def resolve_active_rules(db: Session, *, project: Project, evaluation_date, category: str) -> tuple[list[IndexedRuleSet], list[IndexedRuleDefinition]]:
+    return rule_index.lookup(
+        db,
+        country_code=project.country_code,
+        jurisdiction_code=project.jurisdiction_code,
+        category=category,
+        evaluation_date=evaluation_date,
     )
-    rule_sets = db.scalars(stmt).all()
-    if not rule_sets:
-        return [], []
-    rule_set_ids = [item.id for item in rule_sets]
-    definitions = db.scalars(select(RuleDefinition).where(RuleDefinition.rule_set_id.in_(rule_set_ids)).order_by(RuleDefinition.priority.asc())).all()
-    return rule_sets, definitions
 
 
-def create_snapshot(db: Session, *, project_id: str, evaluation_date, rule_sets: list[RuleSet], definitions: list[RuleDefinition]) -> ProjectRuleSnapshot:
+def snapshot_content_hash(*, project_id: str, evaluation_date, rule_set_ids: list[str], definition_ids: list[str]) -> str:
+    payload = json.dumps(
+        [project_id, evaluation_date.isoformat(), list(rule_set_ids), list(definition_ids)],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def create_snapshot(db: Session, *, project_id: str, evaluation_date, rule_sets: list[IndexedRuleSet], definitions: list[IndexedRuleDefinition]) -> ProjectRuleSnapshot:
+    rule_set_ids = [row.id for row in rule_sets]
+    definition_ids = [row.id for row in definitions]
+    content_hash = snapshot_content_hash(
+        project_id=project_id,
+        evaluation_date=evaluation_date,
+        rule_set_ids=rule_set_ids,
+        definition_ids=definition_ids,
+    )
+    existing = db.scalar(select(ProjectRuleSnapshot).where(ProjectRuleSnapshot.content_hash == content_hash))
+    if existing is not None:
+        return existing
+
     snapshot = ProjectRuleSnapshot(
         project_id=project_id,
         evaluation_date=evaluation_date,
-        frozen_rule_set_ids=[row.id for row in rule_sets],
-        frozen_rule_definition_ids=[row.id for row in definitions],
+        frozen_rule_set_ids=rule_set_ids,
+        frozen_rule_definition_ids=definition_ids,
+        content_hash=content_hash,
     )
-    db.add(snapshot)
-    db.commit()
-    db.refresh(snapshot)
+    try:
+        # A concurrent request may insert the same snapshot between the lookup and the flush.
+        with db.begin_nested():
+            db.add(snapshot)
+    except IntegrityError:
+        return db.scalars(select(ProjectRuleSnapshot).where(ProjectRuleSnapshot.content_hash == content_hash)).one()
     return snapshot
 
 
-def run_evaluation(db: Session, *, project: Project, payload: EvaluateRequest) -> DesignRun:
-    t_eval_start = perf_counter()
+def _resolve_snapshot(
+    db: Session,
+    *,
+    project: Project,
+    evaluation_date: date,
+    category: str,
+) -> tuple[ProjectRuleSnapshot, list[IndexedRuleDefinition], dict[str, float]]:
     stage_ms: dict[str, float] = {}
 
     t_stage = perf_counter()
-    rule_sets, definitions = resolve_active_rules(
-        db,
-        project=project,
-        evaluation_date=payload.evaluation_date,
-        category=payload.category,
-    )
+    rule_sets, definitions = resolve_active_rules(db, project=project, evaluation_date=evaluation_date, category=category)
     stage_ms["resolve_rules"] = round((perf_counter() - t_stage) * 1000.0, 3)
     if not rule_sets:
         raise ValueError("No active rule set matched project + date")
 
     t_stage = perf_counter()
-    snapshot = create_snapshot(db, project_id=project.id, evaluation_date=payload.evaluation_date, rule_sets=rule_sets, definitions=definitions)
+    snapshot = create_snapshot(db, project_id=project.id, evaluation_date=evaluation_date, rule_sets=rule_sets, definitions=definitions)
     stage_ms["create_snapshot"] = round((perf_counter() - t_stage) * 1000.0, 3)
+    for stage, ms in stage_ms.items():
+        STAGE_MS.observe(ms, stage=stage)
+    return snapshot, definitions, stage_ms
+
+
+def queue_evaluation(db: Session, *, project: Project, payload: EvaluateRequest) -> tuple[DesignRun, dict[str, float]]:
+    snapshot, _, stage_ms = _resolve_snapshot(db, project=project, evaluation_date=payload.evaluation_date, category=payload.category)
 
     run = DesignRun(
         project_id=project.id,
         snapshot_id=snapshot.id,
         objective=payload.objective,
-        status=RunStatus.RUNNING.value,
-        started_at=datetime.utcnow(),
+        status=RunStatus.QUEUED.value,
+        owner_id=INSTANCE_ID,
+        lease_expires_at=lease_deadline(),
     )
     db.add(run)
     db.commit()
     db.refresh(run)
+    _publish_queued(run.id, stage_ms)
+    return run, stage_ms
+
+
+def _publish_queued(run_id: str, stage_ms: dict[str, float]) -> None:
+    RUNS.inc(status=RunStatus.QUEUED.value)
+    run_events.publish(run_id, "status", {"status": RunStatus.QUEUED.value})
+    for stage, ms in stage_ms.items():
+        run_events.publish(run_id, "stage", {"stage": stage, "ms": ms})
+
+
+def _finish_stage(run_id: str, stage_ms: dict[str, float], stage: str, t_stage: float, memory: StageMemory) -> None:
+    memory.finish(stage)
+    stage_ms[stage] = round((perf_counter() - t_stage) * 1000.0, 3)
+    STAGE_MS.observe(stage_ms[stage], stage=stage)
+    run_events.publish(run_id, "stage", {"stage": stage, "ms": stage_ms[stage]})
+
+
+def _publish_option(run_id: str, option: dict) -> None:
+    # Pushed as soon as the optimizer scores an option, before ranking and persistence,
+    # so it carries no option id yet.
+    run_events.publish(
+        run_id,
+        "option",
+        {
+            "option_type": option["option_type"],
+            "score": option["score"],
+            "parameters": option["parameters"],
+            "mesh_payload": option["mesh_payload"],
+        },
+    )
+
+
+@dataclass
+class PipelineInputs:
+    # Detached optimizer inputs shared by every run of a batch: plain values, so
+    # worker threads never touch the request session.
+    definitions: list[IndexedRuleDefinition]
+    requirements: list[RequirementValue]
+    aesthetic_inputs: list[AestheticInputValue]
+    site_metrics: dict
 
+
+@dataclass
+class BatchScenario:
+    index: int
+    payload: EvaluateRequest
+    run_id: Optional[str] = None
+    stage_ms: dict[str, float] = field(default_factory=dict)
+    inputs: Optional[PipelineInputs] = None
+    error: Optional[str] = None
+
+
+def queue_batch_evaluation(db: Session, *, project: Project, payloads: list[EvaluateRequest]) -> list[BatchScenario]:
+    # Requirements, aesthetic inputs and the projected site are loaded once per batch;
+    # rules are resolved and snapshotted once per (evaluation_date, category).
     t_stage = perf_counter()
     requirements = db.scalars(select(ProjectRequirement).where(ProjectRequirement.project_id == project.id)).all()
     aesthetic_inputs = db.scalars(select(ProjectAestheticInput).where(ProjectAestheticInput.project_id == project.id)).all()
-    options, optimizer_profile = optimize_options(
-        rule_definitions=definitions,
-        requirements=requirements,
+    requirement_values = [RequirementValue.model_validate(row, from_attributes=True) for row in requirements]
+    aesthetic_values = [AestheticInputValue.model_validate(row, from_attributes=True) for row in aesthetic_inputs]
+    site_metrics = prepare_site(project.site_geojson)
+    prepare_ms = round((perf_counter() - t_stage) * 1000.0, 3)
+
+    resolved: dict[tuple[date, str], tuple[ProjectRuleSnapshot, PipelineInputs, dict[str, float]] | str] = {}
+    scenarios: list[BatchScenario] = []
+    runs: list[tuple[BatchScenario, DesignRun]] = []
+    for index, payload in enumerate(payloads):
+        scenario = BatchScenario(index=index, payload=payload)
+        scenarios.append(scenario)
+        key = (payload.evaluation_date, payload.category)
+        if key not in resolved:
+            try:
+                snapshot, definitions, stage_ms = _resolve_snapshot(
+                    db, project=project, evaluation_date=payload.evaluation_date, category=payload.category
+                )
+            except ValueError as exc:
+                resolved[key] = str(exc)
+            else:
+                inputs = PipelineInputs(
+                    definitions=definitions,
+                    requirements=requirement_values,
+                    aesthetic_inputs=aesthetic_values,
+                    site_metrics=site_metrics,
+                )
+                resolved[key] = (snapshot, inputs, {"prepare_batch_inputs": prepare_ms, **stage_ms})
+        entry = resolved[key]
+        if isinstance(entry, str):
+            scenario.error = entry
+            continue
+        snapshot, scenario.inputs, stage_ms = entry
+        scenario.stage_ms = dict(stage_ms)
+        run = DesignRun(
+            project_id=project.id,
+            snapshot_id=snapshot.id,
+            objective=payload.objective,
+            status=RunStatus.QUEUED.value,
+            owner_id=INSTANCE_ID,
+            lease_expires_at=lease_deadline(),
+        )
+        db.add(run)
+        runs.append((scenario, run))
+    db.commit()
+    for scenario, run in runs:
+        scenario.run_id = run.id
+        _publish_queued(run.id, scenario.stage_ms)
+    return scenarios
+
+
+def submit_batch_runs(scenarios: list[BatchScenario], submit: Callable[..., Future]) -> dict[Future, BatchScenario]:
+    return {
+        submit(execute_queued_run, scenario.run_id, scenario.payload, scenario.stage_ms, scenario.inputs): scenario
+        for scenario in scenarios
+        if scenario.run_id is not None
+    }
+
+
+def iter_batch_results(scenarios: list[BatchScenario], futures: dict[Future, BatchScenario]) -> Iterator[BatchRunResult]:
+    # Rejected scenarios are reported first, then runs in the order they finish.
+    for scenario in scenarios:
+        if scenario.error is not None:
+            yield BatchRunResult(scenario=scenario.index, error=scenario.error)
+    for future in as_completed(futures):
+        scenario = futures[future]
+        db = SessionLocal()
+        try:
+            yield BatchRunResult(scenario=scenario.index, run=get_run_response(db, scenario.run_id))
+        finally:
+            db.close()
+
+
+def _snapshot_definitions(db: Session, snapshot: ProjectRuleSnapshot) -> list[RuleDefinition]:
+    frozen_ids = list(snapshot.frozen_rule_definition_ids or [])
+    if not frozen_ids:
+        return []
+    position = {definition_id: idx for idx, definition_id in enumerate(frozen_ids)}
+    rows = db.scalars(select(RuleDefinition).where(RuleDefinition.id.in_(frozen_ids))).all()
+    return sorted(rows, key=lambda row: position[row.id])
+
+
+def _execute_pipeline(
+    db: Session,
+    *,
+    run: DesignRun,
+    payload: EvaluateRequest,
+    stage_ms: dict[str, float],
+    inputs: Optional[PipelineInputs] = None,
+    use_result_cache: bool = True,
+) -> None:
+    project = run.project
+    memory = StageMemory(enabled=settings.memory_profiling)
+
+    t_stage = perf_counter()
+    memory.start()
+    if inputs is None:
+        inputs = PipelineInputs(
+            definitions=_snapshot_definitions(db, run.snapshot),
+            requirements=db.scalars(select(ProjectRequirement).where(ProjectRequirement.project_id == project.id)).all(),
+            aesthetic_inputs=db.scalars(select(ProjectAestheticInput).where(ProjectAestheticInput.project_id == project.id)).all(),
+            site_metrics=prepare_site(project.site_geojson),
+        )
+    optimizer_inputs = dict(
+        rule_definitions=inputs.definitions,
+        requirements=inputs.requirements,
         objective=payload.objective,
         site_geojson=project.site_geojson,
         country_code=project.country_code,
         occupancy_type=project.occupancy_type,
-        aesthetic_inputs=aesthetic_inputs,
+        aesthetic_inputs=inputs.aesthetic_inputs,
+        search_mode=payload.search_mode,
+        evaluation_date=payload.evaluation_date,
     )
-    stage_ms["optimize_options"] = round((perf_counter() - t_stage) * 1000.0, 3)
+    cache_key = result_cache_key(**optimizer_inputs) if settings.result_cache_enabled and use_result_cache else None
+    cached = load_cached_result(db, cache_key) if cache_key else None
+    if cache_key:
+        _count_cache_lookup("optimizer_result", cached is not None)
+    optimizer_memory = StageMemory(enabled=settings.memory_profiling and cached is None)
+    optimizer_memory_profile: dict[str, dict[str, int]] = {}
+    if cached is not None:
+        options, optimizer_profile = cached.options, {**cached.optimizer_profile, "result_cache_hit": 1.0}
+        for option in options:
+            _publish_option(run.id, option)
+    else:
+        options, optimizer_profile = optimize_options(
+            **optimizer_inputs,
+            site_metrics=inputs.site_metrics,
+            on_option=lambda option: _publish_option(run.id, option),
+            memory=optimizer_memory,
+        )
+        optimizer_memory_profile = optimizer_memory.summary()
+        for key, value in optimizer_profile.items():
+            if key.endswith("_ms"):
+                OPTIMIZER_PHASE_MS.observe(value, phase=key[: -len("_ms")])
+        if cache_key:
+            store_result(db, cache_key=cache_key, options=options, optimizer_profile=optimizer_profile)
+    _finish_stage(run.id, stage_ms, "optimize_options", t_stage, memory)
 
     t_stage = perf_counter()
-    lat, lng = project_lat_lng(project.site_geojson)
-    solar_profile = compute_solar_profile(lat, lng, payload.evaluation_date, payload.hours)
-    stage_ms["compute_solar_profile"] = round((perf_counter() - t_stage) * 1000.0, 3)
+    memory.start()
+    # The same site reference point the optimizer used for its solstice samples.
+    lat, lng = inputs.site_metrics["lat"], inputs.site_metrics["lng"]
+    solar_hours = ANNUAL_HOURS if payload.solar_mode == "annual" else payload.hours
+    solar_dates = solar_sample_dates(payload.solar_mode, payload.evaluation_date, payload.solar_dates)
+    solar = solar_columns(lat, lng, solar_dates, solar_hours)
+    solar_weights = sample_hours(solar_hours, len(solar_dates))
+    _finish_stage(run.id, stage_ms, "compute_solar_profile", t_stage, memory)
 
     t_stage = perf_counter()
-    for rank, option in enumerate(options, start=1):
-        option_parameters = dict(option["parameters"])
-        option_parameters["runtime_profile"] = {
-            "pipeline_ms": stage_ms,
-            "optimizer_ms": optimizer_profile,
-        }
-        option_row = DesignOption(
-            run_id=run.id,
-            rank=rank,
-            option_type=option["option_type"],
-            score=option["score"],
-            parameters=option_parameters,
-            checks=option["checks"],
-            mesh_payload=option["mesh_payload"],
-        )
-        db.add(option_row)
-        db.flush()
-        for solar in solar_profile:
-            db.add(
-                SolarResult(
-                    option_id=option_row.id,
-                    timestamp_utc=solar["timestamp_utc"],
-                    sun_altitude=solar["sun_altitude"],
-                    sun_azimuth=solar["sun_azimuth"],
-                    insolation_kwh_m2=solar["insolation_kwh_m2"],
-                    shadow_ratio=solar["shadow_ratio"],
-                )
-            )
-    stage_ms["persist_options_and_solar"] = round((perf_counter() - t_stage) * 1000.0, 3)
-    stage_ms["total"] = round((perf_counter() - t_eval_start) * 1000.0, 3)
+    memory.start()
+    polygon = inputs.site_metrics["polygon"]
+    shadows = [cast_shadows(option["mesh_payload"], polygon, solar, sample_hours=solar_weights) for option in options]
+    _finish_stage(run.id, stage_ms, "cast_shadows", t_stage, memory)
 
-    run.status = RunStatus.COMPLETED.value
-    run.completed_at = datetime.utcnow()
+    t_stage = perf_counter()
+    memory.start()
+    solar_summary = {"mode": payload.solar_mode, **solar.summary()}
+    runtime_profile = {"pipeline_ms": dict(stage_ms), "optimizer_ms": optimizer_profile}
+    option_rows = _persist_options_and_solar(
+        db,
+        run_id=run.id,
+        options=options,
+        solar_series=[solar.rounded(shadow.shaded_ratio) for shadow in shadows],
+        option_parameters=[{"solar_summary": solar_summary, "shadow": shadow.summary()} for shadow in shadows],
+        runtime_profile=runtime_profile,
+    )
+    _finish_stage(run.id, stage_ms, "persist_options_and_solar", t_stage, memory)
+    if memory.enabled:
+        # Persisting builds the rows, so its memory is only known once they are stored.
+        runtime_profile["pipeline_memory"] = memory.summary()
+        if optimizer_memory_profile:
+            runtime_profile["optimizer_memory"] = optimizer_memory_profile
+        runtime_profile["memory_concurrent"] = memory.concurrent or optimizer_memory.concurrent
+        db.execute(update(DesignOption), [{"id": row["id"], "parameters": {**row["parameters"], "runtime_profile": runtime_profile}} for row in option_rows])
+
+
+def _persist_options_and_solar(
+    db: Session,
+    *,
+    run_id: str,
+    options: list[dict],
+    solar_series: list[SolarColumns],
+    option_parameters: list[dict],
+    runtime_profile: dict,
+) -> list[dict]:
+    # Ids are generated up front so options, their packed meshes and their solar data
+    # go out as executemany INSERTs. Columnar storage packs each option's series into
+    # one record; row storage keeps the legacy one-row-per-sample layout.
+    created_at = datetime.utcnow()
+    columnar = settings.solar_storage == "columnar"
+    option_rows: list[dict] = []
+    mesh_rows: list[dict] = []
+    solar_rows: list[dict] = []
+    for rank, (option, series, extra_parameters) in enumerate(zip(options, solar_series, option_parameters), start=1):
+        option_id = id_str()
+        option_rows.append(
+            {
+                "id": option_id,
+                "run_id": run_id,
+                "rank": rank,
+                "option_type": option["option_type"],
+                "score": option["score"],
+                "parameters": {**option["parameters"], **extra_parameters, "runtime_profile": runtime_profile},
+                "checks": option["checks"],
+                "mesh_payload": option["mesh_payload"],
+                "created_at": created_at,
+            }
+        )
+        mesh = packed_mesh(option["mesh_payload"])
+        mesh_rows.append({"option_id": option_id, "box_count": len(mesh.boxes), "payload": mesh.pack()})
+        if columnar:
+            solar_rows.append({"option_id": option_id, "sample_count": len(series), "payload": series.pack()})
+            continue
+        for solar in series.rows():
+            solar_rows.append({"id": id_str(), "option_id": option_id, **solar})
+    if option_rows:
+        db.execute(insert(DesignOption), option_rows)
+        db.execute(insert(OptionMesh), mesh_rows)
+    if solar_rows:
+        db.execute(insert(SolarSeries if columnar else SolarResult), solar_rows)
+    return option_rows
+
+
+def execute_run(
+    db: Session,
+    *,
+    run_id: str,
+    payload: EvaluateRequest,
+    stage_ms: Optional[dict[str, float]] = None,
+    inputs: Optional[PipelineInputs] = None,
+    use_result_cache: bool = True,
+) -> DesignRun:
+    run = db.get(DesignRun, run_id)
+    if run is None:
+        raise ValueError("Run not found")
+    stage_ms = dict(stage_ms or {})
+    queued_ms = sum(stage_ms.values())
+    t_execute = perf_counter()
+
+    run.status = RunStatus.RUNNING.value
+    run.started_at = datetime.utcnow()
+    run.owner_id = INSTANCE_ID
+    run.lease_expires_at = lease_deadline()
     db.commit()
+    run_events.publish(run_id, "status", {"status": RunStatus.RUNNING.value})
+
+    try:
+        _execute_pipeline(db, run=run, payload=payload, stage_ms=stage_ms, inputs=inputs, use_result_cache=use_result_cache)
+        stage_ms["total"] = round(queued_ms + (perf_counter() - t_execute) * 1000.0, 3)
+        run.status = RunStatus.COMPLETED.value
+        run.completed_at = datetime.utcnow()
+        db.commit()
+        STAGE_MS.observe(stage_ms["total"], stage="total")
+        RUNS.inc(status=RunStatus.COMPLETED.value)
+    except Exception as exc:
+        db.rollback()
+        run = db.get(DesignRun, run_id)
+        run.status = RunStatus.FAILED.value
+        run.error_message = str(exc) or exc.__class__.__name__
+        run.completed_at = datetime.utcnow()
+        db.commit()
+        RUNS.inc(status=RunStatus.FAILED.value)
+        run_events.publish(run_id, "status", {"status": run.status, "error_message": run.error_message})
+        run_events.close(run_id)
+        raise
+    # Published after the commit, so a client reacting to it reads the stored run.
+    run_events.publish(run_id, "status", {"status": run.status, "total_ms": stage_ms["total"]})
+    run_events.close(run_id)
     db.refresh(run)
     return run
 
 
-def get_run_response(db: Session, run_id: str) -> Optional[RunRead]:
+def execute_profiled_run(db: Session, *, run_id: str, payload: EvaluateRequest, stage_ms: Optional[dict[str, float]] = None) -> DesignRun:
+    # Profiled runs always compute, so a result cache hit cannot hide the optimizer.
+    # cProfile sees this thread only; pareto generations in the process pool show up
+    # as time spent waiting on their futures.
+    profiler = cProfile.Profile()
+    t_start = perf_counter()
+    try:
+        return profiler.runcall(execute_run, db, run_id=run_id, payload=payload, stage_ms=stage_ms, use_result_cache=False)
+    finally:
+        capture = capture_profile(profiler, (perf_counter() - t_start) * 1000.0)
+        db.add(RunProfile(run_id=run_id, wall_ms=capture.wall_ms, top_functions=capture.top_functions, stats=capture.stats))
+        db.commit()
+
+
+def execute_queued_run(
+    run_id: str,
+    payload: EvaluateRequest,
+    stage_ms: dict[str, float],
+    inputs: Optional[PipelineInputs] = None,
+    profile: bool = False,
+) -> None:
+    db = SessionLocal()
+    try:
+        if profile:
+            execute_profiled_run(db, run_id=run_id, payload=payload, stage_ms=stage_ms)
+        else:
+            execute_run(db, run_id=run_id, payload=payload, stage_ms=stage_ms, inputs=inputs)
+    except Exception:  # noqa: BLE001
+        # The failure is recorded on the run row; the worker thread must keep draining.
+        logger.exception("design run %s failed", run_id)
+    finally:
+        db.close()
+
+
+def run_evaluation(db: Session, *, project: Project, payload: EvaluateRequest, profile: bool = False) -> DesignRun:
+    run, stage_ms = queue_evaluation(db, project=project, payload=payload)
+    if profile:
+        return execute_profiled_run(db, run_id=run.id, payload=payload, stage_ms=stage_ms)
+    return execute_run(db, run_id=run.id, payload=payload, stage_ms=stage_ms)
+
+
+def renew_run_leases(db: Session) -> int:
+    result = db.execute(
+        update(DesignRun)
+        .where(DesignRun.owner_id == INSTANCE_ID, DesignRun.status.in_(ACTIVE_RUN_STATUSES))
+        .values(lease_expires_at=lease_deadline())
+    )
+    db.commit()
+    return result.rowcount
+
+
+def fail_interrupted_runs(db: Session) -> int:
+    # The worker queue lives in memory, so runs whose owning process stopped renewing
+    # their lease will never finish. Runs from before leases have no owner.
+    rows = db.scalars(
+        select(DesignRun).where(
+            DesignRun.status.in_(ACTIVE_RUN_STATUSES),
+            or_(DesignRun.owner_id.is_(None), DesignRun.owner_id != INSTANCE_ID),
+            or_(DesignRun.lease_expires_at.is_(None), DesignRun.lease_expires_at < datetime.utcnow()),
+        )
+    ).all()
+    for row in rows:
+        row.status = RunStatus.FAILED.value
+        row.error_message = "interrupted: the server process running it stopped"
+        row.completed_at = datetime.utcnow()
+    db.commit()
+    if rows:
+        RUNS.inc(len(rows), status="interrupted")
+    return len(rows)
+
+
+def _load_options_and_solar(db: Session, run_id: str, *, include_mesh: bool = False) -> tuple[list[DesignOption], dict[str, SolarColumns | list[dict]]]:
+    # Packed series stay columnar (views over the stored bytes) until a caller encodes them.
+    query = select(DesignOption).where(DesignOption.run_id == run_id).order_by(DesignOption.rank.asc())
+    if not include_mesh:
+        query = query.options(defer(DesignOption.mesh_payload))
+    options = db.scalars(query).all()
+    solar_map: dict[str, SolarColumns | list[dict]] = {option.id: [] for option in options}
+    if options:
+        packed = db.scalars(select(SolarSeries).where(SolarSeries.option_id.in_(list(solar_map.keys())))).all()
+        for series in packed:
+            solar_map[series.option_id] = unpack_solar_columns(series.payload)
+        # Runs stored before columnar storage (or with SOLAR_STORAGE=rows) keep per-sample rows.
+        packed_ids = {series.option_id for series in packed}
+        legacy_ids = [option_id for option_id in solar_map if option_id not in packed_ids]
+        if legacy_ids:
+            records = db.scalars(
+                select(SolarResult)
+                .where(SolarResult.option_id.in_(legacy_ids))
+                .order_by(SolarResult.option_id.asc(), SolarResult.timestamp_utc.asc())
+            ).all()
+            for record in records:
+                solar_map[record.option_id].append(
+                    {
+                        "timestamp_utc": record.timestamp_utc,
+                        "sun_altitude": record.sun_altitude,
+                        "sun_azimuth": record.sun_azimuth,
+                        "insolation_kwh_m2": record.insolation_kwh_m2,
+                        "shadow_ratio": record.shadow_ratio,
+                    }
+                )
+    return options, solar_map
+
+
+def get_run_response(db: Session, run_id: str, *, include_mesh: bool = False) -> Optional[RunRead]:
+    cached = completed_run_cache.get((run_id, include_mesh))
+    if cached is not None:
+        return cached
     run = db.get(DesignRun, run_id)
     if run is None:
         return None
-    options = db.scalars(select(DesignOption).where(DesignOption.run_id == run_id).order_by(DesignOption.rank.asc())).all()
-    solar_map: dict[str, list] = {}
-    for option in options:
-        records = db.scalars(select(SolarResult).where(SolarResult.option_id == option.id).order_by(SolarResult.timestamp_utc.asc())).all()
-        solar_map[option.id] = records
-    return RunRead(
+    options, solar_map = _load_options_and_solar(db, run_id, include_mesh=include_mesh)
+    response = RunRead(
         id=run.id,
         project_id=run.project_id,
         snapshot_id=run.snapshot_id,
@@ -241,39 +684,82 @@ def get_run_response(db: Session, run_id: str) -> Optional[RunRead]:
                 "score": option.score,
                 "parameters": option.parameters,
                 "checks": option.checks,
-                "mesh_payload": option.mesh_payload,
+                "mesh_payload": option.mesh_payload if include_mesh else None,
             }
             for option in options
         ],
-        solar={
-            option_id: [
-                {
-                    "timestamp_utc": row.timestamp_utc,
-                    "sun_altitude": row.sun_altitude,
-                    "sun_azimuth": row.sun_azimuth,
-                    "insolation_kwh_m2": row.insolation_kwh_m2,
-                    "shadow_ratio": row.shadow_ratio,
-                }
-                for row in rows
-            ]
-            for option_id, rows in solar_map.items()
-        },
+        solar={option_id: series.rows() if isinstance(series, SolarColumns) else series for option_id, series in solar_map.items()},
     )
-
-
-def project_lat_lng(site_geojson: dict) -> tuple[float, float]:
-    coordinates = site_geojson.get("coordinates", [])
-    if not coordinates or not coordinates[0]:
-        return 37.5665, 126.9780
-    ring = coordinates[0]
-    lng_values = [pt[0] for pt in ring]
-    lat_values = [pt[1] for pt in ring]
-    return sum(lat_values) / len(lat_values), sum(lng_values) / len(lng_values)
+    # Completed runs never change again, so their response can be served from memory.
+    if run.status == RunStatus.COMPLETED.value:
+        completed_run_cache.put((run_id, include_mesh), response)
+    return response
+
+
+def get_run_json(db: Session, run_id: str, *, include_mesh: bool = False) -> Optional[bytes]:
+    # Same document as get_run_response, encoded straight from the rows: each option and
+    # its solar series become one JSON fragment and the run is joined around them.
+    cached = completed_run_json_cache.get((run_id, include_mesh))
+    if cached is not None:
+        return cached
+    run = db.get(DesignRun, run_id)
+    if run is None:
+        return None
+    options, solar_map = _load_options_and_solar(db, run_id, include_mesh=include_mesh)
+    document = run_document(
+        run,
+        [option_fragment(option, include_mesh=include_mesh) for option in options],
+        {option_id: solar_fragment(series) for option_id, series in solar_map.items()},
+    )
+    if run.status == RunStatus.COMPLETED.value:
+        completed_run_json_cache.put((run_id, include_mesh), document)
+    return document
 
 
 def get_project(db: Session, project_id: str) -> Optional[Project]:
     return db.get(Project, project_id)
 
 
+def get_option_mesh(db: Session, option_id: str, lod: str = "fine") -> Optional[bytes]:
+    if lod not in MESH_LODS:
+        raise ValueError(f"unsupported mesh lod '{lod}'")
+    row = db.get(OptionMesh, option_id)
+    if row is not None:
+        return _stored_mesh(row.payload, row.coarse_payload, lod)
+    # Options persisted before packed meshes are encoded from their JSON.
+    option = db.get(DesignOption, option_id)
+    return packed_mesh(option.mesh_payload, lod).pack() if option is not None else None
+
+
+def _stored_mesh(payload: bytes, coarse_payload: Optional[bytes], lod: str) -> bytes:
+    if lod == "fine":
+        return payload
+    # Rows from older versions may carry a stored coarse mesh; others derive it.
+    return coarse_payload if coarse_payload is not None else coarse_mesh(unpack_mesh(payload)).pack()
+
+
+def get_run_meshes(db: Session, run_id: str, lod: str = "coarse") -> bytes:
+    if lod not in MESH_LODS:
+        raise ValueError(f"unsupported mesh lod '{lod}'")
+    rows = db.execute(
+        select(DesignOption.id, OptionMesh.payload, OptionMesh.coarse_payload)
+        .outerjoin(OptionMesh, OptionMesh.option_id == DesignOption.id)
+        .where(DesignOption.run_id == run_id)
+        .order_by(DesignOption.rank.asc())
+    ).all()
+    return b"".join(
+        _stored_mesh(payload, coarse_payload, lod) if payload is not None else get_option_mesh(db, option_id, lod)
+        for option_id, payload, coarse_payload in rows
+    )
+
+
+def get_run(db: Session, run_id: str) -> Optional[DesignRun]:
+    return db.get(DesignRun, run_id)
+
+
+def get_run_profile(db: Session, run_id: str) -> Optional[RunProfile]:
+    return db.get(RunProfile, run_id)
+
+
 def get_user(db: Session, user_id: str) -> Optional[User]:
     return db.get(User, user_id)
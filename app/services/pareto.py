@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+PARETO_POPULATION = 48
+PARETO_GENERATIONS = 30
+PARETO_SEED = 20240611
+PARETO_FRONT_LIMIT = 12
+CROSSOVER_RATE = 0.9
+# Distribution indices of simulated binary crossover and polynomial mutation.
+CROSSOVER_ETA = 15.0
+MUTATION_ETA = 20.0
+# Genes are snapped to this lattice so repeated genomes hit the evaluation memo.
+GENE_RESOLUTION = 1e-3
+
+# Maps a dict of parameter columns and a picklable context to (objectives, violation):
+# an (n, k) array of objectives to maximize and an (n,) array of constraint violations.
+Evaluator = Callable[[dict[str, np.ndarray], Any], tuple[np.ndarray, np.ndarray]]
+
+
+class ParetoPool:
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+
+    def evaluate(self, fn: Evaluator, params: dict[str, np.ndarray], context: Any) -> tuple[np.ndarray, np.ndarray]:
+        size = len(next(iter(params.values())))
+        if self.max_workers == 1 or size < 2:
+            return fn(params, context)
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: the API process already runs worker threads.
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            executor = self._executor
+        chunks = np.array_split(np.arange(size), min(self.max_workers, size))
+        futures = [executor.submit(fn, {key: values[chunk] for key, values in params.items()}, context) for chunk in chunks]
+        results = [future.result() for future in futures]
+        return np.concatenate([item[0] for item in results]), np.concatenate([item[1] for item in results])
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+pareto_pool = ParetoPool(settings.pareto_workers)
+
+
+@dataclass
+class ParetoResult:
+    params: dict[str, np.ndarray]
+    objectives: np.ndarray
+    violation: np.ndarray
+    ranks: np.ndarray
+    crowding: np.ndarray
+    evaluations: int
+    # Offspring scored by the screen; evaluations counts distinct exact evaluations.
+    screened: int = 0
+
+    def front(self, limit: int = PARETO_FRONT_LIMIT) -> list[int]:
+        # First front of the final population, feasible members only when there are any,
+        # widest-spread first so a capped front still spans every objective's extremes.
+        # Distinct genes can land on the same outcome, so members are unique by objectives.
+        members = self.ranks == 0
+        if (members & (self.violation <= 0.0)).any():
+            members &= self.violation <= 0.0
+        order = [int(idx) for idx in np.nonzero(members)[0][np.argsort(-self.crowding[members], kind="stable")]]
+        outcomes = np.round(self.objectives, 4)
+        seen: set[bytes] = set()
+        selected: list[int] = []
+        for idx in order:
+            key = outcomes[idx].tobytes()
+            if key not in seen:
+                seen.add(key)
+                selected.append(idx)
+        return selected[:limit]
+
+
+def constrained_dominance(objectives: np.ndarray, violation: np.ndarray) -> np.ndarray:
+    # dominates[i, j]: feasible rows compare on Pareto dominance (maximizing every
+    # objective), otherwise the row with the smaller violation wins.
+    at_least = (objectives[:, None, :] >= objectives[None, :, :]).all(axis=2)
+    strictly = (objectives[:, None, :] > objectives[None, :, :]).any(axis=2)
+    feasible = violation <= 0.0
+    both_feasible = feasible[:, None] & feasible[None, :]
+    return np.where(both_feasible, at_least & strictly, violation[:, None] < violation[None, :])
+
+
+def non_dominated_ranks(objectives: np.ndarray, violation: np.ndarray) -> np.ndarray:
+    dominates = constrained_dominance(objectives, violation)
+    remaining = dominates.sum(axis=0)
+    ranks = np.full(len(objectives), -1, dtype=np.int64)
+    current = np.nonzero(remaining == 0)[0]
+    rank = 0
+    while current.size:
+        ranks[current] = rank
+        remaining[current] = -1
+        remaining -= dominates[current].sum(axis=0)
+        current = np.nonzero(remaining == 0)[0]
+        rank += 1
+    return ranks
+
+
+def crowding_distance(objectives: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    distance = np.zeros(len(objectives))
+    for rank in np.unique(ranks):
+        members = np.nonzero(ranks == rank)[0]
+        if members.size <= 2:
+            distance[members] = np.inf
+            continue
+        for axis in range(objectives.shape[1]):
+            order = members[np.argsort(objectives[members, axis], kind="stable")]
+            values = objectives[order, axis]
+            distance[order[[0, -1]]] = np.inf
+            span = values[-1] - values[0]
+            if span > 0.0:
+                distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+
+def _tournament(ranks: np.ndarray, crowding: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    first = rng.integers(0, len(ranks), count)
+    second = rng.integers(0, len(ranks), count)
+    first_wins = (ranks[first] < ranks[second]) | ((ranks[first] == ranks[second]) & (crowding[first] >= crowding[second]))
+    return np.where(first_wins, first, second)
+
+
+def _offspring(genes: np.ndarray, parents: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Simulated binary crossover on parent pairs, then polynomial mutation; genes live in [0, 1].
+    left, right = genes[parents[0::2]], genes[parents[1::2]]
+    mu = rng.random(left.shape)
+    beta = np.where(mu <= 0.5, (2.0 * mu) ** (1.0 / (CROSSOVER_ETA + 1.0)), (1.0 / (2.0 * (1.0 - mu))) ** (1.0 / (CROSSOVER_ETA + 1.0)))
+    cross = (rng.random(len(left)) < CROSSOVER_RATE)[:, None] & (rng.random(left.shape) < 0.5)
+    beta = np.where(cross, beta, 1.0)
+    children = np.concatenate([0.5 * ((1.0 + beta) * left + (1.0 - beta) * right), 0.5 * ((1.0 - beta) * left + (1.0 + beta) * right)])
+
+    mu = rng.random(children.shape)
+    delta = np.where(mu < 0.5, (2.0 * mu) ** (1.0 / (MUTATION_ETA + 1.0)) - 1.0, 1.0 - (2.0 * (1.0 - mu)) ** (1.0 / (MUTATION_ETA + 1.0)))
+    mutate = rng.random(children.shape) < 1.0 / children.shape[1]
+    return np.clip(children + np.where(mutate, delta, 0.0), 0.0, 1.0)
+
+
+def _snap(genes: np.ndarray) -> np.ndarray:
+    return np.round(genes / GENE_RESOLUTION) * GENE_RESOLUTION
+
+
+def nsga2(
+    evaluate: Evaluator,
+    bounds: dict[str, tuple[float, float]],
+    context: Any,
+    *,
+    population: int = PARETO_POPULATION,
+    generations: int = PARETO_GENERATIONS,
+    seed: int = PARETO_SEED,
+    pool: Optional[ParetoPool] = None,
+    screen: Optional[Evaluator] = None,
+) -> ParetoResult:
+    # With a screen, offspring are scored by it (in process, vectorized) and only those
+    # that would survive into the next population go to the exact evaluator. The screen
+    # may return NaN for objectives it cannot estimate; those are taken from the nearest
+    # exactly evaluated genome. Exact results are memoized per genome for the search.
+    names = list(bounds.keys())
+    low = np.array([bounds[name][0] for name in names])
+    high = np.array([bounds[name][1] for name in names])
+    population += population % 2
+    rng = np.random.default_rng(seed)
+    pool = pool or pareto_pool
+    memo: dict[bytes, tuple[np.ndarray, np.ndarray, float]] = {}
+    screened = 0
+
+    def params(genes: np.ndarray) -> dict[str, np.ndarray]:
+        values = low + genes * (high - low)
+        return {name: values[:, axis] for axis, name in enumerate(names)}
+
+    def run(genes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        keys = [row.tobytes() for row in genes]
+        missing = list({key: idx for idx, key in enumerate(keys) if key not in memo}.values())
+        if missing:
+            objectives, violation = pool.evaluate(evaluate, params(genes[missing]), context)
+            for idx, row_objectives, row_violation in zip(missing, objectives, violation):
+                memo[keys[idx]] = (genes[idx], row_objectives, float(row_violation))
+        return np.stack([memo[key][1] for key in keys]), np.array([memo[key][2] for key in keys])
+
+    def assess(genes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        nonlocal screened
+        if screen is None or not memo:
+            objectives, violation = run(genes)
+            return objectives, violation, np.ones(len(genes), dtype=bool)
+        screened += len(genes)
+        objectives, violation = screen(params(genes), context)
+        objectives, violation = objectives.astype(np.float64), violation.astype(np.float64)
+        known = np.stack([item[0] for item in memo.values()])
+        known_objectives = np.stack([item[1] for item in memo.values()])
+        nearest = np.argmin(((genes[:, None, :] - known[None, :, :]) ** 2).sum(axis=2), axis=1)
+        objectives = np.where(np.isnan(objectives), known_objectives[nearest], objectives)
+        exact = np.array([row.tobytes() in memo for row in genes])
+        if exact.any():
+            objectives[exact], violation[exact] = run(genes[exact])
+        return objectives, violation, exact
+
+    def select(genes: np.ndarray, objectives: np.ndarray, violation: np.ndarray, exact: np.ndarray) -> np.ndarray:
+        # Survivors by rank, then crowding. Screened rows that would survive are evaluated
+        # and the selection is redone, so the population only ever holds exact rows.
+        while True:
+            ranks = non_dominated_ranks(objectives, violation)
+            survivors = np.lexsort((-crowding_distance(objectives, ranks), ranks))[:population]
+            pending = survivors[~exact[survivors]]
+            if not pending.size:
+                return survivors
+            objectives[pending], violation[pending] = run(genes[pending])
+            exact[pending] = True
+
+    genes = _snap(rng.random((population, len(names))))
+    objectives, violation, _ = assess(genes)
+    ranks = non_dominated_ranks(objectives, violation)
+    crowding = crowding_distance(objectives, ranks)
+    for _ in range(generations):
+        children = _snap(_offspring(genes, _tournament(ranks, crowding, population, rng), rng))
+        child_objectives, child_violation, child_exact = assess(children)
+
+        genes = np.concatenate([genes, children])
+        objectives = np.concatenate([objectives, child_objectives])
+        violation = np.concatenate([violation, child_violation])
+        exact = np.concatenate([np.ones(population, dtype=bool), child_exact])
+        survivors = select(genes, objectives, violation, exact)
+        genes, objectives, violation = genes[survivors], objectives[survivors], violation[survivors]
+        # Ranks and distances are recomputed on the survivors so the next tournament and
+        # the final front see the population as it is, not the merged pool.
+        ranks = non_dominated_ranks(objectives, violation)
+        crowding = crowding_distance(objectives, ranks)
+
+    return ParetoResult(
+        params=params(genes),
+        objectives=objectives,
+        violation=violation,
+        ranks=ranks,
+        crowding=crowding,
+        evaluations=len(memo),
+        screened=screened,
+    )
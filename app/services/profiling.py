@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import cProfile
+import marshal
+import pstats
+import tracemalloc
+from dataclasses import dataclass
+from threading import Lock, get_ident
+from weakref import WeakSet
+
+PROFILE_TOP_N = 40
+
+
+@dataclass
+class ProfileCapture:
+    wall_ms: float
+    top_functions: list[dict]
+    stats: bytes
+
+
+def capture_profile(profiler: cProfile.Profile, wall_ms: float, limit: int = PROFILE_TOP_N) -> ProfileCapture:
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    top_functions = [
+        {
+            "function": name,
+            "file": filename,
+            "line": line,
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "self_ms": round(self_s * 1000.0, 3),
+            "cumulative_ms": round(cumulative_s * 1000.0, 3),
+        }
+        for (filename, line, name), (primitive_calls, calls, self_s, cumulative_s, _) in rows
+    ]
+    # Same encoding as pstats.Stats.dump_stats, so the blob loads with pstats/snakeviz.
+    return ProfileCapture(wall_ms=round(wall_ms, 3), top_functions=top_functions, stats=marshal.dumps(stats.stats))
+
+
+_memory_lock = Lock()
+_memory_trackers: WeakSet[StageMemory] = WeakSet()
+
+
+def _fold_peak() -> int:
+    # tracemalloc keeps a single process-wide peak. Every tracker folds it into its own
+    # stage and total peaks before it is reset, so nested and concurrent trackers agree.
+    current, peak = tracemalloc.get_traced_memory()
+    # Nested trackers share a thread; trackers on other threads belong to other runs.
+    concurrent = len({tracker._thread for tracker in _memory_trackers}) > 1
+    for tracker in _memory_trackers:
+        tracker._stage_peak = max(tracker._stage_peak, peak)
+        tracker._total_peak = max(tracker._total_peak, peak)
+        tracker.concurrent = tracker.concurrent or concurrent
+    tracemalloc.reset_peak()
+    return current
+
+
+class StageMemory:
+    # Traced bytes per stage: the peak above the stage's starting level and what is
+    # still allocated when it finishes. Tracing stays on once started. With several run
+    # workers the figures include allocations made by concurrent runs; `concurrent` is
+    # set once a tracker on another thread was live at the same time.
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.concurrent = False
+        self.stages: dict[str, dict[str, int]] = {}
+        if not enabled:
+            return
+        with _memory_lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current = _fold_peak()
+            self._thread = get_ident()
+            self._origin = self._stage_start = self._stage_peak = self._total_peak = current
+            _memory_trackers.add(self)
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        with _memory_lock:
+            self._stage_start = self._stage_peak = _fold_peak()
+
+    def finish(self, stage: str) -> None:
+        if not self.enabled:
+            return
+        with _memory_lock:
+            current = _fold_peak()
+        self.stages[stage] = {"peak_bytes": self._stage_peak - self._stage_start, "retained_bytes": current - self._stage_start}
+
+    def summary(self) -> dict[str, dict[str, int]]:
+        # Closes the tracker: its total covers construction up to this call.
+        if not self.enabled:
+            return {}
+        with _memory_lock:
+            current = _fold_peak()
+            _memory_trackers.discard(self)
+        self.enabled = False
+        return {**self.stages, "total": {"peak_bytes": self._total_peak - self._origin, "retained_bytes": current - self._origin}}
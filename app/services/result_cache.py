@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date
+from typing import Any, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import OptimizerResult
+from app.services.optimizer import ENGINE_VERSION
+
+
+def result_cache_key(
+    *,
+    rule_definitions: list[Any],
+    requirements: list[Any],
+    site_geojson: dict,
+    country_code: str,
+    occupancy_type: str,
+    aesthetic_inputs: list[Any],
+    objective: str,
+    search_mode: str,
+    evaluation_date: date,
+) -> str:
+    # Rules keep their evaluation order; requirements and aesthetic inputs are
+    # order-free inputs to the optimizer, so they are sorted for a stable key.
+    payload = {
+        "engine_version": ENGINE_VERSION,
+        "rules": [[item.rule_key, item.rule_type, item.expression] for item in rule_definitions],
+        "requirements": sorted(
+            [item.key, item.min_value, item.max_value, item.required_value, item.unit] for item in requirements
+        ),
+        "site_geojson": site_geojson,
+        "country_code": country_code,
+        "occupancy_type": occupancy_type,
+        "aesthetic_inputs": sorted(
+            [item.category, item.content, item.reference_url or "", item.weight] for item in aesthetic_inputs
+        ),
+        "objective": objective,
+        "search_mode": search_mode,
+        # Only the winter-solstice year of the evaluation date feeds the sunlight check.
+        "solstice_year": evaluation_date.year,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def load_cached_result(db: Session, cache_key: str) -> Optional[OptimizerResult]:
+    return db.get(OptimizerResult, cache_key)
+
+
+def store_result(db: Session, *, cache_key: str, options: list[dict], optimizer_profile: dict) -> None:
+    row = OptimizerResult(
+        cache_key=cache_key,
+        engine_version=ENGINE_VERSION,
+        options=options,
+        optimizer_profile=optimizer_profile,
+    )
+    try:
+        # Two workers computing the same inputs race to insert the same key; either row is valid.
+        with db.begin_nested():
+            db.add(row)
+    except IntegrityError:
+        pass
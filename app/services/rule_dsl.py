@@ -1,29 +1,157 @@
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Mapping
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Optional
 
+import numpy as np
 
-def evaluate_expression(expression: dict[str, Any], state: dict[str, float]) -> tuple[bool, str]:
+COMPILED_CACHE_LIMIT = 4096
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    rule_key: str
+    rule_type: str
+    field: Optional[str]
+    op: Optional[str]
+    _test: Callable[[float], bool]
+    _test_array: Callable[[np.ndarray], np.ndarray]
+    _describe: Callable[[float], str]
+    error: Optional[str] = None
+
+    @property
+    def hard(self) -> bool:
+        return self.rule_type == "hard"
+
+    def test(self, state: Mapping[str, float]) -> bool:
+        if self.error is not None:
+            return False
+        current = state.get(self.field)
+        if current is None:
+            return False
+        return bool(self._test(current))
+
+    def test_columns(self, columns: Mapping[str, np.ndarray], size: int) -> np.ndarray:
+        values = columns.get(self.field) if self.error is None else None
+        if values is None:
+            return np.zeros(size, dtype=bool)
+        return self._test_array(np.asarray(values, dtype=np.float64))
+
+    def detail(self, state: Mapping[str, float]) -> str:
+        if self.error is not None:
+            return self.error
+        current = state.get(self.field)
+        if current is None:
+            return f"state has no field '{self.field}'"
+        return self._describe(current)
+
+    def evaluate(self, state: Mapping[str, float]) -> tuple[bool, str]:
+        return self.test(state), self.detail(state)
+
+    def check(self, state: Mapping[str, float], passed: Optional[bool] = None) -> dict[str, Any]:
+        return {
+            "rule_key": self.rule_key,
+            "rule_type": self.rule_type,
+            "passed": self.test(state) if passed is None else passed,
+            "detail": self.detail(state),
+        }
+
+
+def _never(_: Any) -> bool:
+    return False
+
+
+def _failed_rule(rule_key: str, rule_type: str, field_name: Optional[str], op: Optional[str], error: str) -> CompiledRule:
+    return CompiledRule(
+        rule_key=rule_key,
+        rule_type=rule_type,
+        field=field_name,
+        op=op,
+        _test=_never,
+        _test_array=lambda values: np.zeros(values.shape, dtype=bool),
+        _describe=lambda _: error,
+        error=error,
+    )
+
+
+def compile_expression(expression: dict[str, Any], *, rule_key: str = "", rule_type: str = "hard") -> CompiledRule:
     op = expression.get("op")
     field_name = expression.get("field")
     target = expression.get("value")
-    current = state.get(field_name)
     if field_name is None:
-        return False, "expression.field is required"
-    if current is None:
-        return False, f"state has no field '{field_name}'"
+        return _failed_rule(rule_key, rule_type, field_name, op, "expression.field is required")
+
+    def build(test: Callable[[float], bool], test_array: Callable[[np.ndarray], np.ndarray], describe: Callable[[float], str]) -> CompiledRule:
+        return CompiledRule(
+            rule_key=rule_key,
+            rule_type=rule_type,
+            field=field_name,
+            op=op,
+            _test=test,
+            _test_array=test_array,
+            _describe=describe,
+        )
+
     if op == "lte":
-        passed = current <= target
-        return passed, f"{field_name}={current:.2f} <= {target}"
+        return build(
+            lambda current: current <= target,
+            lambda values: values <= target,
+            lambda current: f"{field_name}={current:.2f} <= {target}",
+        )
     if op == "gte":
-        passed = current >= target
-        return passed, f"{field_name}={current:.2f} >= {target}"
+        return build(
+            lambda current: current >= target,
+            lambda values: values >= target,
+            lambda current: f"{field_name}={current:.2f} >= {target}",
+        )
     if op == "eq":
-        passed = abs(current - target) < 1e-9
-        return passed, f"{field_name}={current:.2f} == {target}"
+        return build(
+            lambda current: abs(current - target) < 1e-9,
+            lambda values: np.abs(values - target) < 1e-9,
+            lambda current: f"{field_name}={current:.2f} == {target}",
+        )
     if op == "between":
         low = expression.get("min")
         high = expression.get("max")
-        passed = low <= current <= high
-        return passed, f"{low} <= {field_name}={current:.2f} <= {high}"
-    return False, f"unsupported op '{op}'"
+        return build(
+            lambda current: low <= current <= high,
+            lambda values: (values >= low) & (values <= high),
+            lambda current: f"{low} <= {field_name}={current:.2f} <= {high}",
+        )
+    return _failed_rule(rule_key, rule_type, field_name, op, f"unsupported op '{op}'")
+
+
+_compiled_cache: dict[str, CompiledRule] = {}
+_compiled_cache_lock = Lock()
+
+
+def compile_rules(rule_definitions: list[Any]) -> list[CompiledRule]:
+    # Rule definitions are immutable once created, so the compiled form is cached by
+    # definition id. Ad-hoc definitions without an id (scripts, tests) compile every call.
+    compiled: list[CompiledRule] = []
+    for definition in rule_definitions:
+        definition_id = getattr(definition, "id", None)
+        rule = _compiled_cache.get(definition_id) if definition_id else None
+        if rule is None:
+            rule = compile_expression(definition.expression, rule_key=definition.rule_key, rule_type=definition.rule_type)
+            if definition_id:
+                with _compiled_cache_lock:
+                    if len(_compiled_cache) >= COMPILED_CACHE_LIMIT:
+                        _compiled_cache.pop(next(iter(_compiled_cache)))
+                    _compiled_cache[definition_id] = rule
+        compiled.append(rule)
+    return compiled
+
+
+def hard_rules_mask(rules: list[CompiledRule], columns: Mapping[str, np.ndarray], size: int) -> np.ndarray:
+    mask = np.ones(size, dtype=bool)
+    for rule in rules:
+        if rule.hard:
+            mask &= rule.test_columns(columns, size)
+    return mask
+
+
+def evaluate_expression(expression: dict[str, Any], state: dict[str, float]) -> tuple[bool, str]:
+    return compile_expression(expression).evaluate(state)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from threading import Lock
+from time import monotonic
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import RuleDefinition, RuleSet, RuleStatus
+
+IndexKey = tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class IndexedRuleSet:
+    id: str
+    country_code: str
+    jurisdiction_code: str
+    category: str
+    version: str
+    effective_from: date
+    effective_to: Optional[date]
+
+
+@dataclass(frozen=True)
+class IndexedRuleDefinition:
+    id: str
+    rule_set_id: str
+    rule_key: str
+    rule_type: str
+    expression: dict[str, Any]
+    priority: int
+
+
+@dataclass
+class _IndexEntry:
+    # Segment i covers [boundaries[i], boundaries[i + 1]); the last one is open-ended.
+    boundaries: list[date]
+    segments: list[tuple[list[IndexedRuleSet], list[IndexedRuleDefinition]]]
+    loaded_at: float
+
+
+def _build_entry(rule_sets: list[IndexedRuleSet], definitions: list[IndexedRuleDefinition]) -> _IndexEntry:
+    by_set: dict[str, list[IndexedRuleDefinition]] = {}
+    for definition in definitions:
+        by_set.setdefault(definition.rule_set_id, []).append(definition)
+
+    points: set[date] = set()
+    for rule_set in rule_sets:
+        points.add(rule_set.effective_from)
+        if rule_set.effective_to is not None:
+            points.add(rule_set.effective_to + timedelta(days=1))
+    boundaries = sorted(points)
+
+    segments: list[tuple[list[IndexedRuleSet], list[IndexedRuleDefinition]]] = []
+    for start in boundaries:
+        active = [
+            item
+            for item in rule_sets
+            if item.effective_from <= start and (item.effective_to is None or item.effective_to >= start)
+        ]
+        active.sort(key=lambda item: item.effective_from, reverse=True)
+        active_definitions = [definition for item in active for definition in by_set.get(item.id, [])]
+        active_definitions.sort(key=lambda item: item.priority)
+        segments.append((active, active_definitions))
+    return _IndexEntry(boundaries=boundaries, segments=segments, loaded_at=monotonic())
+
+
+class RuleIndex:
+    def __init__(self, ttl_s: float) -> None:
+        # Invalidation only reaches this process; the TTL bounds staleness when other
+        # workers write rule sets.
+        self.ttl_s = ttl_s
+        self._entries: dict[IndexKey, _IndexEntry] = {}
+        self._lock = Lock()
+        # Bumped by invalidate so a load that started before it is not stored.
+        self._generation = 0
+
+    def lookup(
+        self,
+        db: Session,
+        *,
+        country_code: str,
+        jurisdiction_code: str,
+        category: str,
+        evaluation_date: date,
+    ) -> tuple[list[IndexedRuleSet], list[IndexedRuleDefinition]]:
+        key = (country_code, jurisdiction_code, category)
+        entry = self._entries.get(key)
+        if entry is None or monotonic() - entry.loaded_at > self.ttl_s:
+            generation = self._generation
+            entry = self._load(db, key)
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = entry
+        position = bisect_right(entry.boundaries, evaluation_date) - 1
+        if position < 0:
+            return [], []
+        rule_sets, definitions = entry.segments[position]
+        return list(rule_sets), list(definitions)
+
+    def invalidate(self, key: Optional[IndexKey] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _load(self, db: Session, key: IndexKey) -> _IndexEntry:
+        country_code, jurisdiction_code, category = key
+        rows = db.scalars(
+            select(RuleSet)
+            .where(RuleSet.country_code == country_code)
+            .where(RuleSet.jurisdiction_code == jurisdiction_code)
+            .where(RuleSet.category == category)
+            .where(RuleSet.status == RuleStatus.ACTIVE.value)
+        ).all()
+        rule_sets = [
+            IndexedRuleSet(
+                id=row.id,
+                country_code=row.country_code,
+                jurisdiction_code=row.jurisdiction_code,
+                category=row.category,
+                version=row.version,
+                effective_from=row.effective_from,
+                effective_to=row.effective_to,
+            )
+            for row in rows
+        ]
+        definitions: list[IndexedRuleDefinition] = []
+        if rule_sets:
+            definition_rows = db.scalars(
+                select(RuleDefinition)
+                .where(RuleDefinition.rule_set_id.in_([item.id for item in rule_sets]))
+                .order_by(RuleDefinition.priority.asc(), RuleDefinition.created_at.asc())
+            ).all()
+            definitions = [
+                IndexedRuleDefinition(
+                    id=row.id,
+                    rule_set_id=row.rule_set_id,
+                    rule_key=row.rule_key,
+                    rule_type=row.rule_type,
+                    expression=row.expression,
+                    priority=row.priority,
+                )
+                for row in definition_rows
+            ]
+        return _build_entry(rule_sets, definitions)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Any, AsyncIterator, Optional
+
+from app.core.config import settings
+
+SSE_KEEPALIVE_S = 15.0
+
+
+@dataclass
+class RunEvent:
+    seq: int
+    event: str
+    data: dict[str, Any]
+
+    def to_sse(self) -> str:
+        return f"id: {self.seq}\nevent: {self.event}\ndata: {json.dumps(self.data, separators=(',', ':'), default=str)}\n\n"
+
+
+@dataclass
+class _Channel:
+    events: list[RunEvent] = field(default_factory=list)
+    lock: Lock = field(default_factory=Lock)
+    # (loop, event) per connected subscriber; publishers run on worker threads and wake
+    # them through their event loop.
+    waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(default_factory=set)
+    closed_at: Optional[float] = None
+
+    def wake(self) -> None:
+        for loop, wakeup in list(self.waiters):
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # The subscriber's loop already shut down.
+                self.waiters.discard((loop, wakeup))
+
+
+class RunEventBus:
+    # In-process only: a subscriber sees the events of runs executed by this process.
+    # Every event of a run is kept until the channel expires, so late subscribers and
+    # reconnects (Last-Event-ID) replay what they missed.
+    def __init__(self, retention_s: float) -> None:
+        self.retention_s = retention_s
+        self._channels: dict[str, _Channel] = {}
+        self._lock = Lock()
+
+    def publish(self, run_id: str, event: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._prune()
+            channel = self._channels.setdefault(run_id, _Channel())
+        with channel.lock:
+            if channel.closed_at is not None:
+                return
+            channel.events.append(RunEvent(seq=len(channel.events) + 1, event=event, data=data))
+            channel.wake()
+
+    def close(self, run_id: str) -> None:
+        with self._lock:
+            channel = self._channels.get(run_id)
+        if channel is None:
+            return
+        with channel.lock:
+            channel.closed_at = monotonic()
+            channel.wake()
+
+    def has_channel(self, run_id: str) -> bool:
+        with self._lock:
+            return run_id in self._channels
+
+    async def subscribe(self, run_id: str, *, after: int = 0, timeout: float = SSE_KEEPALIVE_S) -> AsyncIterator[Optional[RunEvent]]:
+        # Yields None whenever no event arrived within the timeout, so the caller can
+        # write a keep-alive; ends once the channel is closed and fully replayed.
+        # Waiting happens on the event loop, so an idle subscriber holds no thread.
+        with self._lock:
+            channel = self._channels.get(run_id)
+        if channel is None:
+            return
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        wakeup = waiter[1]
+        with channel.lock:
+            channel.waiters.add(waiter)
+        try:
+            position = max(0, after)
+            while True:
+                with channel.lock:
+                    pending = channel.events[position:]
+                    closed = channel.closed_at is not None
+                    if not pending and not closed:
+                        # Cleared under the lock, so any later publish sets it again.
+                        wakeup.clear()
+                if not pending and not closed:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        yield None
+                    continue
+                position += len(pending)
+                for event in pending:
+                    yield event
+                if closed:
+                    return
+        finally:
+            with channel.lock:
+                channel.waiters.discard(waiter)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._channels.clear()
+
+    def _prune(self) -> None:
+        expired = monotonic() - self.retention_s
+        for run_id in [key for key, channel in self._channels.items() if channel.closed_at is not None and channel.closed_at < expired]:
+            del self._channels[run_id]
+
+
+run_events = RunEventBus(settings.run_event_retention_s)
+
+
+async def run_event_stream(run_id: str, *, status: str, after: int = 0) -> AsyncIterator[str]:
+    # Runs this process is not tracking (finished before the retention window, or run
+    # by another process) get a single status event from the stored row.
+    if not run_events.has_channel(run_id):
+        yield RunEvent(seq=after + 1, event="status", data={"status": status}).to_sse()
+        return
+    async for event in run_events.subscribe(run_id, after=after):
+        yield ": keep-alive\n\n" if event is None else event.to_sse()
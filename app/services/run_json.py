@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any, Union
+
+import numpy as np
+import orjson
+
+from app.models import DesignOption, DesignRun
+from app.services.solar import SolarColumns
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(value: Any) -> bytes:
+    # Same datetime rendering as the RunRead model: UTC as "Z", naive values as-is.
+    return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+
+
+def option_fragment(option: DesignOption, *, include_mesh: bool = False) -> bytes:
+    # Stored JSON columns were written by the optimizer, so they are encoded without
+    # re-validating them through DesignOptionRead.
+    return dumps(
+        {
+            "id": option.id,
+            "rank": option.rank,
+            "option_type": option.option_type,
+            "score": option.score,
+            "parameters": option.parameters,
+            "checks": option.checks,
+            "mesh_payload": option.mesh_payload if include_mesh else None,
+        }
+    )
+
+
+def solar_fragment(series: Union[SolarColumns, list[dict]]) -> bytes:
+    if not isinstance(series, SolarColumns):
+        return dumps(series)
+    # Packed series are encoded column by column, with no datetime object per sample.
+    rounded = series.rounded()
+    timestamps = np.char.add(np.datetime_as_string(rounded.timestamps.astype("datetime64[s]"), unit="s"), "Z").tolist()
+    return dumps(
+        [
+            {
+                "timestamp_utc": timestamp,
+                "sun_altitude": altitude,
+                "sun_azimuth": azimuth,
+                "insolation_kwh_m2": insolation,
+                "shadow_ratio": shadow,
+            }
+            for timestamp, altitude, azimuth, insolation, shadow in zip(
+                timestamps,
+                rounded.sun_altitude.tolist(),
+                rounded.sun_azimuth.tolist(),
+                rounded.insolation_kwh_m2.tolist(),
+                rounded.shadow_ratio.tolist(),
+            )
+        ]
+    )
+
+
+def run_document(run: DesignRun, option_fragments: list[bytes], solar_fragments: dict[str, bytes]) -> bytes:
+    # Field order and shapes follow RunRead, so either path yields the same document.
+    header = dumps(
+        {
+            "id": run.id,
+            "project_id": run.project_id,
+            "snapshot_id": run.snapshot_id,
+            "objective": run.objective,
+            "status": run.status,
+            "started_at": run.started_at,
+            "completed_at": run.completed_at,
+            "error_message": run.error_message,
+        }
+    )
+    solar = b",".join(dumps(option_id) + b":" + fragment for option_id, fragment in solar_fragments.items())
+    return b"".join([header[:-1], b',"options":[', b",".join(option_fragments), b'],"solar":{', solar, b"}}"])
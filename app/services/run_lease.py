@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from threading import Event, Thread
+from typing import Callable, Optional
+from uuid import uuid4
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Identifies this API process as the owner of the runs it queued.
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+def lease_deadline() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.run_lease_s)
+
+
+class RunLeaseKeeper:
+    # Every process renews the leases of its own queued/running runs and fails runs whose
+    # owner stopped renewing, so a restart or a sibling worker never fails live runs.
+    def __init__(self, lease_s: float) -> None:
+        self.interval_s = max(1.0, lease_s / 4.0)
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self, tick: Callable[[], None]) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._loop, args=(tick,), name="buildit-run-lease", daemon=True)
+        self._thread.start()
+
+    def _loop(self, tick: Callable[[], None]) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                tick()
+            except Exception:  # noqa: BLE001
+                logger.exception("run lease maintenance failed")
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=self.interval_s)
+
+
+run_lease_keeper = RunLeaseKeeper(settings.run_lease_s)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from app.services.geometry import PreparedPolygon
+from app.services.solar import SolarColumns
+
+SHADOW_GRID_CELLS = 48
+# Sun positions are bucketed to this resolution so repeated positions (the model's
+# azimuth depends only on the hour) are shadow-cast once.
+SUN_QUANTUM_DEG = 0.25
+
+
+def mesh_boxes(mesh_payload: dict) -> np.ndarray:
+    # Axis-aligned boxes as rows of (x, z, width, depth, base_y, top_y); x east, z north.
+    mesh_type = mesh_payload.get("type")
+    rows: list[tuple[float, float, float, float, float, float]] = []
+    if mesh_type == "multi_block":
+        prototype = mesh_payload.get("prototype")
+        for x, z, scale_y in mesh_payload.get("instances", []) if prototype else []:
+            rows.append((x, z, prototype["width"], prototype["depth"], 0.0, prototype["height"] * scale_y))
+        # Options stored before instancing list every block in full.
+        for block in mesh_payload.get("blocks", []):
+            rows.append((block["x"], block["z"], block["width"], block["depth"], 0.0, block["height"]))
+    elif mesh_type == "stacked":
+        for segment in mesh_payload.get("segments", []):
+            base = segment.get("base_y", 0.0)
+            rows.append((0.0, 0.0, segment["width"], segment["depth"], base, base + segment["height"]))
+    elif mesh_type == "courtyard":
+        outer_w, outer_d = mesh_payload["outer_width"], mesh_payload["outer_depth"]
+        inner_w, inner_d = mesh_payload["inner_width"], mesh_payload["inner_depth"]
+        height = mesh_payload["height"]
+        wing_d = (outer_d - inner_d) / 2.0
+        wing_w = (outer_w - inner_w) / 2.0
+        rows.append((0.0, (outer_d + inner_d) / 4.0, outer_w, wing_d, 0.0, height))
+        rows.append((0.0, -(outer_d + inner_d) / 4.0, outer_w, wing_d, 0.0, height))
+        rows.append(((outer_w + inner_w) / 4.0, 0.0, wing_w, inner_d, 0.0, height))
+        rows.append((-(outer_w + inner_w) / 4.0, 0.0, wing_w, inner_d, 0.0, height))
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+
+
+@dataclass
+class ShadowGrid:
+    origin_x: float
+    origin_z: float
+    cell_size: float
+    heights: np.ndarray
+    open_site: np.ndarray
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.heights.shape
+
+
+def shadow_grid(boxes: np.ndarray, polygon: PreparedPolygon, *, max_cells_per_side: int = SHADOW_GRID_CELLS) -> ShadowGrid:
+    # Covers the site and every box so obstacles outside the ring still cast onto it.
+    min_x, max_x = float(polygon.min_x), float(polygon.max_x)
+    min_z, max_z = float(polygon.min_z), float(polygon.max_z)
+    if len(boxes):
+        min_x = min(min_x, float((boxes[:, 0] - boxes[:, 2] / 2.0).min()))
+        max_x = max(max_x, float((boxes[:, 0] + boxes[:, 2] / 2.0).max()))
+        min_z = min(min_z, float((boxes[:, 1] - boxes[:, 3] / 2.0).min()))
+        max_z = max(max_z, float((boxes[:, 1] + boxes[:, 3] / 2.0).max()))
+    cell_size = max(max_x - min_x, max_z - min_z, 1e-6) / max_cells_per_side
+    nx = max(1, int(np.ceil((max_x - min_x) / cell_size)))
+    nz = max(1, int(np.ceil((max_z - min_z) / cell_size)))
+    centre_x = min_x + (np.arange(nx) + 0.5) * cell_size
+    centre_z = min_z + (np.arange(nz) + 0.5) * cell_size
+
+    heights = np.zeros((nz, nx))
+    if len(boxes):
+        # Stacked segments rest on the ones below, so each column is solid up to its top.
+        inside_x = np.abs(centre_x[None, :] - boxes[:, 0:1]) <= boxes[:, 2:3] / 2.0
+        inside_z = np.abs(centre_z[None, :] - boxes[:, 1:2]) <= boxes[:, 3:4] / 2.0
+        covered = inside_z[:, :, None] & inside_x[:, None, :]
+        heights = np.where(covered, boxes[:, 5, None, None], 0.0).max(axis=0)
+
+    grid_x, grid_z = np.meshgrid(centre_x, centre_z)
+    open_site = polygon.contains_points(grid_x, grid_z).reshape(nz, nx) & (heights <= 0.0)
+    return ShadowGrid(origin_x=min_x, origin_z=min_z, cell_size=cell_size, heights=heights, open_site=open_site)
+
+
+def shadow_masks(grid: ShadowGrid, altitudes: np.ndarray, azimuths: np.ndarray) -> np.ndarray:
+    # Shift-and-compare: a cell is shaded when the column found k cells toward the sun
+    # (one cell per step along the major axis) rises above the sun ray at that distance.
+    # Evaluated from the occupied columns outward, since they are a small share of the grid.
+    altitudes = np.asarray(altitudes, dtype=np.float64).ravel()
+    azimuths = np.asarray(azimuths, dtype=np.float64).ravel()
+    nz, nx = grid.shape
+    shaded = np.zeros((len(altitudes), nz, nx), dtype=bool)
+    shaded[altitudes <= 0.0] = True
+    occupied_z, occupied_x = np.nonzero(grid.heights > 0.0)
+    if occupied_z.size == 0:
+        return shaded
+    column_heights = grid.heights[occupied_z, occupied_x]
+
+    lit = np.nonzero(altitudes > 0.0)[0]
+    az = np.radians(azimuths[lit])
+    dx, dz = np.sin(az), np.cos(az)
+    major = np.maximum(np.abs(dx), np.abs(dz))
+    step_x, step_z = dx / major, dz / major
+    rise = (grid.cell_size / major) * np.tan(np.radians(altitudes[lit]))
+
+    flat = shaded.reshape(-1)
+    for step in range(1, nz + nx + 1):
+        active = np.nonzero(rise * step < column_heights.max())[0]
+        if active.size == 0:
+            break
+        target_z = occupied_z[None, :] - np.rint(step * step_z[active]).astype(np.int64)[:, None]
+        target_x = occupied_x[None, :] - np.rint(step * step_x[active]).astype(np.int64)[:, None]
+        hit = (column_heights[None, :] > (rise[active] * step)[:, None]) & (target_z >= 0) & (target_z < nz) & (target_x >= 0) & (target_x < nx)
+        sample = np.broadcast_to(lit[active][:, None], hit.shape)[hit]
+        flat[(sample * nz + target_z[hit]) * nx + target_x[hit]] = True
+    return shaded
+
+
+@dataclass
+class ShadowResult:
+    grid: ShadowGrid
+    sunlit_hours: np.ndarray
+    shaded_ratio: np.ndarray
+
+    def summary(self) -> dict[str, Any]:
+        open_site = self.grid.open_site
+        # Cells outside the site or under a building are reported as null.
+        sunlit: list[list[Optional[float]]] = [
+            [value if keep else None for value, keep in zip(values, keeps)]
+            for values, keeps in zip(np.round(self.sunlit_hours, 2).tolist(), open_site.tolist())
+        ]
+        return {
+            "origin": [round(self.grid.origin_x, 3), round(self.grid.origin_z, 3)],
+            "cell_size_m": round(self.grid.cell_size, 4),
+            "shape": list(self.grid.shape),
+            "mean_shaded_ratio": round(float(self.shaded_ratio.mean()), 4) if self.shaded_ratio.size else 0.0,
+            "mean_sunlit_hours": round(float(self.sunlit_hours[open_site].mean()), 3) if open_site.any() else 0.0,
+            "sunlit_hours": sunlit,
+        }
+
+
+def cast_shadows(
+    mesh_payload: dict,
+    polygon: PreparedPolygon,
+    solar: SolarColumns,
+    *,
+    sample_hours: np.ndarray,
+    max_cells_per_side: int = SHADOW_GRID_CELLS,
+) -> ShadowResult:
+    # sample_hours holds the hours each solar sample stands for (solar.sample_hours).
+    grid = shadow_grid(mesh_boxes(mesh_payload), polygon, max_cells_per_side=max_cells_per_side)
+    altitudes = np.where(solar.sun_altitude > 0.0, np.round(solar.sun_altitude / SUN_QUANTUM_DEG) * SUN_QUANTUM_DEG, 0.0)
+    azimuths = np.round(solar.sun_azimuth / SUN_QUANTUM_DEG) * SUN_QUANTUM_DEG
+    positions, inverse = np.unique(np.stack([altitudes, azimuths], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    masks = shadow_masks(grid, positions[:, 0], positions[:, 1])
+
+    open_cells = max(int(grid.open_site.sum()), 1)
+    shaded_ratio = (masks & grid.open_site).sum(axis=(1, 2)) / open_cells
+    position_hours = np.bincount(inverse, weights=np.broadcast_to(sample_hours, inverse.shape), minlength=len(positions))
+    sunlit_hours = np.tensordot(position_hours, ~masks, axes=1)
+    return ShadowResult(grid=grid, sunlit_hours=sunlit_hours, shaded_ratio=shaded_ratio[inverse])
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from datetime import date, timezone
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+SOLAR_MODES = {"hours", "dates", "seasonal", "annual"}
+SOLAR_STORAGE_MODES = {"columnar", "rows"}
+ANNUAL_HOURS = tuple(range(24))
+# Packed series: magic + sample count, then int64 epoch seconds and four float64 columns.
+PACKED_HEADER = struct.Struct("<4sI")
+PACKED_MAGIC = b"SLR1"
+
+
+@dataclass
+class SolarColumns:
+    timestamps: np.ndarray
+    sun_altitude: np.ndarray
+    sun_azimuth: np.ndarray
+    insolation_kwh_m2: np.ndarray
+    shadow_ratio: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    def rows(self, shadow_ratio: Optional[np.ndarray] = None) -> list[dict]:
+        # Per-sample dicts with the rounding the stored profile has always used. A
+        # massing-aware shadow_ratio series replaces the altitude-only estimate.
+        rounded = self.rounded(shadow_ratio)
+        timestamps = [item.replace(tzinfo=timezone.utc) for item in self.timestamps.astype("datetime64[us]").tolist()]
+        return [
+            {
+                "timestamp_utc": timestamp,
+                "sun_altitude": altitude,
+                "sun_azimuth": azimuth,
+                "insolation_kwh_m2": insolation,
+                "shadow_ratio": shadow,
+            }
+            for timestamp, altitude, azimuth, insolation, shadow in zip(
+                timestamps,
+                rounded.sun_altitude.tolist(),
+                rounded.sun_azimuth.tolist(),
+                rounded.insolation_kwh_m2.tolist(),
+                rounded.shadow_ratio.tolist(),
+            )
+        ]
+
+    def rounded(self, shadow_ratio: Optional[np.ndarray] = None) -> "SolarColumns":
+        return SolarColumns(
+            timestamps=self.timestamps,
+            sun_altitude=np.round(self.sun_altitude, 3),
+            sun_azimuth=np.round(self.sun_azimuth, 3),
+            insolation_kwh_m2=np.round(self.insolation_kwh_m2, 4),
+            shadow_ratio=np.round(self.shadow_ratio if shadow_ratio is None else shadow_ratio, 4),
+        )
+
+    def pack(self) -> bytes:
+        header = PACKED_HEADER.pack(PACKED_MAGIC, len(self))
+        seconds = self.timestamps.astype("datetime64[s]").astype("<i8")
+        values = np.stack([self.sun_altitude, self.sun_azimuth, self.insolation_kwh_m2, self.shadow_ratio]).astype("<f8")
+        return header + seconds.tobytes() + values.tobytes()
+
+    def summary(self) -> dict[str, Any]:
+        sunlit = self.sun_altitude > 0.0
+        return {
+            "sample_count": len(self),
+            "sunlit_samples": int(sunlit.sum()),
+            "insolation_kwh_m2_total": round(float(self.insolation_kwh_m2.sum()), 4),
+            "mean_sun_altitude": round(float(self.sun_altitude[sunlit].mean()), 3) if sunlit.any() else 0.0,
+            "mean_shadow_ratio": round(float(self.shadow_ratio.mean()), 4) if len(self) else 0.0,
+        }
+
+
+def unpack_solar_columns(payload: bytes) -> SolarColumns:
+    magic, count = PACKED_HEADER.unpack_from(payload)
+    if magic != PACKED_MAGIC:
+        raise ValueError("unrecognized solar series encoding")
+    offset = PACKED_HEADER.size
+    seconds = np.frombuffer(payload, dtype="<i8", count=count, offset=offset)
+    values = np.frombuffer(payload, dtype="<f8", count=4 * count, offset=offset + 8 * count).reshape(4, count)
+    return SolarColumns(
+        timestamps=seconds.astype("datetime64[s]"),
+        sun_altitude=values[0],
+        sun_azimuth=values[1],
+        insolation_kwh_m2=values[2],
+        shadow_ratio=values[3],
+    )
+
+
+def annual_dates(year: int) -> np.ndarray:
+    return np.arange(np.datetime64(f"{year}-01-01"), np.datetime64(f"{year + 1}-01-01"), dtype="datetime64[D]")
+
+
+def seasonal_dates(year: int) -> np.ndarray:
+    # Spring equinox, summer solstice, autumn equinox, winter solstice.
+    return np.array([f"{year}-03-20", f"{year}-06-21", f"{year}-09-22", f"{year}-12-21"], dtype="datetime64[D]")
+
+
+def solar_sample_dates(mode: str, evaluation_date: date, dates: Optional[Sequence[date]] = None) -> np.ndarray:
+    if mode == "hours":
+        return np.array([evaluation_date], dtype="datetime64[D]")
+    if mode == "dates":
+        return np.array(sorted(dates or [evaluation_date]), dtype="datetime64[D]")
+    if mode == "seasonal":
+        return seasonal_dates(evaluation_date.year)
+    if mode == "annual":
+        return annual_dates(evaluation_date.year)
+    raise ValueError(f"unsupported solar_mode '{mode}'")
+
+
+def sample_hours(hours: Sequence[float], date_count: int) -> np.ndarray:
+    # Hours of daylight each sample stands for: half the gap to each neighbouring sample
+    # of the same day, with the end samples mirroring their inner gap. A lone sample
+    # counts as one hour. Laid out date-major like solar_columns.
+    hour_values = np.asarray(hours, dtype=np.float64).ravel()
+    if hour_values.size < 2:
+        weights = np.ones(hour_values.size)
+    else:
+        order = np.argsort(hour_values, kind="stable")
+        gaps = np.diff(hour_values[order])
+        sorted_weights = (np.concatenate([gaps[:1], gaps]) + np.concatenate([gaps, gaps[-1:]])) / 2.0
+        weights = np.empty_like(hour_values)
+        weights[order] = sorted_weights
+    return np.tile(weights, date_count)
+
+
+def solar_columns(latitude: float, longitude: float, dates: Sequence[date] | np.ndarray, hours: Sequence[float]) -> SolarColumns:
+    # Samples are date-major: every hour of the first date, then the next date.
+    day_values = np.asarray(dates, dtype="datetime64[D]").ravel()
+    hour_values = np.asarray(hours, dtype=np.float64).ravel()
+    if hour_values.size and ((hour_values < 0.0) | (hour_values >= 24.0)).any():
+        raise ValueError("hours must be within [0, 24)")
+
+    day_of_year = (day_values - day_values.astype("datetime64[Y]")).astype(np.int64) + 1
+    decl = 23.44 * np.sin((2 * np.pi / 365.0) * (day_of_year - 81))
+    longitude_shift = (longitude - 127.0) / 30.0
+
+    hour_angle = ((hour_values + longitude_shift) - 12) * 15
+    altitude = np.maximum(
+        0.0,
+        52.0 * np.cos((hour_angle / 180.0) * np.pi)[None, :] * (1 - abs(latitude) / 130.0) + (decl / 2.8)[:, None],
+    )
+    azimuth = np.broadcast_to((180.0 + hour_angle) % 360.0, altitude.shape)
+    insolation = np.maximum(0.0, altitude / 90.0) * 0.95
+    shadow_ratio = np.clip(1.0 - altitude / 72.0, 0.0, 1.0)
+
+    offsets = np.round(hour_values * 3600.0).astype(np.int64).astype("timedelta64[s]")
+    timestamps = day_values.astype("datetime64[s]")[:, None] + offsets[None, :]
+    return SolarColumns(
+        timestamps=timestamps.ravel(),
+        sun_altitude=altitude.ravel(),
+        sun_azimuth=np.ascontiguousarray(azimuth).ravel(),
+        insolation_kwh_m2=insolation.ravel(),
+        shadow_ratio=shadow_ratio.ravel(),
+    )
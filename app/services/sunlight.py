@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from datetime import date
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from app.services.solar import SolarColumns, solar_columns
+
+SOLSTICE_WINDOW_HOURS = (9.0, 15.0)
+SOLSTICE_STEP_MINUTES = 5
+BOUNDARY_SPACING_M = 2.0
+# Outward offsets of the sample rows: on the boundary and inside the neighbouring lot.
+NEIGHBOR_OFFSETS_M = (0.0, 4.0)
+# Edges whose outward normal points within 60 degrees of north.
+NORTH_FACING_MIN = 0.5
+
+
+# Sun positions depend only on the site and year, so repeated runs share them.
+@lru_cache(maxsize=64)
+def winter_solstice_samples(
+    latitude: float,
+    longitude: float,
+    year: int,
+    *,
+    window_hours: tuple[float, float] = SOLSTICE_WINDOW_HOURS,
+    step_minutes: int = SOLSTICE_STEP_MINUTES,
+) -> SolarColumns:
+    start, end = window_hours
+    hours = np.arange(start, end + 1e-9, step_minutes / 60.0)
+    return solar_columns(latitude, longitude, [date(year, 12, 21)], hours)
+
+
+def north_boundary_points(
+    ring: Sequence[tuple[float, float]],
+    *,
+    spacing_m: float = BOUNDARY_SPACING_M,
+    offsets_m: Sequence[float] = NEIGHBOR_OFFSETS_M,
+) -> tuple[np.ndarray, np.ndarray]:
+    points = np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+    if len(points) < 3:
+        return np.zeros(0), np.zeros(0)
+    if not np.array_equal(points[0], points[-1]):
+        points = np.vstack([points, points[:1]])
+    start, end = points[:-1], points[1:]
+    edge = end - start
+    length = np.hypot(edge[:, 0], edge[:, 1])
+    twice_area = float(np.sum(start[:, 0] * end[:, 1] - end[:, 0] * start[:, 1]))
+    orientation = 1.0 if twice_area >= 0.0 else -1.0
+    normal = orientation * np.stack([edge[:, 1], -edge[:, 0]], axis=1) / np.maximum(length, 1e-9)[:, None]
+
+    north = np.nonzero((normal[:, 1] >= NORTH_FACING_MIN) & (length > 1e-6))[0]
+    if north.size == 0:
+        return np.zeros(0), np.zeros(0)
+    counts = np.maximum(1, np.ceil(length[north] / spacing_m).astype(np.int64))
+    edge_ids = np.repeat(north, counts)
+    # Midpoints of equal sub-segments, so shared corners are not sampled twice.
+    fraction = (np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts) + 0.5) / np.repeat(counts, counts)
+    base = start[edge_ids] + edge[edge_ids] * fraction[:, None]
+    offsets = np.asarray(offsets_m, dtype=np.float64)
+    samples = base[None, :, :] + offsets[:, None, None] * normal[edge_ids][None, :, :]
+    return samples[:, :, 0].ravel(), samples[:, :, 1].ravel()
+
+
+def continuous_sun_hours(
+    boxes: np.ndarray,
+    xs: np.ndarray,
+    zs: np.ndarray,
+    altitudes: np.ndarray,
+    azimuths: np.ndarray,
+    *,
+    step_hours: float,
+    sample_height: float = 0.0,
+) -> np.ndarray:
+    # Slab test of every (time, point) ray toward the sun against every box, then the
+    # longest span between consecutive sunlit samples per point.
+    xs = np.asarray(xs, dtype=np.float64).ravel()
+    zs = np.asarray(zs, dtype=np.float64).ravel()
+    alt = np.radians(np.asarray(altitudes, dtype=np.float64).ravel())
+    az = np.radians(np.asarray(azimuths, dtype=np.float64).ravel())
+    sunlit = np.broadcast_to((alt > 0.0)[:, None], (alt.size, xs.size)).copy()
+    # Only daytime samples can be shaded; night ones are already unlit.
+    lit = np.nonzero(alt > 0.0)[0]
+    if len(boxes) and xs.size and lit.size:
+        boxes = boxes[_may_shade(boxes, xs, zs, alt[lit], az[lit], sample_height)]
+    if len(boxes) and xs.size and lit.size:
+        sunlit[lit] = ~_rays_blocked(boxes, xs, zs, alt[lit], az[lit], sample_height)
+
+    steps = np.arange(alt.size)[:, None]
+    last_shaded = np.maximum.accumulate(np.where(sunlit, -1, steps), axis=0)
+    longest = (steps - last_shaded).max(axis=0, initial=0) if alt.size else np.zeros(xs.size, dtype=np.int64)
+    return np.maximum(longest - 1, 0) * step_hours
+
+
+def _rays_blocked(boxes: np.ndarray, xs: np.ndarray, zs: np.ndarray, alt: np.ndarray, az: np.ndarray, sample_height: float) -> np.ndarray:
+    # (time, point) mask of rays that hit a box. Every altitude is above the horizon, so
+    # the vertical slab only depends on time and box; a horizontal component of zero
+    # gives infinite inverse distances, which the min/max below resolve as "inside" or
+    # "never enters" the slab.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_y = 1.0 / np.sin(alt)[:, None, None]
+        y_low = (boxes[:, 4][None, None, :] - sample_height) * inv_y
+        y_high = (boxes[:, 5][None, None, :] - sample_height) * inv_y
+        t_near = np.maximum(np.minimum(y_low, y_high), 0.0)
+        t_far = np.maximum(y_low, y_high)
+        for centre, size, origin, component in ((0, 2, xs, np.sin(az)), (1, 3, zs, np.cos(az))):
+            inv = (1.0 / (component * np.cos(alt)))[:, None, None]
+            low = (boxes[:, centre] - boxes[:, size] / 2.0)[None, :] - origin[:, None]
+            high = (boxes[:, centre] + boxes[:, size] / 2.0)[None, :] - origin[:, None]
+            t1 = low[None, :, :] * inv
+            t2 = high[None, :, :] * inv
+            t_near = np.maximum(t_near, np.minimum(t1, t2))
+            t_far = np.minimum(t_far, np.maximum(t1, t2))
+    return ((t_near <= t_far) & (t_far > 0.0)).any(axis=2)
+
+
+def _may_shade(boxes: np.ndarray, xs: np.ndarray, zs: np.ndarray, alt: np.ndarray, az: np.ndarray, sample_height: float) -> np.ndarray:
+    # Conservative cull before the slab test: a box can only block a point that lies in
+    # its shadow, which stays inside the footprint swept away from the sun by the
+    # distance at which the ray clears the box top. Boxes whose swept bounds hold no
+    # sample point are dropped.
+    reach = np.maximum(boxes[:, 5] - sample_height, 0.0)[None, :] / np.tan(alt)[:, None]
+    shift_x = -np.sin(az)[:, None] * reach
+    shift_z = -np.cos(az)[:, None] * reach
+    x_low = boxes[:, 0] - boxes[:, 2] / 2.0 + np.minimum(shift_x.min(axis=0), 0.0)
+    x_high = boxes[:, 0] + boxes[:, 2] / 2.0 + np.maximum(shift_x.max(axis=0), 0.0)
+    z_low = boxes[:, 1] - boxes[:, 3] / 2.0 + np.minimum(shift_z.min(axis=0), 0.0)
+    z_high = boxes[:, 1] + boxes[:, 3] / 2.0 + np.maximum(shift_z.max(axis=0), 0.0)
+    inside = (xs[:, None] >= x_low) & (xs[:, None] <= x_high) & (zs[:, None] >= z_low) & (zs[:, None] <= z_high)
+    return inside.any(axis=0)
+
+
+def min_continuous_sun_hours(boxes: np.ndarray, ring: Sequence[tuple[float, float]], solstice: SolarColumns) -> float:
+    step_hours = float((solstice.timestamps[1] - solstice.timestamps[0]) / np.timedelta64(1, "h")) if len(solstice) > 1 else 0.0
+    xs, zs = north_boundary_points(ring)
+    if xs.size == 0:
+        return max(len(solstice) - 1, 0) * step_hours
+    hours = continuous_sun_hours(boxes, xs, zs, solstice.sun_altitude, solstice.sun_azimuth, step_hours=step_hours)
+    return float(hours.min())
@@ -80,12 +80,18 @@ CREATE TABLE IF NOT EXISTS project_rule_snapshots (
     evaluation_date DATE NOT NULL,
     frozen_rule_set_ids UUID[] NOT NULL,
     frozen_rule_definition_ids UUID[] NOT NULL,
+    content_hash TEXT,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+ALTER TABLE project_rule_snapshots ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
 CREATE INDEX IF NOT EXISTS idx_project_rule_snapshots_project
     ON project_rule_snapshots (project_id, evaluation_date);
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_project_rule_snapshots_content_hash
+    ON project_rule_snapshots (content_hash);
+
 CREATE TABLE IF NOT EXISTS design_runs (
     id UUID PRIMARY KEY,
     project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
@@ -94,9 +100,14 @@ CREATE TABLE IF NOT EXISTS design_runs (
     status TEXT NOT NULL CHECK (status IN ('queued', 'running', 'completed', 'failed')),
     started_at TIMESTAMPTZ,
     completed_at TIMESTAMPTZ,
-    error_message TEXT
+    error_message TEXT,
+    owner_id TEXT,
+    lease_expires_at TIMESTAMPTZ
 );
 
+ALTER TABLE design_runs ADD COLUMN IF NOT EXISTS owner_id TEXT;
+ALTER TABLE design_runs ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
 CREATE TABLE IF NOT EXISTS design_options (
     id UUID PRIMARY KEY,
     run_id UUID NOT NULL REFERENCES design_runs(id) ON DELETE CASCADE,
@@ -120,3 +131,34 @@ CREATE TABLE IF NOT EXISTS solar_results (
 );
 
 CREATE INDEX IF NOT EXISTS idx_solar_results_option_time ON solar_results (option_id, timestamp_utc);
+
+CREATE TABLE IF NOT EXISTS solar_series (
+    option_id UUID PRIMARY KEY REFERENCES design_options(id) ON DELETE CASCADE,
+    sample_count INTEGER NOT NULL,
+    payload BYTEA NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS option_meshes (
+    option_id UUID PRIMARY KEY REFERENCES design_options(id) ON DELETE CASCADE,
+    box_count INTEGER NOT NULL,
+    payload BYTEA NOT NULL,
+    coarse_payload BYTEA
+);
+
+ALTER TABLE option_meshes ADD COLUMN IF NOT EXISTS coarse_payload BYTEA;
+
+CREATE TABLE IF NOT EXISTS run_profiles (
+    run_id UUID PRIMARY KEY REFERENCES design_runs(id) ON DELETE CASCADE,
+    wall_ms DOUBLE PRECISION NOT NULL,
+    top_functions JSONB NOT NULL,
+    stats BYTEA NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS optimizer_results (
+    cache_key TEXT PRIMARY KEY,
+    engine_version TEXT NOT NULL,
+    options JSONB NOT NULL,
+    optimizer_profile JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
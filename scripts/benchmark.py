@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, SessionLocal
+from app.schemas import EvaluateRequest, ProjectCreate, RuleDefinitionCreate, RuleSetCreate
+from app.services.optimizer import _buildable_mask, _layout_blocks_within_polygon, compute_solar_profile, optimize_options, prepare_site
+from app.services.orchestrator import (
+    completed_run_cache,
+    completed_run_json_cache,
+    create_project,
+    create_rule_definition,
+    create_ruleset,
+    create_user,
+    get_run_json,
+    get_run_response,
+    run_evaluation,
+)
+
+DEFAULT_BASELINE = ROOT_DIR / 'benchmarks' / 'baseline.json'
+SITE_CENTRE = (126.9798, 37.5730)
+SITE_RADIUS_M = 70.0
+# Medians within this many milliseconds of the baseline are treated as noise.
+NOISE_FLOOR_MS = 0.5
+
+VERTEX_COUNTS = {'convex': [4, 16, 128, 1024, 5000], 'concave': [8, 128, 1024, 5000]}
+RULE_COUNTS = [4, 50, 500]
+OCCUPANCY_TYPES = ['residential', 'mixed_use', 'office']
+HOUR_COUNTS = [3, 24, 96, 1440]
+RUN_SOLAR_MODES = [('hours', 3), ('hours', 24), ('seasonal', 24), ('annual', 24)]
+QUICK_LIMITS = {'vertices': 1024, 'rules': 50, 'hours': 96}
+
+BASE_RULES = [
+    ('max_far', 'far', 'lte', 550, 'hard'),
+    ('max_height', 'height', 'lte', 72, 'hard'),
+    ('max_coverage', 'coverage', 'lte', 60, 'hard'),
+    ('min_open_space', 'open_space', 'gte', 22, 'soft'),
+]
+# Loose soft limits that every candidate passes, so extra rules cost evaluation time only.
+FILLER_RULES = [
+    ('block_count', 'lte', 64),
+    ('max_block_length', 'lte', 500),
+    ('min_block_spacing', 'gte', 0),
+    ('articulation_index', 'lte', 100),
+    ('sky_exposure', 'lte', 90),
+    ('min_continuous_sun_hours', 'gte', 0),
+]
+
+
+@dataclass
+class Case:
+    case_id: str
+    params: dict[str, Any]
+    fn: Callable[[], Any]
+    setup: Optional[Callable[[], None]] = None
+
+
+def site_geojson(vertices: int, shape: str) -> dict:
+    # Regular polygon around Jongno; concave sites pull every other vertex inward
+    # with a seeded jitter, giving a notched, irregular ring.
+    angles = np.linspace(0.0, 2.0 * np.pi, vertices, endpoint=False)
+    radii = np.full(vertices, SITE_RADIUS_M)
+    if shape == 'concave':
+        rng = np.random.default_rng(vertices)
+        radii = radii * np.where(np.arange(vertices) % 2 == 0, 1.0, 0.55) * rng.uniform(0.9, 1.1, vertices)
+    lng, lat = SITE_CENTRE
+    xs = lng + radii * np.cos(angles) / (111_320.0 * np.cos(np.radians(lat)))
+    ys = lat + radii * np.sin(angles) / 110_540.0
+    ring = [[round(float(x), 7), round(float(y), 7)] for x, y in zip(xs, ys)]
+    return {'type': 'Polygon', 'coordinates': [ring + [ring[0]]]}
+
+
+def rule_definitions(count: int) -> list[SimpleNamespace]:
+    rules = [
+        SimpleNamespace(rule_key=key, expression={'op': op, 'field': field, 'value': value}, rule_type=rule_type)
+        for key, field, op, value, rule_type in BASE_RULES[:count]
+    ]
+    for idx in range(count - len(rules)):
+        field, op, value = FILLER_RULES[idx % len(FILLER_RULES)]
+        rules.append(SimpleNamespace(rule_key=f'bench_{field}_{idx}', expression={'op': op, 'field': field, 'value': value + idx}, rule_type='soft'))
+    return rules
+
+
+REQUIREMENTS = [
+    SimpleNamespace(key='far', min_value=300.0, max_value=550.0),
+    SimpleNamespace(key='height', min_value=None, max_value=72.0),
+]
+AESTHETIC_INPUTS = [
+    SimpleNamespace(category='massing', content='주변 스카이라인과 조화', reference_url=None, weight=1.0),
+    SimpleNamespace(category='street', content='보행 친화 저층부', reference_url=None, weight=1.1),
+]
+
+
+def optimizer_case(vertices: int, shape: str, rules: int, occupancy: str) -> Case:
+    site = site_geojson(vertices, shape)
+    definitions = rule_definitions(rules)
+
+    def run() -> Any:
+        return optimize_options(
+            rule_definitions=definitions,
+            requirements=REQUIREMENTS,
+            objective='maximize_far',
+            site_geojson=site,
+            country_code='KR',
+            occupancy_type=occupancy,
+            aesthetic_inputs=AESTHETIC_INPUTS,
+            evaluation_date=date(2026, 3, 1),
+        )
+
+    params = {'vertices': vertices, 'shape': shape, 'rules': rules, 'occupancy': occupancy}
+    return Case(f'optimize_options/{_label(params)}', params, run)
+
+
+def layout_case(vertices: int, shape: str) -> Case:
+    # The buildable mask is rasterized per site, so it is part of the measured work.
+    site = site_geojson(vertices, shape)
+
+    def run() -> Any:
+        metrics = prepare_site(site)
+        return _layout_blocks_within_polygon(block_count=8, width=28.0, depth=16.0, spacing=12.0, mask=_buildable_mask(metrics))
+
+    params = {'vertices': vertices, 'shape': shape}
+    return Case(f'layout_blocks/{_label(params)}', params, run)
+
+
+def solar_case(hours: int) -> Case:
+    hour_values = np.linspace(0.0, 24.0, hours, endpoint=False).tolist()
+    params = {'hours': hours}
+    return Case(f'compute_solar_profile/{_label(params)}', params, lambda: compute_solar_profile(SITE_CENTRE[1], SITE_CENTRE[0], date(2026, 3, 1), hour_values))
+
+
+class RunFixture:
+    # One in-memory database holding a completed run per solar mode.
+    def __init__(self) -> None:
+        self.engine = create_engine('sqlite+pysqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        SessionLocal.configure(bind=self.engine)
+        self.db = SessionLocal()
+        user = create_user(self.db, email='bench@buildit.ai', name='Bench')
+        self.project = create_project(
+            self.db,
+            ProjectCreate(
+                user_id=user.id,
+                name='benchmark',
+                country_code='KR',
+                jurisdiction_code='KR-11-SEOUL-JONGNO',
+                occupancy_type='residential',
+                site_geojson=site_geojson(16, 'convex'),
+            ),
+        )
+        rule_set = create_ruleset(
+            self.db,
+            RuleSetCreate(
+                country_code='KR',
+                jurisdiction_code='KR-11-SEOUL-JONGNO',
+                category='zoning',
+                version='bench',
+                effective_from=date(2026, 1, 1),
+                source_url='https://example.go.kr',
+                published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            ),
+        )
+        for key, field, op, value, rule_type in BASE_RULES:
+            create_rule_definition(
+                self.db,
+                RuleDefinitionCreate(rule_set_id=rule_set.id, rule_key=key, rule_type=rule_type, expression={'op': op, 'field': field, 'value': value}),
+            )
+        self.run_ids: dict[tuple[str, int], str] = {}
+
+    def run_id(self, solar_mode: str, hours: int) -> str:
+        key = (solar_mode, hours)
+        if key not in self.run_ids:
+            payload = EvaluateRequest(evaluation_date=date(2026, 3, 1), solar_mode=solar_mode, hours=np.linspace(0.0, 24.0, hours, endpoint=False).tolist())
+            self.run_ids[key] = run_evaluation(self.db, project=self.project, payload=payload).id
+        return self.run_ids[key]
+
+    def cold(self) -> None:
+        completed_run_cache.clear()
+        completed_run_json_cache.clear()
+        self.db.expire_all()
+
+
+def run_response_cases(fixture: RunFixture, solar_mode: str, hours: int) -> list[Case]:
+    params = {'solar_mode': solar_mode, 'hours': hours}
+    return [
+        Case(f'get_run_response/{_label(params)}', params, lambda: get_run_response(fixture.db, fixture.run_id(solar_mode, hours)).model_dump_json(), fixture.cold),
+        Case(f'get_run_json/{_label(params)}', params, lambda: get_run_json(fixture.db, fixture.run_id(solar_mode, hours)), fixture.cold),
+    ]
+
+
+def _label(params: dict[str, Any]) -> str:
+    return ','.join(f'{key}={value}' for key, value in params.items())
+
+
+def build_cases(*, quick: bool) -> list[Case]:
+    # Each axis is swept on its own from the default case rather than as a full product.
+    def allowed(axis: str, value: int) -> bool:
+        return not quick or value <= QUICK_LIMITS[axis]
+
+    default = {'vertices': 16, 'shape': 'convex', 'rules': 4, 'occupancy': 'residential'}
+    optimizer_params: list[dict[str, Any]] = []
+    for shape, counts in VERTEX_COUNTS.items():
+        optimizer_params += [{**default, 'vertices': count, 'shape': shape} for count in counts if allowed('vertices', count)]
+    optimizer_params += [{**default, 'rules': count} for count in RULE_COUNTS if allowed('rules', count)]
+    optimizer_params += [{**default, 'occupancy': occupancy} for occupancy in OCCUPANCY_TYPES]
+
+    cases: dict[str, Case] = {}
+    for params in optimizer_params:
+        case = optimizer_case(**params)
+        cases.setdefault(case.case_id, case)
+    for shape, counts in VERTEX_COUNTS.items():
+        for count in counts:
+            if allowed('vertices', count):
+                case = layout_case(count, shape)
+                cases[case.case_id] = case
+    for count in HOUR_COUNTS:
+        if allowed('hours', count):
+            case = solar_case(count)
+            cases[case.case_id] = case
+
+    fixture = RunFixture()
+    for solar_mode, hours in RUN_SOLAR_MODES:
+        if quick and solar_mode == 'annual':
+            continue
+        for case in run_response_cases(fixture, solar_mode, hours):
+            cases[case.case_id] = case
+    return list(cases.values())
+
+
+def measure(case: Case, repeat: int) -> dict[str, Any]:
+    if case.setup:
+        case.setup()
+    case.fn()
+    samples = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        t_start = perf_counter()
+        case.fn()
+        samples.append((perf_counter() - t_start) * 1000.0)
+    return {
+        'params': case.params,
+        'repeat': repeat,
+        'median_ms': round(statistics.median(samples), 3),
+        'min_ms': round(min(samples), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    regressions = []
+    for case_id, result in results.items():
+        previous = baseline.get(case_id)
+        if previous is None:
+            continue
+        limit = previous['median_ms'] * (1.0 + threshold)
+        if result['median_ms'] > limit and result['median_ms'] - previous['median_ms'] > NOISE_FLOOR_MS:
+            regressions.append(case_id)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the optimizer, solar profile, block layout and run responses.')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='baseline JSON to compare against and --save to')
+    parser.add_argument('--save', action='store_true', help='write this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown of the median reported as a regression')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='only run cases whose id contains this text')
+    parser.add_argument('--quick', action='store_true', help='skip the largest sites, rule sets, hour lists and annual runs')
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())['cases'] if args.baseline.exists() else {}
+    results: dict[str, dict] = {}
+    for case in build_cases(quick=args.quick):
+        if args.filter not in case.case_id:
+            continue
+        results[case.case_id] = measure(case, args.repeat)
+        previous = baseline.get(case.case_id)
+        delta = f"{(results[case.case_id]['median_ms'] / previous['median_ms'] - 1.0) * 100.0:+7.1f}%" if previous else '    new'
+        print(f"{case.case_id:<72} {results[case.case_id]['median_ms']:>10.3f} ms {delta}")
+
+    regressions = compare(results, baseline, args.threshold)
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'cases': {**baseline, **results},
+        }
+        args.baseline.write_text(json.dumps(document, indent=2, ensure_ascii=False) + '\n')
+        print(f'\nBaseline written to {args.baseline}')
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}:')
+        for case_id in regressions:
+            print(f"  {case_id}: {baseline[case_id]['median_ms']:.3f} -> {results[case_id]['median_ms']:.3f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+DEFAULT_MIX = "get_run=70,evaluate=20,create_project=10"
+QUERY_HEADER = "X-DB-Queries"
+COLD_READS_ENV = "LOAD_TEST_COLD_READS"
+READY_TIMEOUT_S = 30.0
+# Per-request query counter; requests run in copies of the middleware's context.
+_request_queries: ContextVar[Optional[list[int]]] = ContextVar("request_queries", default=None)
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    latency_ms: float
+    queries: Optional[int]
+
+
+@dataclass
+class EndpointReport:
+    samples: list[Sample] = field(default_factory=list)
+
+    def summary(self, wall_s: float) -> dict:
+        latencies = np.array([sample.latency_ms for sample in self.samples])
+        queries = [sample.queries for sample in self.samples if sample.queries is not None]
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies.size else (0.0, 0.0, 0.0)
+        return {
+            "requests": len(self.samples),
+            "errors": sum(1 for sample in self.samples if sample.status >= 400),
+            "throughput_rps": round(len(self.samples) / wall_s, 2) if wall_s > 0 else 0.0,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(latencies.max()), 2) if latencies.size else 0.0,
+            "db_queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+
+def serve(port: int) -> None:
+    # Runs inside the server subprocess: the real app plus a query counter per request.
+    import uvicorn
+    from sqlalchemy import event
+
+    from app.core.database import engine
+    from app.main import app
+    from app.services.orchestrator import completed_run_cache, completed_run_json_cache
+
+    cold_reads = os.getenv(COLD_READS_ENV) == "1"
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    @app.middleware("http")
+    async def query_count_header(request, call_next):
+        if cold_reads:
+            # Every read goes to the database instead of the completed-run caches.
+            completed_run_cache.clear()
+            completed_run_json_cache.clear()
+        counter = [0]
+        token = _request_queries.set(counter)
+        try:
+            response = await call_next(request)
+        finally:
+            _request_queries.reset(token)
+        response.headers[QUERY_HEADER] = str(counter[0])
+        return response
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def seed_database(runs: int) -> dict:
+    from seed_demo import seed
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.schemas import EvaluateRequest
+    from app.services.orchestrator import get_project, run_evaluation
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        ids = seed(db)
+        project = get_project(db, ids["project_id"])
+        run_ids = [ids["run_id"]]
+        # Distinct dates give distinct runs rather than optimizer cache hits.
+        for offset in range(1, runs):
+            payload = EvaluateRequest(evaluation_date=date(2026, 2, 10) + timedelta(days=offset), category="zoning", objective="maximize_far")
+            run_ids.append(run_evaluation(db, project=project, payload=payload).id)
+        return {**ids, "run_ids": run_ids}
+    finally:
+        db.close()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port: int, server: subprocess.Popen) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT_S
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1.0)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not become ready")
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint '{name.strip()}' (expected one of {', '.join(ENDPOINTS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def _create_project(ids: dict, index: int) -> tuple[str, str, Optional[dict]]:
+    payload = {
+        "user_id": ids["user_id"],
+        "name": f"load-{index}",
+        "country_code": "KR",
+        "jurisdiction_code": "KR-11-SEOUL-JONGNO",
+        "occupancy_type": "office",
+        "site_geojson": {
+            "type": "Polygon",
+            "coordinates": [[[126.9792, 37.5725], [126.9803, 37.5725], [126.9803, 37.5732], [126.9792, 37.5732], [126.9792, 37.5725]]],
+        },
+    }
+    return "POST", "/api/projects", payload
+
+
+def _evaluate(ids: dict, index: int) -> tuple[str, str, Optional[dict]]:
+    # Distinct dates keep the run-level caches from answering every request.
+    return "POST", f"/api/runs/projects/{ids['project_id']}/evaluate", {"evaluation_date": f"2026-03-{index % 28 + 1:02d}", "category": "zoning"}
+
+
+def _get_run(ids: dict, index: int) -> tuple[str, str, Optional[dict]]:
+    run_ids = ids["run_ids"]
+    return "GET", f"/api/runs/{run_ids[index % len(run_ids)]}", None
+
+
+ENDPOINTS = {"create_project": _create_project, "evaluate": _evaluate, "get_run": _get_run}
+
+
+def replay(port: int, ids: dict, plan: list[str], concurrency: int) -> tuple[list[Sample], float]:
+    # Each worker keeps one keep-alive connection and takes the next planned request.
+    cursor = iter(enumerate(plan))
+    samples: list[Sample] = []
+
+    def worker() -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120.0)
+        for index, endpoint in cursor:
+            method, path, payload = ENDPOINTS[endpoint](ids, index)
+            body = json.dumps(payload) if payload is not None else None
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            t_start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                queries = response.getheader(QUERY_HEADER)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120.0)
+                status, queries = 599, None
+            samples.append(Sample(endpoint, status, (time.perf_counter() - t_start) * 1000.0, int(queries) if queries is not None else None))
+        connection.close()
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return samples, time.perf_counter() - t_start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a concurrent request mix against a locally started API on a seeded SQLite database.")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs, e.g. get_run=70,evaluate=20,create_project=10")
+    parser.add_argument("--warmup", type=int, default=20, help="get_run requests sent before measuring")
+    parser.add_argument("--runs", type=int, default=8, help="completed runs seeded for get_run to rotate through")
+    parser.add_argument("--cold", action="store_true", help="clear the completed-run caches before every request, so get_run measures the database path")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plan = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+
+    with tempfile.TemporaryDirectory(prefix="buildit-load-") as workdir:
+        env = {**os.environ, "DATABASE_URL": f"sqlite+pysqlite:///{workdir}/load.db", "APP_ENV": "load-test", COLD_READS_ENV: "1" if args.cold else "0"}
+        # The seed runs in this process against the same file the server will open.
+        os.environ.update(env)
+        ids = seed_database(max(args.runs, 1))
+        port = free_port()
+        server = subprocess.Popen([sys.executable, __file__, "--serve", str(port)], env=env, cwd=ROOT_DIR)
+        try:
+            wait_until_ready(port, server)
+            replay(port, ids, ["get_run"] * args.warmup, min(args.concurrency, max(args.warmup, 1)))
+            samples, wall_s = replay(port, ids, plan, args.concurrency)
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    reports: dict[str, EndpointReport] = {}
+    for sample in samples:
+        reports.setdefault(sample.endpoint, EndpointReport()).samples.append(sample)
+    summary = {endpoint: reports[endpoint].summary(wall_s) for endpoint in sorted(reports)}
+    summary["total"] = EndpointReport(samples).summary(wall_s)
+
+    reads = "cold reads" if args.cold else "cached reads after warmup"
+    print(f"{len(samples)} requests, concurrency {args.concurrency}, {wall_s:.2f}s, get_run over {len(ids['run_ids'])} runs ({reads})\n")
+    print(f"{'endpoint':<16}{'reqs':>6}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'queries':>9}")
+    for endpoint, row in summary.items():
+        queries = "-" if row["db_queries_mean"] is None else f"{row['db_queries_mean']:.1f}"
+        print(
+            f"{endpoint:<16}{row['requests']:>6}{row['errors']:>8}{row['throughput_rps']:>9.1f}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}{queries:>9}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps({"requests": args.requests, "concurrency": args.concurrency, "mix": mix, "runs": len(ids["run_ids"]), "cold": args.cold, "wall_s": round(wall_s, 3), "endpoints": summary}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
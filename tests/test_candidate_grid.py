@@ -0,0 +1,53 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.candidate_grid import aesthetic_context, evaluate_residential_columns, qualitative_totals, select_top_rows
+from app.services.optimizer import _qualitative_score, _residential_candidates, _site_metrics
+
+SITE = {"area_m2": 9000.0, "width_m": 110.0, "depth_m": 90.0}
+LIMITS = {"far_upper": 250.0, "height_upper": 60.0, "coverage_upper": 60.0, "open_space_min": 22.0, "min_spacing": 24.0}
+
+
+class CandidateGridTest(unittest.TestCase):
+    def test_columns_match_preset_variants(self) -> None:
+        presets = _residential_candidates(site_metrics=SITE, country_code="KR", **LIMITS)
+        params = {
+            "far_factor": np.array([1.0, 0.95, 0.92]),
+            "height_factor": np.array([0.82, 0.9, 0.78]),
+            "base_floorplate": np.array([760.0, 560.0, 640.0]),
+            "slenderness": np.array([2.25, 1.35, 1.75]),
+            "spacing_factor": np.ones(3),
+        }
+        columns = evaluate_residential_columns(params, site_metrics=SITE, country_code="KR", **LIMITS)
+        for idx, preset in enumerate(presets):
+            self.assertAlmostEqual(columns.far[idx], preset.far)
+            self.assertAlmostEqual(columns.coverage[idx], preset.coverage)
+            self.assertAlmostEqual(columns.sky_exposure[idx], preset.sky_exposure)
+            self.assertEqual(int(columns.block_count[idx]), preset.block_count)
+            self.assertEqual(columns.articulation_index[idx], preset.articulation_index)
+
+        inputs = [SimpleNamespace(content="주변 맥락과 조화", reference_url="https://example.com", weight=1.1)]
+        totals = qualitative_totals(columns, aesthetic=aesthetic_context(inputs), avg_unit_area_m2=presets[0].avg_unit_area_m2)
+        for idx, preset in enumerate(presets):
+            self.assertAlmostEqual(totals[idx], _qualitative_score(preset, inputs, "residential")["total"], places=1)
+
+    def test_select_top_rows_keeps_each_plan_family(self) -> None:
+        scores = np.array([10.0, 9.0, 8.0, 1.0, -np.inf])
+        plan_code = np.array([0, 0, 0, 2, 1], dtype=np.int8)
+        self.assertEqual(select_top_rows(scores, plan_code, 3), [0, 3, 1])
+
+    def test_default_site_metrics_fit_grid(self) -> None:
+        columns = evaluate_residential_columns(
+            {key: np.array([value]) for key, value in {"far_factor": 1.0, "height_factor": 1.0, "base_floorplate": 600.0, "slenderness": 1.5, "spacing_factor": 1.2}.items()},
+            site_metrics=_site_metrics({}),
+            country_code="SG",
+            **LIMITS,
+        )
+        self.assertEqual(len(columns), 1)
+        self.assertGreaterEqual(columns.building_spacing_m[0], LIMITS["min_spacing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from app.services.geometry import BuildableMask, PreparedPolygon
+from app.services.optimizer import _layout_blocks_within_polygon
+
+
+def _ray_cast(x: float, z: float, ring: list[tuple[float, float]]) -> bool:
+    inside = False
+    for idx in range(len(ring) - 1):
+        x1, z1 = ring[idx]
+        x2, z2 = ring[idx + 1]
+        if ((z1 > z) != (z2 > z)) and (x < (x2 - x1) * (z - z1) / ((z2 - z1) or 1e-9) + x1):
+            inside = not inside
+    return inside
+
+
+class PreparedPolygonTest(unittest.TestCase):
+    def test_matches_ray_cast_on_irregular_rings(self) -> None:
+        rng = np.random.default_rng(7)
+        for vertex_count in (4, 9, 120, 1500):
+            angles = np.sort(rng.uniform(0.0, 2.0 * np.pi, vertex_count))
+            radii = rng.uniform(15.0, 60.0, vertex_count)
+            ring = [(float(r * np.cos(a)), float(r * np.sin(a))) for a, r in zip(angles, radii)]
+            ring.append(ring[0])
+            polygon = PreparedPolygon(ring)
+            xs = rng.uniform(-70.0, 70.0, 400)
+            zs = rng.uniform(-70.0, 70.0, 400)
+            expected = [_ray_cast(x, z, ring) for x, z in zip(xs, zs)]
+            self.assertEqual(polygon.contains_points(xs, zs).tolist(), expected)
+
+    def test_contains_rects_checks_all_corners(self) -> None:
+        polygon = PreparedPolygon([(0.0, 0.0), (40.0, 0.0), (40.0, 20.0), (20.0, 20.0), (20.0, 40.0), (0.0, 40.0)])
+        fits = polygon.contains_rects(np.array([10.0, 30.0, 30.0]), np.array([10.0, 10.0, 30.0]), 8.0, 8.0)
+        self.assertEqual(fits.tolist(), [True, True, False])
+        self.assertTrue(polygon.contains(5.0, 35.0))
+        self.assertFalse(polygon.contains(35.0, 35.0))
+
+
+class BuildableMaskTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.polygon = PreparedPolygon([(0.0, 0.0), (40.0, 0.0), (40.0, 20.0), (20.0, 20.0), (20.0, 40.0), (0.0, 40.0)])
+        self.mask = BuildableMask(self.polygon, max_cells_per_side=80)
+
+    def test_fits_is_conservative_against_polygon(self) -> None:
+        rng = np.random.default_rng(3)
+        xs = rng.uniform(-5.0, 45.0, 2000)
+        zs = rng.uniform(-5.0, 45.0, 2000)
+        fits = self.mask.fits_rects(xs, zs, 6.0, 4.0)
+        self.assertTrue(fits.any())
+        self.assertTrue(self.polygon.contains_rects(xs[fits], zs[fits], 6.0, 4.0).all())
+        self.assertEqual(self.mask.fits_rects(np.array([10.0, 30.0]), np.array([30.0, 30.0]), 6.0, 4.0).tolist(), [True, False])
+
+    def test_lattice_placements_keep_pitch_and_stay_inside(self) -> None:
+        xs, zs = self.mask.lattice_placements(width=8.0, depth=6.0, pitch_x=14.0, pitch_z=12.0)
+        self.assertGreaterEqual(len(xs), 4)
+        self.assertTrue(self.mask.fits_rects(xs, zs, 8.0, 6.0).all())
+        offsets_x = np.round((xs - xs.min()) / 14.0, 6)
+        self.assertTrue(np.allclose(offsets_x, np.round(offsets_x)))
+
+    def test_layout_shrinks_until_every_block_fits(self) -> None:
+        # Four 12 x 8 blocks fit at full size; a fifth needs the smaller footprint.
+        full = _layout_blocks_within_polygon(block_count=4, width=12.0, depth=8.0, spacing=6.0, mask=self.mask)
+        shrunk = _layout_blocks_within_polygon(block_count=5, width=12.0, depth=8.0, spacing=6.0, mask=self.mask)
+        self.assertEqual((len(full), full[0]["width"]), (4, 12.0))
+        self.assertEqual(len(shrunk), 5)
+        self.assertLess(shrunk[0]["width"], 12.0)
+        # When no size holds the whole cluster, the size that held the most is kept.
+        partial = _layout_blocks_within_polygon(block_count=30, width=12.0, depth=8.0, spacing=6.0, mask=self.mask)
+        self.assertTrue(4 < len(partial) < 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from app.services.mesh_codec import MESH_HEADER, packed_mesh, unpack_mesh, unpack_meshes
+from app.services.shadow import mesh_boxes
+
+MESHES = [
+    {
+        "type": "multi_block",
+        "site_outline": [[-20.0, -15.0], [20.0, -15.0], [20.0, 15.0], [-20.0, 15.0]],
+        "prototype": {"width": 10.0, "depth": 8.0, "height": 30.0},
+        "instances": [[-10.0, -9.0, 1.0], [2.0, -9.0, 0.94], [14.0, -9.0, 1.0], [-4.0, 9.0, 0.94], [8.0, 9.0, 1.0]],
+    },
+    {
+        "type": "stacked",
+        "segments": [
+            {"width": 30.0, "depth": 20.0, "height": 12.0, "base_y": 0.0},
+            {"width": 22.0, "depth": 16.0, "height": 24.0, "base_y": 12.0},
+        ],
+    },
+    {"type": "courtyard", "outer_width": 40.0, "outer_depth": 30.0, "inner_width": 16.0, "inner_depth": 10.0, "height": 18.0},
+]
+
+
+class MeshCodecTest(unittest.TestCase):
+    def test_round_trip_preserves_boxes_and_outline(self) -> None:
+        for mesh in MESHES:
+            payload = packed_mesh(mesh).pack()
+            decoded = unpack_mesh(payload)
+            self.assertEqual(decoded.mesh_type, mesh["type"])
+            np.testing.assert_allclose(decoded.boxes, mesh_boxes(mesh), rtol=1e-6)
+            np.testing.assert_allclose(decoded.outline, np.asarray(mesh.get("site_outline", []), dtype=float).reshape(-1, 2))
+            self.assertEqual(len(payload), MESH_HEADER.size + 4 * (decoded.boxes.size + decoded.outline.size))
+
+    def test_rejects_unknown_type_and_encoding(self) -> None:
+        with self.assertRaises(ValueError):
+            packed_mesh({"type": "box", "width": 10.0, "depth": 10.0, "height": 10.0})
+        with self.assertRaises(ValueError):
+            unpack_mesh(b"XXXX" + packed_mesh(MESHES[0]).pack()[4:])
+
+    def test_coarse_merges_rows_and_concatenates(self) -> None:
+        coarse = packed_mesh(MESHES[0], "coarse")
+        np.testing.assert_allclose(coarse.boxes, [[2.0, -9.0, 34.0, 8.0, 0.0, 30.0], [2.0, 9.0, 22.0, 8.0, 0.0, 30.0]])
+        self.assertEqual(len(coarse.outline), 0)
+        # Only lattice layouts have rows; other types keep their boxes.
+        np.testing.assert_allclose(packed_mesh(MESHES[2], "coarse").boxes, mesh_boxes(MESHES[2]))
+
+        decoded = unpack_meshes(b"".join(packed_mesh(mesh, "coarse").pack() for mesh in MESHES))
+        self.assertEqual([item.mesh_type for item in decoded], [mesh["type"] for mesh in MESHES])
+        self.assertEqual([len(item.boxes) for item in decoded], [2, 2, 4])
+        with self.assertRaises(ValueError):
+            packed_mesh(MESHES[0], "medium")
@@ -0,0 +1,40 @@
+import unittest
+
+from app.core.metrics import MetricsRegistry
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self) -> None:
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_ms", "Stage latency.", ("stage",), buckets=(1.0, 10.0))
+        for value in (0.5, 1.0, 4.0, 40.0):
+            histogram.observe(value, stage="solar")
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[:2], ["# HELP stage_ms Stage latency.", "# TYPE stage_ms histogram"])
+        self.assertEqual(
+            lines[2:],
+            [
+                'stage_ms_bucket{stage="solar",le="1"} 2',
+                'stage_ms_bucket{stage="solar",le="10"} 3',
+                'stage_ms_bucket{stage="solar",le="+Inf"} 4',
+                'stage_ms_sum{stage="solar"} 45.5',
+                'stage_ms_count{stage="solar"} 4',
+            ],
+        )
+        self.assertEqual(histogram.count(stage="solar"), 4)
+        self.assertEqual(histogram.count(stage="persist"), 0)
+
+    def test_counter_labels_are_validated_and_registration_is_shared(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("runs_total", "Runs.", ("status",))
+        counter.inc(status="completed")
+        registry.counter("runs_total", "Runs.", ("status",)).inc(2, status="completed")
+        self.assertEqual(counter.value(status="completed"), 3)
+        self.assertIn('runs_total{status="completed"} 3', registry.render())
+        with self.assertRaises(ValueError):
+            counter.inc(stage="completed")
+        with self.assertRaises(ValueError):
+            registry.histogram("runs_total", "Runs.", ("status",))
+
+        registry.reset()
+        self.assertEqual(counter.value(status="completed"), 0)
@@ -0,0 +1,57 @@
+import unittest
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+
+from app.core.migrations import init_schema
+
+
+class InitSchemaTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+
+    def _columns(self, table: str) -> set[str]:
+        return {column["name"] for column in inspect(self.engine).get_columns(table)}
+
+    def test_adds_columns_missing_from_an_existing_sqlite_database(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE TABLE project_rule_snapshots (id VARCHAR PRIMARY KEY, project_id VARCHAR NOT NULL, evaluation_date DATE NOT NULL,"
+                    " frozen_rule_set_ids JSON NOT NULL, frozen_rule_definition_ids JSON NOT NULL, created_at DATETIME)"
+                )
+            )
+        self.assertIn("project_rule_snapshots.content_hash", init_schema(self.engine))
+        self.assertIn("content_hash", self._columns("project_rule_snapshots"))
+        self.assertEqual(init_schema(self.engine), [])
+
+        insert = text(
+            "INSERT INTO project_rule_snapshots (id, project_id, evaluation_date, frozen_rule_set_ids, frozen_rule_definition_ids, content_hash)"
+            " VALUES (:id, 'p', '2026-03-01', '[]', '[]', 'same')"
+        )
+        with self.engine.begin() as conn:
+            conn.execute(insert, {"id": "a"})
+        with self.assertRaises(IntegrityError), self.engine.begin() as conn:
+            conn.execute(insert, {"id": "b"})
+
+    def test_adds_coarse_mesh_payload_to_meshes_table(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE option_meshes (option_id VARCHAR PRIMARY KEY, box_count INTEGER NOT NULL, payload BLOB NOT NULL)"))
+            conn.execute(text("INSERT INTO option_meshes (option_id, box_count, payload) VALUES ('o', 1, x'00')"))
+        self.assertEqual(init_schema(self.engine), ["option_meshes.coarse_payload"])
+        with self.engine.connect() as conn:
+            self.assertIsNone(conn.execute(text("SELECT coarse_payload FROM option_meshes")).scalar_one())
+
+    def test_fails_clearly_on_columns_it_cannot_add(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE users (id VARCHAR PRIMARY KEY, email VARCHAR NOT NULL)"))
+        with self.assertRaisesRegex(RuntimeError, r"users\(name, created_at\)"):
+            init_schema(self.engine)
+
+
+if __name__ == "__main__":
+    unittest.main()
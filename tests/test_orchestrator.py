@@ -0,0 +1,510 @@
+import asyncio
+import json
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+import numpy as np
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, engine
+from app.models import DesignOption, OptionMesh, RunStatus, SolarResult, SolarSeries
+from app.routers.runs import option_mesh_endpoint
+from app.schemas import EvaluateRequest, ProjectCreate, RequirementValue, RuleDefinitionCreate, RuleSetCreate
+from app.services.mesh_codec import packed_mesh, unpack_mesh, unpack_meshes
+from app.services.orchestrator import (
+    OPTIMIZER_PHASE_MS,
+    RUNS,
+    STAGE_MS,
+    completed_run_cache,
+    completed_run_json_cache,
+    create_project,
+    create_rule_definition,
+    create_ruleset,
+    create_user,
+    execute_queued_run,
+    fail_interrupted_runs,
+    get_option_mesh,
+    get_run,
+    get_run_json,
+    get_run_meshes,
+    get_run_profile,
+    get_run_response,
+    iter_batch_results,
+    queue_batch_evaluation,
+    queue_evaluation,
+    renew_run_leases,
+    resolve_active_rules,
+    rule_index,
+    run_evaluation,
+    submit_batch_runs,
+    upsert_requirements,
+)
+from app.services.run_events import run_events
+from app.services.run_lease import INSTANCE_ID
+from app.services.shadow import mesh_boxes
+
+SITE = {
+    "type": "Polygon",
+    "coordinates": [
+        [
+            [126.9792, 37.5725],
+            [126.9804, 37.5724],
+            [126.9806, 37.5731],
+            [126.9799, 37.5736],
+            [126.9790, 37.5734],
+            [126.9792, 37.5725],
+        ]
+    ],
+}
+
+
+class OrchestratorTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        SessionLocal.configure(bind=self.engine)
+        self.db = SessionLocal()
+        user = create_user(self.db, email="test@buildit.ai", name="Test")
+        self.project = create_project(
+            self.db,
+            ProjectCreate(
+                user_id=user.id,
+                name="orchestrator-test",
+                country_code="KR",
+                jurisdiction_code="KR-11-SEOUL-JONGNO",
+                occupancy_type="residential",
+                site_geojson=SITE,
+            ),
+        )
+        rule_set = create_ruleset(
+            self.db,
+            RuleSetCreate(
+                country_code="KR",
+                jurisdiction_code="KR-11-SEOUL-JONGNO",
+                category="zoning",
+                version="2026.01.01",
+                effective_from=date(2026, 1, 1),
+                source_url="https://example.go.kr",
+                published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            ),
+        )
+        create_rule_definition(
+            self.db,
+            RuleDefinitionCreate(rule_set_id=rule_set.id, rule_key="max_far", expression={"op": "lte", "field": "far", "value": 400}, priority=10),
+        )
+        upsert_requirements(self.db, project_id=self.project.id, requirements=[RequirementValue(key="height", max_value=60)])
+
+    def tearDown(self) -> None:
+        completed_run_cache.clear()
+        completed_run_json_cache.clear()
+        rule_index.invalidate()
+        run_events.clear()
+        self.db.close()
+        SessionLocal.configure(bind=engine)
+        self.engine.dispose()
+
+
+class QueuedRunTest(OrchestratorTestCase):
+    def test_queued_run_completes_in_worker(self) -> None:
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        run, stage_ms = queue_evaluation(self.db, project=self.project, payload=payload)
+        self.assertEqual(run.status, RunStatus.QUEUED.value)
+        self.assertIn("resolve_rules", stage_ms)
+
+        execute_queued_run(run.id, payload, stage_ms)
+        self.db.expire_all()
+        response = get_run_response(self.db, run.id)
+        self.assertEqual(response.status, RunStatus.COMPLETED.value)
+        self.assertEqual(len(response.options), 3)
+        self.assertEqual(len(response.solar[response.options[0].id]), len(payload.hours))
+
+    def test_run_publishes_stages_and_options_before_completion(self) -> None:
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        run, stage_ms = queue_evaluation(self.db, project=self.project, payload=payload)
+        execute_queued_run(run.id, payload, stage_ms)
+
+        async def collect() -> list:
+            return [event async for event in run_events.subscribe(run.id)]
+
+        events = asyncio.run(collect())
+        names = [event.event for event in events]
+        statuses = [event.data["status"] for event in events if event.event == "status"]
+        stages = [event.data["stage"] for event in events if event.event == "stage"]
+        self.assertEqual(statuses, ["queued", "running", "completed"])
+        self.assertEqual(stages[:3], ["resolve_rules", "create_snapshot", "optimize_options"])
+        self.assertIn("persist_options_and_solar", stages)
+        self.assertEqual(names.count("option"), 3)
+        # Options stream out while the optimizer is still running, ahead of its stage event.
+        optimize_done = next(idx for idx, event in enumerate(events) if event.data.get("stage") == "optimize_options")
+        self.assertTrue(all(idx < optimize_done for idx, name in enumerate(names) if name == "option"))
+        self.assertIn("mesh_payload", events[names.index("option")].data)
+
+    def test_run_records_stage_histograms_and_status_counts(self) -> None:
+        stages = ("resolve_rules", "optimize_options", "persist_options_and_solar", "total")
+        before = {stage: STAGE_MS.count(stage=stage) for stage in stages}
+        queued, completed = RUNS.value(status="queued"), RUNS.value(status="completed")
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        run, stage_ms = queue_evaluation(self.db, project=self.project, payload=payload)
+        execute_queued_run(run.id, payload, stage_ms)
+
+        self.assertEqual({stage: STAGE_MS.count(stage=stage) - before[stage] for stage in stages}, dict.fromkeys(stages, 1))
+        self.assertEqual(RUNS.value(status="queued") - queued, 1)
+        self.assertEqual(RUNS.value(status="completed") - completed, 1)
+        self.assertGreater(OPTIMIZER_PHASE_MS.count(phase="total"), 0)
+
+    def test_worker_failure_marks_run_failed(self) -> None:
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        run, stage_ms = queue_evaluation(self.db, project=self.project, payload=payload)
+        failing = mock.patch("app.services.orchestrator.solar_columns", side_effect=ValueError("solar model failed"))
+        with failing, self.assertLogs("app.services.orchestrator", level="ERROR"):
+            execute_queued_run(run.id, payload, stage_ms)
+        self.db.expire_all()
+        response = get_run_response(self.db, run.id)
+        self.assertEqual(response.status, RunStatus.FAILED.value)
+        self.assertTrue(response.error_message)
+        self.assertEqual(response.options, [])
+
+    def test_repeat_evaluations_share_snapshot(self) -> None:
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        first, _ = queue_evaluation(self.db, project=self.project, payload=payload)
+        second, _ = queue_evaluation(self.db, project=self.project, payload=payload)
+        other, _ = queue_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 2)))
+        self.assertEqual(first.snapshot_id, second.snapshot_id)
+        self.assertNotEqual(first.snapshot_id, other.snapshot_id)
+        self.assertEqual(len(self.project.snapshots), 2)
+
+    def test_request_rejects_unknown_modes(self) -> None:
+        # Rejected by the schema, so the API answers 422 before a run is queued.
+        with self.assertRaises(ValidationError):
+            EvaluateRequest(evaluation_date=date(2026, 3, 1), search_mode="bogus")
+        with self.assertRaises(ValidationError):
+            EvaluateRequest(evaluation_date=date(2026, 3, 1), solar_mode="hourly")
+
+    def test_request_rejects_out_of_range_hours(self) -> None:
+        for hours in ([], [24], [-1, 12], [9, 24.5]):
+            with self.subTest(hours=hours), self.assertRaises(ValidationError):
+                EvaluateRequest(evaluation_date=date(2026, 3, 1), hours=hours)
+        self.assertEqual(EvaluateRequest(evaluation_date=date(2026, 3, 1), hours=[0, 23.5]).hours, [0, 23.5])
+
+
+def _run_inline(fn, *args) -> Future:
+    future: Future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+class RunLeaseTest(OrchestratorTestCase):
+    def _queue(self, owner_id, lease_expires_at) -> str:
+        run, _ = queue_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 1)))
+        run.owner_id, run.lease_expires_at = owner_id, lease_expires_at
+        self.db.commit()
+        return run.id
+
+    def test_only_runs_with_expired_foreign_leases_are_failed(self) -> None:
+        now = datetime.utcnow()
+        own_expired = self._queue(INSTANCE_ID, now - timedelta(minutes=5))
+        sibling_live = self._queue("other-host:1:abc", now + timedelta(minutes=5))
+        sibling_expired = self._queue("other-host:1:abc", now - timedelta(minutes=5))
+        legacy = self._queue(None, None)
+
+        self.assertEqual(fail_interrupted_runs(self.db), 2)
+        self.db.expire_all()
+        statuses = {run_id: get_run_response(self.db, run_id).status for run_id in (own_expired, sibling_live, sibling_expired, legacy)}
+        self.assertEqual(
+            statuses,
+            {
+                own_expired: RunStatus.QUEUED.value,
+                sibling_live: RunStatus.QUEUED.value,
+                sibling_expired: RunStatus.FAILED.value,
+                legacy: RunStatus.FAILED.value,
+            },
+        )
+
+        # Renewal only extends this process's own active runs.
+        self.assertEqual(renew_run_leases(self.db), 1)
+        self.db.expire_all()
+        self.assertGreater(get_run(self.db, own_expired).lease_expires_at, now)
+
+
+class BatchEvaluationTest(OrchestratorTestCase):
+    def test_batch_resolves_once_per_date_and_reports_every_scenario(self) -> None:
+        payloads = [
+            EvaluateRequest(evaluation_date=date(2026, 3, 1)),
+            EvaluateRequest(evaluation_date=date(2026, 3, 1), hours=[8, 10, 12, 14]),
+            EvaluateRequest(evaluation_date=date(2025, 6, 1)),
+            EvaluateRequest(evaluation_date=date(2026, 6, 1), objective="balanced"),
+        ]
+        with mock.patch("app.services.orchestrator.resolve_active_rules", wraps=resolve_active_rules) as resolve:
+            scenarios = queue_batch_evaluation(self.db, project=self.project, payloads=payloads)
+        self.assertEqual(resolve.call_count, 3)
+        self.assertEqual(scenarios[0].inputs, scenarios[1].inputs)
+        self.assertIsNone(scenarios[2].run_id)
+
+        results = list(iter_batch_results(scenarios, submit_batch_runs(scenarios, _run_inline)))
+        self.assertEqual(results[0].scenario, 2)
+        self.assertIn("No active rule set", results[0].error)
+
+        runs = {item.scenario: item.run for item in results[1:]}
+        self.assertEqual(sorted(runs), [0, 1, 3])
+        self.assertTrue(all(run.status == RunStatus.COMPLETED.value for run in runs.values()))
+        self.assertEqual(runs[0].snapshot_id, runs[1].snapshot_id)
+        self.assertEqual(len(runs[1].solar[runs[1].options[0].id]), 4)
+        self.assertEqual(runs[3].objective, "balanced")
+
+
+class QueryCountMixin:
+    def _count_queries(self, fn):
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", record)
+        try:
+            result = fn()
+        finally:
+            event.remove(self.engine, "before_cursor_execute", record)
+        return result, statements
+
+
+class RunResponseTest(QueryCountMixin, OrchestratorTestCase):
+    def test_completed_run_loads_solar_in_one_query_and_is_cached(self) -> None:
+        run = run_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 1)))
+        completed_run_cache.clear()
+        self.db.expire_all()
+
+        first, statements = self._count_queries(lambda: get_run_response(self.db, run.id))
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(sum(len(rows) for rows in first.solar.values()), len(first.options) * 3)
+
+        second, statements = self._count_queries(lambda: get_run_response(self.db, run.id))
+        self.assertIs(second, first)
+        self.assertEqual(statements, [])
+
+
+    def test_run_json_matches_validated_response_and_is_cached(self) -> None:
+        for storage in ("columnar", "rows"):
+            with mock.patch.object(settings, "solar_storage", storage):
+                run = run_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 1)))
+            self.db.expire_all()
+            document, _ = self._count_queries(lambda: get_run_json(self.db, run.id))
+            self.assertEqual(json.loads(document), json.loads(get_run_response(self.db, run.id).model_dump_json()))
+            self.assertTrue(all(option["mesh_payload"] is None for option in json.loads(document)["options"]))
+            with_mesh = get_run_json(self.db, run.id, include_mesh=True)
+            self.assertEqual(json.loads(with_mesh), json.loads(get_run_response(self.db, run.id, include_mesh=True).model_dump_json()))
+            self.assertTrue(all(option["mesh_payload"] for option in json.loads(with_mesh)["options"]))
+
+            second, statements = self._count_queries(lambda: get_run_json(self.db, run.id))
+            self.assertIs(second, document)
+            self.assertEqual(statements, [])
+        self.assertIsNone(get_run_json(self.db, "missing"))
+
+class SolarStorageTest(OrchestratorTestCase):
+    def _run_with_storage(self, storage: str):
+        previous = settings.solar_storage
+        settings.solar_storage = storage
+        try:
+            run = run_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 1), solar_mode="seasonal"))
+        finally:
+            settings.solar_storage = previous
+        return get_run_response(self.db, run.id)
+
+    def test_columnar_and_row_storage_read_back_identically(self) -> None:
+        columnar = self._run_with_storage("columnar")
+        rows = self._run_with_storage("rows")
+        self.assertEqual(self.db.query(SolarSeries).count(), len(columnar.options))
+        self.assertEqual(self.db.query(SolarResult).count(), len(rows.options) * 12)
+        # SQLite returns naive datetimes for the row table; the packed series stays UTC-aware.
+        strip = lambda points: [{**point.model_dump(), "timestamp_utc": point.timestamp_utc.replace(tzinfo=None)} for point in points]
+        for left, right in zip(columnar.options, rows.options):
+            self.assertEqual(len(columnar.solar[left.id]), 12)
+            self.assertEqual(strip(columnar.solar[left.id]), strip(rows.solar[right.id]))
+
+
+class OptionMeshTest(OrchestratorTestCase):
+    def test_packed_mesh_matches_json_and_falls_back_for_legacy_options(self) -> None:
+        run = run_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 1)))
+        options = get_run_response(self.db, run.id, include_mesh=True).options
+        self.assertEqual(self.db.query(OptionMesh).count(), len(options))
+        for option in options:
+            decoded = unpack_mesh(get_option_mesh(self.db, option.id))
+            np.testing.assert_allclose(decoded.boxes, mesh_boxes(option.mesh_payload), rtol=1e-6)
+
+        legacy = options[0]
+        stored = get_option_mesh(self.db, legacy.id)
+        self.db.delete(self.db.get(OptionMesh, legacy.id))
+        self.db.commit()
+        self.assertEqual(get_option_mesh(self.db, legacy.id), stored)
+        self.assertIsNone(get_option_mesh(self.db, "missing"))
+
+    def test_unencodable_legacy_mesh_is_a_bad_request(self) -> None:
+        run = run_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 1)))
+        option = self.db.query(DesignOption).filter(DesignOption.run_id == run.id).first()
+        self.db.delete(self.db.get(OptionMesh, option.id))
+        option.mesh_payload = {"type": "legacy_extrusion"}
+        self.db.commit()
+        with self.assertRaisesRegex(ValueError, "unsupported mesh type"):
+            get_option_mesh(self.db, option.id)
+        with self.assertRaises(HTTPException) as raised:
+            option_mesh_endpoint(option.id, db=self.db)
+        self.assertEqual(raised.exception.status_code, 400)
+
+    def test_run_meshes_concatenate_coarse_options_in_rank_order(self) -> None:
+        run = run_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 1)))
+        options = get_run_response(self.db, run.id, include_mesh=True).options
+        # Only the fine mesh is stored; coarse is derived on read.
+        self.assertEqual({row.coarse_payload for row in self.db.query(OptionMesh)}, {None})
+        coarse = unpack_meshes(get_run_meshes(self.db, run.id))
+        self.assertEqual(len(coarse), len(options))
+        for option, mesh in zip(options, coarse):
+            self.assertEqual(len(option.mesh_payload["instances"]), len(unpack_mesh(get_option_mesh(self.db, option.id)).boxes))
+            self.assertLessEqual(len(mesh.boxes), len(option.mesh_payload["instances"]))
+            self.assertEqual(get_option_mesh(self.db, option.id, "coarse"), mesh.pack())
+            self.assertEqual(mesh.pack(), packed_mesh(option.mesh_payload, "coarse").pack())
+        self.assertEqual(len(unpack_meshes(get_run_meshes(self.db, run.id, "fine"))), len(options))
+        with self.assertRaises(ValueError):
+            get_run_meshes(self.db, run.id, "medium")
+
+
+class ResultCacheTest(OrchestratorTestCase):
+    def _optimizer_profile(self, run) -> dict:
+        option = get_run_response(self.db, run.id).options[0]
+        return option.parameters["runtime_profile"]["optimizer_ms"]
+
+    def test_repeat_run_reuses_cached_options(self) -> None:
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        first = run_evaluation(self.db, project=self.project, payload=payload)
+        second = run_evaluation(self.db, project=self.project, payload=EvaluateRequest(evaluation_date=date(2026, 3, 2)))
+        self.assertNotIn("result_cache_hit", self._optimizer_profile(first))
+        self.assertEqual(self._optimizer_profile(second)["result_cache_hit"], 1.0)
+
+        first_options = get_run_response(self.db, first.id, include_mesh=True).options
+        second_options = get_run_response(self.db, second.id, include_mesh=True).options
+        self.assertEqual([item.mesh_payload for item in first_options], [item.mesh_payload for item in second_options])
+        self.assertEqual([item.score for item in first_options], [item.score for item in second_options])
+        self.assertFalse({item.id for item in first_options} & {item.id for item in second_options})
+
+        upsert_requirements(self.db, project_id=self.project.id, requirements=[RequirementValue(key="height", max_value=45)])
+        third = run_evaluation(self.db, project=self.project, payload=payload)
+        self.assertNotIn("result_cache_hit", self._optimizer_profile(third))
+
+
+class RunProfileTest(OrchestratorTestCase):
+    def test_profiled_run_stores_top_functions_and_loadable_stats(self) -> None:
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        run_evaluation(self.db, project=self.project, payload=payload)
+        run = run_evaluation(self.db, project=self.project, payload=payload, profile=True)
+        self.assertEqual(run.status, RunStatus.COMPLETED.value)
+        # The result cache is bypassed, so the optimizer itself shows up in the profile.
+        self.assertNotIn("result_cache_hit", get_run_response(self.db, run.id).options[0].parameters["runtime_profile"]["optimizer_ms"])
+
+        profile = get_run_profile(self.db, run.id)
+        self.assertGreater(profile.wall_ms, 0)
+        self.assertIn("optimize_options", [item["function"] for item in profile.top_functions])
+        cumulative = [item["cumulative_ms"] for item in profile.top_functions]
+        self.assertEqual(cumulative, sorted(cumulative, reverse=True))
+        with tempfile.NamedTemporaryFile(suffix=".pstats") as handle:
+            handle.write(profile.stats)
+            handle.flush()
+            self.assertGreater(pstats.Stats(handle.name).total_calls, 0)
+        self.assertIsNone(get_run_profile(self.db, run_evaluation(self.db, project=self.project, payload=payload).id))
+
+
+class MemoryProfileTest(OrchestratorTestCase):
+    def tearDown(self) -> None:
+        tracemalloc.stop()
+        super().tearDown()
+
+    def test_runtime_profile_reports_stage_memory_when_enabled(self) -> None:
+        payload = EvaluateRequest(evaluation_date=date(2026, 3, 1))
+        self.assertNotIn("pipeline_memory", self._runtime_profile(run_evaluation(self.db, project=self.project, payload=payload)))
+
+        with mock.patch.object(settings, "memory_profiling", True), mock.patch.object(settings, "result_cache_enabled", False):
+            profile = self._runtime_profile(run_evaluation(self.db, project=self.project, payload=payload))
+        self.assertEqual(list(profile["pipeline_memory"]), ["optimize_options", "compute_solar_profile", "cast_shadows", "persist_options_and_solar", "total"])
+        self.assertFalse(profile["memory_concurrent"])
+        self.assertEqual(
+            list(profile["optimizer_memory"]),
+            ["prepare_inputs", "candidate_generation", "evaluate_candidates", "sort", "check_details", "total"],
+        )
+        self.assertGreater(profile["pipeline_memory"]["optimize_options"]["peak_bytes"], 0)
+        # The optimizer's total ends with optimize_options and excludes the later stages.
+        self.assertLessEqual(profile["optimizer_memory"]["total"]["peak_bytes"], profile["pipeline_memory"]["optimize_options"]["peak_bytes"])
+        self.assertGreaterEqual(profile["pipeline_memory"]["total"]["peak_bytes"], profile["pipeline_memory"]["cast_shadows"]["peak_bytes"])
+
+    def _runtime_profile(self, run) -> dict:
+        return get_run_response(self.db, run.id).options[0].parameters["runtime_profile"]
+
+
+class RuleIndexTest(QueryCountMixin, OrchestratorTestCase):
+    def _add_ruleset(self, version: str, effective_from: date, effective_to=None, priority: int = 5) -> str:
+        rule_set = create_ruleset(
+            self.db,
+            RuleSetCreate(
+                country_code="KR",
+                jurisdiction_code="KR-11-SEOUL-JONGNO",
+                category="zoning",
+                version=version,
+                effective_from=effective_from,
+                effective_to=effective_to,
+                source_url="https://example.go.kr",
+                published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            ),
+        )
+        create_rule_definition(
+            self.db,
+            RuleDefinitionCreate(rule_set_id=rule_set.id, rule_key=f"max_height_{version}", expression={"op": "lte", "field": "height", "value": 60}, priority=priority),
+        )
+        return rule_set.id
+
+    def _resolve(self, evaluation_date: date):
+        return resolve_active_rules(self.db, project=self.project, evaluation_date=evaluation_date, category="zoning")
+
+    def test_lookup_follows_effective_dates_without_queries(self) -> None:
+        amendment_id = self._add_ruleset("2026.03.01", date(2026, 3, 1), date(2026, 6, 30), priority=1)
+        self._resolve(date(2026, 1, 1))
+
+        (rule_sets, definitions), statements = self._count_queries(lambda: self._resolve(date(2026, 4, 1)))
+        self.assertEqual(statements, [])
+        self.assertEqual([item.version for item in rule_sets], ["2026.03.01", "2026.01.01"])
+        self.assertEqual([item.rule_key for item in definitions], ["max_height_2026.03.01", "max_far"])
+
+        rule_sets, _ = self._resolve(date(2026, 7, 1))
+        self.assertEqual([item.version for item in rule_sets], ["2026.01.01"])
+        self.assertIn(amendment_id, [item.id for item in self._resolve(date(2026, 6, 30))[0]])
+        self.assertEqual(self._resolve(date(2025, 12, 31)), ([], []))
+
+    def test_create_invalidates_index(self) -> None:
+        self.assertEqual(len(self._resolve(date(2026, 9, 1))[0]), 1)
+        self._add_ruleset("2026.09.01", date(2026, 9, 1))
+        rule_sets, definitions = self._resolve(date(2026, 9, 1))
+        self.assertEqual([item.version for item in rule_sets], ["2026.09.01", "2026.01.01"])
+        self.assertEqual(len(definitions), 2)
+
+    def test_invalidate_during_load_discards_the_stale_entry(self) -> None:
+        load = rule_index._load
+
+        def load_then_write(db, key):
+            # A rule set is written (and the index invalidated) while this load is in flight.
+            entry = load(db, key)
+            self._add_ruleset("2026.09.01", date(2026, 9, 1))
+            return entry
+
+        with mock.patch.object(rule_index, "_load", side_effect=load_then_write):
+            rule_sets, _ = self._resolve(date(2026, 9, 1))
+        self.assertEqual([item.version for item in rule_sets], ["2026.01.01"])
+        rule_sets, _ = self._resolve(date(2026, 9, 1))
+        self.assertEqual([item.version for item in rule_sets], ["2026.09.01", "2026.01.01"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+from datetime import date
+from unittest import mock
+
+import numpy as np
+
+from app.services.candidate_grid import AestheticContext, RESIDENTIAL_PARAMETER_AXES
+from app.services.optimizer import ParetoContext, _pareto_objectives, _site_metrics, optimize_options
+from app.services.pareto import ParetoPool, crowding_distance, non_dominated_ranks, nsga2
+from app.services.sunlight import winter_solstice_samples
+
+SITE = {
+    "type": "Polygon",
+    "coordinates": [
+        [
+            [126.9792, 37.5725],
+            [126.9804, 37.5724],
+            [126.9806, 37.5731],
+            [126.9799, 37.5736],
+            [126.9790, 37.5734],
+            [126.9792, 37.5725],
+        ]
+    ],
+}
+
+
+def _tradeoff(params: dict, context: float) -> tuple[np.ndarray, np.ndarray]:
+    # Two conflicting objectives on x in [0, 1]; rows with y above the context are infeasible.
+    x, y = params["x"], params["y"]
+    objectives = np.stack([x - y, 1.0 - x**2 - y], axis=1)
+    return objectives, (y > context).astype(np.float64)
+
+
+class RankingTest(unittest.TestCase):
+    def test_ranks_respect_dominance_and_feasibility(self) -> None:
+        objectives = np.array([[3.0, 1.0], [1.0, 3.0], [2.0, 2.0], [1.0, 1.0], [9.0, 9.0]])
+        violation = np.array([0.0, 0.0, 0.0, 0.0, 1.0])
+        self.assertEqual(non_dominated_ranks(objectives, violation).tolist(), [0, 0, 0, 1, 2])
+
+    def test_crowding_keeps_front_extremes(self) -> None:
+        objectives = np.array([[0.0, 4.0], [1.0, 3.0], [3.0, 1.0], [4.0, 0.0]])
+        distance = crowding_distance(objectives, np.zeros(4, dtype=np.int64))
+        self.assertTrue(np.isinf(distance[[0, 3]]).all())
+        self.assertAlmostEqual(distance[1], 1.5)
+        self.assertAlmostEqual(distance[2], 1.5)
+
+
+class Nsga2Test(unittest.TestCase):
+    def test_front_is_feasible_nondominated_and_seeded(self) -> None:
+        bounds = {"x": (0.0, 1.0), "y": (0.0, 1.0)}
+        result = nsga2(_tradeoff, bounds, 0.5, population=24, generations=15, seed=3, pool=ParetoPool(1))
+        front = result.front(limit=8)
+        self.assertGreater(len(front), 1)
+        self.assertLessEqual(len(front), 8)
+        self.assertTrue((result.violation[front] == 0.0).all())
+        # The true front is y = 0; the search should have pushed every member close to it.
+        self.assertLess(float(result.params["y"][front].max()), 0.05)
+
+        again = nsga2(_tradeoff, bounds, 0.5, population=24, generations=15, seed=3, pool=ParetoPool(1))
+        np.testing.assert_array_equal(again.objectives, result.objectives)
+
+    def test_screen_limits_exact_evaluations_to_survivors(self) -> None:
+        evaluated: list[int] = []
+
+        def counted(params: dict, context: float) -> tuple[np.ndarray, np.ndarray]:
+            evaluated.append(len(params["x"]))
+            return _tradeoff(params, context)
+
+        def screen(params: dict, context: float) -> tuple[np.ndarray, np.ndarray]:
+            # Knows the first objective only; the second comes from the nearest exact row.
+            objectives, violation = _tradeoff(params, context)
+            objectives[:, 1] = np.nan
+            return objectives, violation
+
+        bounds = {"x": (0.0, 1.0), "y": (0.0, 1.0)}
+        result = nsga2(counted, bounds, 0.5, population=24, generations=15, seed=3, pool=ParetoPool(1), screen=screen)
+        self.assertEqual(sum(evaluated), result.evaluations)
+        self.assertEqual(result.screened, 24 * 15)
+        self.assertLess(result.evaluations, 24 * 16)
+        # The final population holds exact scores only.
+        exact, violation = _tradeoff(result.params, 0.5)
+        np.testing.assert_allclose(result.objectives, exact)
+        np.testing.assert_array_equal(result.violation, violation)
+        self.assertLess(float(result.params["y"][result.front(limit=8)].max()), 0.05)
+
+
+class ParetoSearchTest(unittest.TestCase):
+    def _context(self) -> ParetoContext:
+        site_metrics = _site_metrics(SITE)
+        return ParetoContext(
+            far_upper=250.0,
+            height_upper=60.0,
+            coverage_upper=60.0,
+            open_space_min=22.0,
+            sky_exposure_max=0.9,
+            min_spacing=24.0,
+            site_metrics=site_metrics,
+            country_code="KR",
+            occupancy_type="residential",
+            aesthetic=AestheticContext(False, False, 0, 0, 1.0),
+            rule_definitions=[],
+            user_far_min=None,
+            user_qualitative_min=None,
+            solstice=winter_solstice_samples(site_metrics["lat"], site_metrics["lng"], 2026),
+        )
+
+    def test_process_pool_matches_inline_evaluation(self) -> None:
+        rng = np.random.default_rng(0)
+        params = {name: rng.uniform(low, high, 6) for name, (low, high, _) in RESIDENTIAL_PARAMETER_AXES.items()}
+        inline = _pareto_objectives(params, self._context())
+        pool = ParetoPool(2)
+        try:
+            pooled = pool.evaluate(_pareto_objectives, params, self._context())
+        finally:
+            pool.shutdown()
+        np.testing.assert_array_equal(pooled[0], inline[0])
+        np.testing.assert_array_equal(pooled[1], inline[1])
+
+    def test_pareto_mode_returns_front(self) -> None:
+        with mock.patch("app.services.optimizer.pareto_pool", ParetoPool(1)):
+            options, _ = optimize_options(
+                rule_definitions=[],
+                requirements=[],
+                objective="balanced",
+                site_geojson=SITE,
+                country_code="KR",
+                occupancy_type="residential",
+                aesthetic_inputs=[],
+                search_mode="pareto",
+                evaluation_date=date(2026, 5, 1),
+            )
+        self.assertGreater(len(options), 3)
+        self.assertEqual(len(options), options[0]["parameters"]["search_stats"]["pareto_front_size"])
+        self.assertTrue(all(option["parameters"]["feasible"] for option in options))
+        outcomes = [
+            (p["far"], p["qualitative_scores"]["total"], p["open_space_percent"], p["min_continuous_sun_hours"])
+            for p in (option["parameters"] for option in options)
+        ]
+        for idx, outcome in enumerate(outcomes):
+            dominated = any(
+                all(a >= b for a, b in zip(other, outcome)) and other != outcome for other in outcomes[:idx] + outcomes[idx + 1 :]
+            )
+            self.assertFalse(dominated)
+
+
+if __name__ == "__main__":
+    unittest.main()
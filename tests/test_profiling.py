@@ -0,0 +1,62 @@
+import threading
+import tracemalloc
+import unittest
+
+from app.services.profiling import StageMemory
+
+# Unrelated allocations and frees land in the same stages; compare with some slack.
+SLACK = 100_000
+
+
+class StageMemoryTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        tracemalloc.stop()
+
+    def test_stages_record_peak_and_retained_bytes(self) -> None:
+        memory = StageMemory()
+        memory.start()
+        kept = bytearray(2_000_000)
+        memory.finish("allocate")
+
+        memory.start()
+        scratch = bytearray(4_000_000)
+        del scratch
+        memory.finish("scratch")
+
+        allocate, scratch = memory.stages["allocate"], memory.stages["scratch"]
+        self.assertGreater(allocate["retained_bytes"], 2_000_000 - SLACK)
+        self.assertGreater(scratch["peak_bytes"], 4_000_000 - SLACK)
+        self.assertLess(scratch["retained_bytes"], SLACK)
+        self.assertGreater(memory.summary()["total"]["peak_bytes"], 6_000_000 - SLACK)
+        del kept
+
+    def test_nested_tracker_keeps_outer_peak(self) -> None:
+        outer = StageMemory()
+        outer.start()
+        inner = StageMemory()
+        inner.start()
+        scratch = bytearray(3_000_000)
+        del scratch
+        inner.finish("inner")
+        outer.finish("outer")
+        self.assertGreater(outer.stages["outer"]["peak_bytes"], 3_000_000 - SLACK)
+        self.assertGreater(inner.stages["inner"]["peak_bytes"], 3_000_000 - SLACK)
+
+    def test_tracker_on_another_thread_marks_both_concurrent(self) -> None:
+        outer = StageMemory()
+        nested = StageMemory()
+        nested.summary()
+        self.assertFalse(outer.concurrent)
+
+        other = threading.Thread(target=lambda: StageMemory().start())
+        other.start()
+        other.join()
+        outer.finish("overlap")
+        self.assertTrue(outer.concurrent)
+
+    def test_disabled_tracker_does_not_trace(self) -> None:
+        memory = StageMemory(enabled=False)
+        memory.start()
+        memory.finish("noop")
+        self.assertEqual(memory.summary(), {})
+        self.assertFalse(tracemalloc.is_tracing())
@@ -1,6 +1,9 @@
 import unittest
+from types import SimpleNamespace
 
-from app.services.rule_dsl import evaluate_expression
+import numpy as np
+
+from app.services.rule_dsl import compile_expression, compile_rules, evaluate_expression, hard_rules_mask
 
 
 class RuleDslTest(unittest.TestCase):
@@ -14,6 +17,25 @@ class RuleDslTest(unittest.TestCase):
         self.assertFalse(passed)
         self.assertIn("<= height=50.00 <=", detail)
 
+    def test_compiled_rule_matches_batch_evaluation(self) -> None:
+        rule = compile_expression({"op": "between", "field": "coverage", "min": 30, "max": 60})
+        values = np.array([20.0, 30.0, 45.0, 61.0])
+        expected = [rule.test({"coverage": value}) for value in values]
+        self.assertEqual(rule.test_columns({"coverage": values}, len(values)).tolist(), expected)
+
+    def test_missing_field_fails_without_raising(self) -> None:
+        rule = compile_expression({"op": "lte", "field": "far", "value": 500})
+        self.assertEqual(rule.evaluate({}), (False, "state has no field 'far'"))
+        self.assertFalse(rule.test_columns({}, 3).any())
+
+    def test_compile_rules_caches_by_definition_id(self) -> None:
+        definition = SimpleNamespace(id="rule-def-cache-test", rule_key="max_far", rule_type="hard", expression={"op": "lte", "field": "far", "value": 500})
+        first = compile_rules([definition])[0]
+        self.assertIs(compile_rules([definition])[0], first)
+        soft = SimpleNamespace(rule_key="min_open", rule_type="soft", expression={"op": "gte", "field": "open_space", "value": 90})
+        mask = hard_rules_mask(compile_rules([definition, soft]), {"far": np.array([480.0, 520.0]), "open_space": np.array([10.0, 10.0])}, 2)
+        self.assertEqual(mask.tolist(), [True, False])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import unittest
+
+from app.services.run_events import RunEventBus, run_event_stream, run_events
+
+
+async def collect(stream) -> list:
+    return [item async for item in stream]
+
+
+class RunEventBusTest(unittest.TestCase):
+    def test_late_subscriber_replays_from_last_event_id(self) -> None:
+        bus = RunEventBus(retention_s=60.0)
+        bus.publish("run", "status", {"status": "queued"})
+        bus.publish("run", "stage", {"stage": "resolve_rules", "ms": 1.0})
+        bus.publish("run", "status", {"status": "completed"})
+        bus.close("run")
+        bus.publish("run", "stage", {"stage": "ignored", "ms": 0.0})
+
+        self.assertEqual([event.seq for event in asyncio.run(collect(bus.subscribe("run")))], [1, 2, 3])
+        self.assertEqual([event.data for event in asyncio.run(collect(bus.subscribe("run", after=2)))], [{"status": "completed"}])
+
+    def test_subscriber_waits_for_events_and_gets_keepalives(self) -> None:
+        bus = RunEventBus(retention_s=60.0)
+        bus.publish("run", "status", {"status": "running"})
+
+        async def consume() -> list:
+            stream = bus.subscribe("run", timeout=0.01)
+            self.assertEqual((await anext(stream)).event, "status")
+            self.assertIsNone(await anext(stream))
+            publisher.start()
+            return [event.event async for event in stream if event is not None]
+
+        publisher = threading.Timer(0.05, lambda: (bus.publish("run", "option", {"score": 1.0}), bus.close("run")))
+        remaining = asyncio.run(consume())
+        publisher.join()
+        self.assertEqual(remaining, ["option"])
+
+    def test_idle_subscribers_do_not_hold_threads(self) -> None:
+        bus = RunEventBus(retention_s=60.0)
+        bus.publish("run", "status", {"status": "running"})
+        threads = threading.active_count()
+
+        async def consume_all() -> list:
+            streams = [asyncio.create_task(collect(bus.subscribe("run"))) for _ in range(100)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(threading.active_count(), threads)
+            await asyncio.to_thread(bus.close, "run")
+            return await asyncio.gather(*streams)
+
+        results = asyncio.run(consume_all())
+        self.assertTrue(all([event.seq for event in events] == [1] for events in results))
+
+    def test_closed_channels_expire(self) -> None:
+        bus = RunEventBus(retention_s=0.0)
+        bus.publish("old", "status", {"status": "completed"})
+        bus.close("old")
+        bus.publish("new", "status", {"status": "queued"})
+        self.assertFalse(bus.has_channel("old"))
+        self.assertTrue(bus.has_channel("new"))
+
+    def test_untracked_run_streams_stored_status(self) -> None:
+        run_events.clear()
+        lines = asyncio.run(collect(run_event_stream("missing", status="completed")))
+        self.assertEqual(lines, ['id: 1\nevent: status\ndata: {"status":"completed"}\n\n'])
+
+
+if __name__ == "__main__":
+    unittest.main()
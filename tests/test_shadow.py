@@ -0,0 +1,114 @@
+import unittest
+from datetime import date
+
+import numpy as np
+
+from app.services.geometry import PreparedPolygon
+from app.services.shadow import cast_shadows, mesh_boxes, shadow_grid, shadow_masks
+from app.services.solar import sample_hours, solar_columns
+
+SITE = PreparedPolygon([(-40.0, -40.0), (40.0, -40.0), (40.0, 40.0), (-40.0, 40.0)])
+MESH = {
+    "type": "multi_block",
+    "blocks": [
+        {"x": -10.0, "z": 0.0, "width": 10.0, "depth": 8.0, "height": 30.0},
+        {"x": 15.0, "z": -10.0, "width": 8.0, "depth": 12.0, "height": 45.0},
+    ],
+}
+
+
+def _segment_hits_boxes(xs: np.ndarray, zs: np.ndarray, boxes: np.ndarray, altitude: float, azimuth: float) -> np.ndarray:
+    # Slab test of the ground ray toward the sun against each footprint, up to the
+    # distance at which the ray clears the box top.
+    toward_x, toward_z = np.sin(np.radians(azimuth)), np.cos(np.radians(azimuth))
+    shaded = np.zeros(xs.shape, dtype=bool)
+    for x, z, width, depth, _, top in boxes:
+        near = np.zeros(xs.shape)
+        far = np.full(xs.shape, top / np.tan(np.radians(altitude)))
+        for position, direction, centre, half in ((xs, toward_x, x, width / 2.0), (zs, toward_z, z, depth / 2.0)):
+            if abs(direction) < 1e-12:
+                far = np.where(np.abs(position - centre) <= half, far, -1.0)
+                continue
+            t1 = (centre - half - position) / direction
+            t2 = (centre + half - position) / direction
+            near = np.maximum(near, np.minimum(t1, t2))
+            far = np.minimum(far, np.maximum(t1, t2))
+        shaded |= (near <= far) & (far > 0.0)
+    return shaded
+
+
+class MeshBoxesTest(unittest.TestCase):
+    def test_courtyard_wings_leave_the_court_open(self) -> None:
+        boxes = mesh_boxes({"type": "courtyard", "outer_width": 40.0, "outer_depth": 30.0, "inner_width": 16.0, "inner_depth": 12.0, "height": 20.0})
+        self.assertEqual(boxes.shape, (4, 6))
+        self.assertAlmostEqual(float((boxes[:, 2] * boxes[:, 3]).sum()), 40.0 * 30.0 - 16.0 * 12.0)
+        grid = shadow_grid(boxes, SITE, max_cells_per_side=80)
+        centre = (np.array(grid.shape) // 2).tolist()
+        self.assertEqual(grid.heights[centre[0], centre[1]], 0.0)
+        self.assertTrue(grid.open_site[centre[0], centre[1]])
+
+    def test_instances_expand_like_legacy_blocks(self) -> None:
+        instanced = {
+            "type": "multi_block",
+            "prototype": {"width": 10.0, "depth": 8.0, "height": 30.0},
+            "instances": [[-10.0, 0.0, 1.0], [6.0, 0.0, 0.94]],
+        }
+        legacy = {
+            "type": "multi_block",
+            "blocks": [
+                {"x": -10.0, "z": 0.0, "width": 10.0, "depth": 8.0, "height": 30.0},
+                {"x": 6.0, "z": 0.0, "width": 10.0, "depth": 8.0, "height": 28.2},
+            ],
+        }
+        np.testing.assert_allclose(mesh_boxes(instanced), mesh_boxes(legacy))
+
+
+class ShadowMaskTest(unittest.TestCase):
+    def test_masks_match_analytic_ray_test(self) -> None:
+        boxes = mesh_boxes(MESH)
+        grid = shadow_grid(boxes, SITE, max_cells_per_side=80)
+        nz, nx = grid.shape
+        xs, zs = np.meshgrid(grid.origin_x + (np.arange(nx) + 0.5) * grid.cell_size, grid.origin_z + (np.arange(nz) + 0.5) * grid.cell_size)
+        rng = np.random.default_rng(11)
+        altitudes = rng.uniform(8.0, 80.0, 12)
+        azimuths = rng.uniform(0.0, 360.0, 12)
+        masks = shadow_masks(grid, altitudes, azimuths)
+        ground = grid.heights <= 0.0
+        for idx in range(len(altitudes)):
+            expected = _segment_hits_boxes(xs, zs, boxes, altitudes[idx], azimuths[idx])
+            self.assertGreater(((masks[idx] == expected) | ~ground).mean(), 0.98)
+
+    def test_southern_sun_casts_north(self) -> None:
+        grid = shadow_grid(mesh_boxes(MESH), SITE, max_cells_per_side=80)
+        mask = shadow_masks(grid, np.array([45.0, -5.0]), np.array([180.0, 180.0]))
+        row = lambda z: int((z - grid.origin_z) / grid.cell_size)
+        col = int((-10.0 - grid.origin_x) / grid.cell_size)
+        self.assertTrue(mask[0, row(20.0), col])
+        self.assertFalse(mask[0, row(-20.0), col])
+        self.assertTrue(mask[1].all())
+
+
+class CastShadowsTest(unittest.TestCase):
+    def test_option_ratios_and_sunlit_hours(self) -> None:
+        solar = solar_columns(37.57, 126.98, [date(2026, 12, 21), date(2026, 6, 21)], [6, 9, 12, 15])
+        weights = sample_hours([6, 9, 12, 15], 2)
+        result = cast_shadows(MESH, SITE, solar, sample_hours=weights)
+        self.assertEqual(result.shaded_ratio.shape, (8,))
+        self.assertTrue((result.shaded_ratio >= 0.0).all() and (result.shaded_ratio <= 1.0).all())
+        # Noon in winter throws longer shadows than noon in summer.
+        self.assertGreater(result.shaded_ratio[2], result.shaded_ratio[6])
+        # Each 3-hourly sample stands for three hours of sun on both dates.
+        self.assertLessEqual(result.sunlit_hours.max(), 24.0)
+        open_cell = np.argwhere(result.grid.open_site)[0]
+        self.assertAlmostEqual(float(result.sunlit_hours[tuple(open_cell)] % 3.0), 0.0)
+
+        summary = result.summary()
+        self.assertEqual(len(summary["sunlit_hours"]), summary["shape"][0])
+        covered_row, covered_col = np.argwhere(result.grid.heights > 0.0)[0]
+        self.assertIsNone(summary["sunlit_hours"][covered_row][covered_col])
+        empty = cast_shadows({"type": "multi_block", "blocks": []}, SITE, solar, sample_hours=weights)
+        self.assertTrue((empty.shaded_ratio[solar.sun_altitude > 0.0] == 0.0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from app.services.optimizer import compute_solar_profile
+from app.services.solar import annual_dates, sample_hours, seasonal_dates, solar_columns, solar_sample_dates, unpack_solar_columns
+
+
+class SolarColumnsTest(unittest.TestCase):
+    def test_rows_match_profile_for_single_date(self) -> None:
+        rows = solar_columns(37.57, 126.98, [date(2026, 3, 1)], [9, 12, 15]).rows()
+        self.assertEqual(rows, compute_solar_profile(37.57, 126.98, date(2026, 3, 1), [9, 12, 15]))
+        self.assertEqual(rows[1]["timestamp_utc"], datetime(2026, 3, 1, 12, tzinfo=timezone.utc))
+
+    def test_annual_year_is_date_major(self) -> None:
+        columns = solar_columns(37.57, 126.98, annual_dates(2026), range(24))
+        self.assertEqual(len(columns), 8760)
+        self.assertEqual(len(solar_columns(37.57, 126.98, annual_dates(2024), range(24))), 8784)
+        self.assertEqual(columns.timestamps[25], np.datetime64("2026-01-02T01:00:00"))
+
+        june = solar_columns(37.57, 126.98, [date(2026, 6, 21)], [12])
+        self.assertAlmostEqual(columns.sun_altitude[171 * 24 + 12], june.sun_altitude[0])
+        summary = columns.summary()
+        self.assertEqual(summary["sample_count"], 8760)
+        self.assertGreater(summary["sunlit_samples"], 0)
+
+    def test_fractional_hours_and_modes(self) -> None:
+        columns = solar_columns(37.57, 126.98, seasonal_dates(2026), [9.5, 12.25])
+        self.assertEqual(len(columns), 8)
+        self.assertEqual(columns.timestamps[1], np.datetime64("2026-03-20T12:15:00"))
+        self.assertEqual(len(solar_sample_dates("dates", date(2026, 1, 1), [date(2026, 5, 1), date(2026, 2, 1)])), 2)
+        with self.assertRaises(ValueError):
+            solar_sample_dates("hourly", date(2026, 1, 1))
+        with self.assertRaises(ValueError):
+            solar_columns(37.57, 126.98, [date(2026, 1, 1)], [24])
+
+    def test_sample_hours_split_gaps_between_neighbours(self) -> None:
+        np.testing.assert_allclose(sample_hours([9, 12, 15], 1), [3.0, 3.0, 3.0])
+        np.testing.assert_allclose(sample_hours([12, 8, 9], 2), [3.0, 1.0, 2.0, 3.0, 1.0, 2.0])
+        np.testing.assert_allclose(sample_hours(range(24), 365).sum(), 24 * 365)
+        np.testing.assert_allclose(sample_hours([12], 4), [1.0] * 4)
+
+    def test_packed_series_round_trips_rounded_rows(self) -> None:
+        columns = solar_columns(37.57, 126.98, seasonal_dates(2026), [8.5, 12, 16.25])
+        shadow = np.linspace(0.0, 1.0, len(columns))
+        packed = columns.rounded(shadow).pack()
+        self.assertEqual(len(packed), 8 + len(columns) * 5 * 8)
+        restored = unpack_solar_columns(packed)
+        self.assertEqual(restored.rows(), columns.rows(shadow_ratio=shadow))
+        with self.assertRaises(ValueError):
+            unpack_solar_columns(b"XXXX" + packed[4:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services.optimizer import optimize_options
+from app.services.shadow import mesh_boxes
+from app.services.sunlight import continuous_sun_hours, min_continuous_sun_hours, north_boundary_points, winter_solstice_samples
+
+RING = [(-40.0, -40.0), (40.0, -40.0), (40.0, 40.0), (-40.0, 40.0), (-40.0, -40.0)]
+
+
+def _block(z: float, height: float) -> np.ndarray:
+    return mesh_boxes({"type": "multi_block", "blocks": [{"x": 0.0, "z": z, "width": 20.0, "depth": 10.0, "height": height}]})
+
+
+class NorthBoundaryPointsTest(unittest.TestCase):
+    def test_samples_north_edge_for_either_winding(self) -> None:
+        for ring in (RING, RING[::-1]):
+            xs, zs = north_boundary_points(ring, spacing_m=4.0, offsets_m=(0.0, 5.0))
+            self.assertEqual(len(xs), 40)
+            self.assertEqual(sorted(set(zs.tolist())), [40.0, 45.0])
+            self.assertTrue((np.abs(xs) < 40.0).all())
+
+
+class ContinuousSunHoursTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.solstice = winter_solstice_samples(37.57, 126.98, 2026)
+
+    def test_open_site_is_sunlit_for_whole_window(self) -> None:
+        self.assertEqual(len(self.solstice), 73)
+        self.assertAlmostEqual(min_continuous_sun_hours(np.zeros((0, 6)), RING, self.solstice), 6.0)
+
+    def test_taller_and_closer_massing_shortens_sunlight(self) -> None:
+        far_low = min_continuous_sun_hours(_block(-30.0, 10.0), RING, self.solstice)
+        near_mid = min_continuous_sun_hours(_block(20.0, 30.0), RING, self.solstice)
+        near_tall = min_continuous_sun_hours(_block(30.0, 60.0), RING, self.solstice)
+        self.assertAlmostEqual(far_low, 6.0)
+        self.assertLess(near_mid, far_low)
+        self.assertEqual(near_tall, 0.0)
+
+    def test_longest_run_spans_a_midday_gap(self) -> None:
+        # A thin mast due south of the point blocks only the samples around noon.
+        boxes = np.array([[0.0, -20.0, 0.5, 0.5, 0.0, 200.0]])
+        solstice = self.solstice
+        hours = continuous_sun_hours(boxes, np.array([0.0]), np.array([0.0]), solstice.sun_altitude, solstice.sun_azimuth, step_hours=5 / 60)
+        self.assertGreater(hours[0], 2.5)
+        self.assertLess(hours[0], 3.0)
+
+    def test_culled_boxes_do_not_change_the_result(self) -> None:
+        # The southern block's shadow never reaches the north boundary and is culled.
+        boxes = np.vstack([_block(-35.0, 3.0), _block(20.0, 30.0)])
+        self.assertEqual(min_continuous_sun_hours(boxes, RING, self.solstice), min_continuous_sun_hours(_block(20.0, 30.0), RING, self.solstice))
+        self.assertIs(winter_solstice_samples(37.57, 126.98, 2026), self.solstice)
+
+
+SITE = {"type": "Polygon", "coordinates": [[[126.9792, 37.5725], [126.9804, 37.5724], [126.9806, 37.5731], [126.9799, 37.5736], [126.9790, 37.5734], [126.9792, 37.5725]]]}
+
+
+class OptimizerSunlightRuleTest(unittest.TestCase):
+    def test_sunlight_is_skipped_without_a_rule_on_it(self) -> None:
+        for occupancy_type in ("residential", "office"):
+            options, timings = optimize_options(
+                rule_definitions=[],
+                requirements=[],
+                objective="maximize_far",
+                site_geojson=SITE,
+                country_code="KR",
+                occupancy_type=occupancy_type,
+                aesthetic_inputs=[],
+                evaluation_date=date(2026, 3, 1),
+            )
+            self.assertEqual(timings["continuous_sunlight_ms"], 0.0)
+            self.assertTrue(all(option["parameters"]["min_continuous_sun_hours"] is None for option in options))
+
+    def test_rule_dsl_constrains_continuous_sun_hours(self) -> None:
+        rule = SimpleNamespace(id=None, rule_key="min_sunlight", rule_type="hard", expression={"op": "gte", "field": "min_continuous_sun_hours", "value": 99})
+        for search_mode in ("preset", "grid"):
+            options, timings = optimize_options(
+                rule_definitions=[rule],
+                requirements=[],
+                objective="maximize_far",
+                site_geojson=SITE,
+                country_code="KR",
+                occupancy_type="residential",
+                aesthetic_inputs=[],
+                search_mode=search_mode,
+                evaluation_date=date(2026, 3, 1),
+            )
+            self.assertIn("continuous_sunlight_ms", timings)
+            self.assertTrue(options)
+            for option in options:
+                self.assertFalse(option["parameters"]["feasible"])
+                self.assertLessEqual(option["parameters"]["min_continuous_sun_hours"], 6.0)
+                self.assertEqual(option["checks"][0]["rule_key"], "min_sunlight")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,18 @@
-export type { RunRead, RunOption, SolarPoint, MeshPayload, ConstraintCheck, ProjectRead, UserRead } from '@/entities/run/model/types'
+export type {
+  RunRead,
+  RunOption,
+  SolarPoint,
+  MeshPayload,
+  ConstraintCheck,
+  StageMemory,
+  ProjectRead,
+  UserRead,
+  RunStatusEvent,
+  RunStageEvent,
+  RunOptionEvent
+} from '@/entities/run/model/types'
+export type { MeshLod, PackedMesh } from '@/entities/run/lib/mesh-codec'
+export { decodeMesh, decodeMeshes } from '@/entities/run/lib/mesh-codec'
 export { BuildingViewer } from '@/entities/run/ui/building-viewer'
 export { OptionCards } from '@/entities/run/ui/option-cards'
 export { SolarList } from '@/entities/run/ui/solar-list'
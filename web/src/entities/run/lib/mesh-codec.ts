@@ -0,0 +1,50 @@
+// Mirrors app/services/mesh_codec.py: a 16-byte little-endian header, then float32
+// box rows (x, z, width, depth, base_y, top_y) and float32 outline (x, z) pairs.
+const MESH_MAGIC = 'BLDM'
+const MESH_VERSION = 1
+const MESH_HEADER_BYTES = 16
+const MESH_TYPES = ['multi_block', 'stacked', 'courtyard'] as const
+
+export type MeshLod = 'fine' | 'coarse'
+
+export type PackedMesh = {
+  type: (typeof MESH_TYPES)[number]
+  boxCount: number
+  boxes: Float32Array
+  outline: Float32Array
+}
+
+function decodeMeshAt(buffer: ArrayBuffer, offset: number): [PackedMesh, number] {
+  const view = new DataView(buffer, offset)
+  const magic = String.fromCharCode(...new Uint8Array(buffer, offset, 4))
+  if (magic !== MESH_MAGIC || view.getUint16(4, true) !== MESH_VERSION) {
+    throw new Error('Unrecognized mesh encoding')
+  }
+  const boxCount = view.getUint32(8, true)
+  const outlineCount = view.getUint32(12, true)
+  const boxesOffset = offset + MESH_HEADER_BYTES
+  const outlineOffset = boxesOffset + boxCount * 24
+  const mesh: PackedMesh = {
+    type: MESH_TYPES[view.getUint16(6, true)],
+    boxCount,
+    boxes: new Float32Array(buffer, boxesOffset, boxCount * 6),
+    outline: new Float32Array(buffer, outlineOffset, outlineCount * 2)
+  }
+  return [mesh, outlineOffset + outlineCount * 8]
+}
+
+export function decodeMesh(buffer: ArrayBuffer): PackedMesh {
+  return decodeMeshAt(buffer, 0)[0]
+}
+
+// A run's meshes arrive back to back, in option rank order.
+export function decodeMeshes(buffer: ArrayBuffer): PackedMesh[] {
+  const meshes: PackedMesh[] = []
+  let offset = 0
+  while (offset < buffer.byteLength) {
+    const [mesh, next] = decodeMeshAt(buffer, offset)
+    meshes.push(mesh)
+    offset = next
+  }
+  return meshes
+}
@@ -21,6 +21,11 @@ export type ProjectRead = {
   created_at: string
 }
 
+export type StageMemory = {
+  peak_bytes: number
+  retained_bytes: number
+}
+
 export type ConstraintCheck = {
   rule_key: string
   rule_type: string
@@ -57,7 +62,15 @@ export type MeshPayload =
     }
   | {
       type: 'multi_block'
-      blocks: {
+      prototype?: {
+        width: number
+        depth: number
+        height: number
+      }
+      // [x, z, height scale] per block.
+      instances?: [number, number, number][]
+      // Options stored before instancing list every block in full.
+      blocks?: {
         x: number
         z: number
         width: number
@@ -100,10 +113,14 @@ export type RunOption = {
     runtime_profile?: {
       pipeline_ms?: Record<string, number>
       optimizer_ms?: Record<string, number>
+      pipeline_memory?: Record<string, StageMemory>
+      optimizer_memory?: Record<string, StageMemory>
+      memory_concurrent?: boolean
     }
   }
   checks: ConstraintCheck[]
-  mesh_payload: MeshPayload
+  // Only present with ?include_mesh=true; the viewer reads the packed /mesh endpoints.
+  mesh_payload?: MeshPayload | null
 }
 
 export type SolarPoint = {
@@ -126,3 +143,16 @@ export type RunRead = {
   options: RunOption[]
   solar: Record<string, SolarPoint[]>
 }
+
+export type RunStatusEvent = {
+  status: string
+  error_message?: string
+  total_ms?: number
+}
+
+export type RunStageEvent = {
+  stage: string
+  ms: number
+}
+
+export type RunOptionEvent = Pick<RunOption, 'option_type' | 'score' | 'parameters'> & { mesh_payload: MeshPayload }
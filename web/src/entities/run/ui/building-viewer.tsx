@@ -1,13 +1,89 @@
 import { useEffect, useRef } from 'react'
 import * as THREE from 'three'
 import { OrbitControls } from 'three/examples/jsm/controls/OrbitControls.js'
+import { PackedMesh } from '@/entities/run/lib/mesh-codec'
 import { MeshPayload } from '@/entities/run/model/types'
 
 type BuildingViewerProps = {
   mesh?: MeshPayload
+  packed?: PackedMesh
+  // Coarse meshes of every option, laid side by side instead of the single option.
+  overview?: PackedMesh[]
+  highlightIndex?: number
 }
 
-export function BuildingViewer({ mesh }: BuildingViewerProps): JSX.Element {
+type MultiBlockMesh = Extract<MeshPayload, { type: 'multi_block' }>
+
+const OVERVIEW_GAP_M = 16
+
+function addSiteOutline(scene: THREE.Scene, outline: [number, number][]): void {
+  const shape = new THREE.Shape()
+  outline.forEach(([x, z], idx) => {
+    if (idx === 0) {
+      shape.moveTo(x, z)
+    } else {
+      shape.lineTo(x, z)
+    }
+  })
+  const siteGeom = new THREE.ShapeGeometry(shape)
+  siteGeom.rotateX(-Math.PI / 2)
+  const siteMesh = new THREE.Mesh(
+    siteGeom,
+    new THREE.MeshStandardMaterial({ color: '#cfd8df', transparent: true, opacity: 0.9 })
+  )
+  scene.add(siteMesh)
+
+  const linePoints = outline.map(([x, z]) => new THREE.Vector3(x, 0.05, z))
+  const lineGeom = new THREE.BufferGeometry().setFromPoints(linePoints)
+  const line = new THREE.LineLoop(
+    lineGeom,
+    new THREE.LineBasicMaterial({ color: '#0f172a' })
+  )
+  scene.add(line)
+}
+
+function addBoxes(scene: THREE.Scene, boxes: ArrayLike<number>, count: number, material: THREE.Material, offsetX = 0): void {
+  // Every box is an instance of one unit cube, scaled and placed from its
+  // (x, z, width, depth, base_y, top_y) row.
+  const instanced = new THREE.InstancedMesh(new THREE.BoxGeometry(1, 1, 1), material, count)
+  const matrix = new THREE.Matrix4()
+  for (let idx = 0; idx < count; idx += 1) {
+    const row = idx * 6
+    const baseY = boxes[row + 4]
+    const topY = boxes[row + 5]
+    matrix.makeScale(boxes[row + 2], topY - baseY, boxes[row + 3])
+    matrix.setPosition(boxes[row] + offsetX, (baseY + topY) / 2, boxes[row + 1])
+    instanced.setMatrixAt(idx, matrix)
+  }
+  instanced.instanceMatrix.needsUpdate = true
+  scene.add(instanced)
+}
+
+function multiBlockBoxes(mesh: MultiBlockMesh): number[] {
+  const rows: number[] = []
+  const { prototype } = mesh
+  if (prototype) {
+    for (const [x, z, scaleY] of mesh.instances ?? []) {
+      rows.push(x, z, prototype.width, prototype.depth, 0, prototype.height * scaleY)
+    }
+  }
+  for (const block of mesh.blocks ?? []) {
+    rows.push(block.x, block.z, block.width, block.depth, 0, block.height)
+  }
+  return rows
+}
+
+function xExtent(mesh: PackedMesh): [number, number] {
+  let min = 0
+  let max = 0
+  for (let row = 0; row < mesh.boxCount * 6; row += 6) {
+    min = Math.min(min, mesh.boxes[row] - mesh.boxes[row + 2] / 2)
+    max = Math.max(max, mesh.boxes[row] + mesh.boxes[row + 2] / 2)
+  }
+  return [min, max]
+}
+
+export function BuildingViewer({ mesh, packed, overview, highlightIndex }: BuildingViewerProps): JSX.Element {
   const rootRef = useRef<HTMLDivElement | null>(null)
 
   useEffect(() => {
@@ -48,7 +124,30 @@ export function BuildingViewer({ mesh }: BuildingViewerProps): JSX.Element {
     ground.rotation.x = -Math.PI / 2
     scene.add(ground)
 
-    if (mesh) {
+    if (overview && overview.length > 0) {
+      const extents = overview.map(xExtent)
+      const span = extents.reduce((total, [min, max]) => total + (max - min), 0) + OVERVIEW_GAP_M * (overview.length - 1)
+      const highlight = new THREE.MeshStandardMaterial({ color: '#0ea5e9' })
+      const muted = new THREE.MeshStandardMaterial({ color: '#94a3b8' })
+      let cursor = -span / 2
+      overview.forEach((item, idx) => {
+        const [min, max] = extents[idx]
+        addBoxes(scene, item.boxes, item.boxCount, idx === highlightIndex ? highlight : muted, cursor - min)
+        cursor += max - min + OVERVIEW_GAP_M
+      })
+      camera.position.set(0, Math.max(34, span * 0.45), Math.max(52, span * 0.75))
+      controls.maxDistance = Math.max(180, span * 1.6)
+      ground.scale.setScalar(Math.max(1, (span + 60) / 180))
+    } else if (packed) {
+      const outline: [number, number][] = []
+      for (let idx = 0; idx < packed.outline.length; idx += 2) {
+        outline.push([packed.outline[idx], packed.outline[idx + 1]])
+      }
+      if (outline.length > 2) {
+        addSiteOutline(scene, outline)
+      }
+      addBoxes(scene, packed.boxes, packed.boxCount, new THREE.MeshStandardMaterial({ color: '#0ea5e9' }))
+    } else if (mesh) {
       const material = new THREE.MeshStandardMaterial({ color: '#0ea5e9' })
       if (mesh.type === 'box') {
         const mass = new THREE.Mesh(
@@ -59,41 +158,11 @@ export function BuildingViewer({ mesh }: BuildingViewerProps): JSX.Element {
         scene.add(mass)
       } else if (mesh.type === 'multi_block') {
         if (mesh.site_outline && mesh.site_outline.length > 2) {
-          const shape = new THREE.Shape()
-          mesh.site_outline.forEach(([x, z], idx) => {
-            if (idx === 0) {
-              shape.moveTo(x, z)
-            } else {
-              shape.lineTo(x, z)
-            }
-          })
-          const siteGeom = new THREE.ShapeGeometry(shape)
-          siteGeom.rotateX(-Math.PI / 2)
-          const siteMesh = new THREE.Mesh(
-            siteGeom,
-            new THREE.MeshStandardMaterial({ color: '#cfd8df', transparent: true, opacity: 0.9 })
-          )
-          scene.add(siteMesh)
-
-          const linePoints = mesh.site_outline.map(([x, z]) => new THREE.Vector3(x, 0.05, z))
-          const lineGeom = new THREE.BufferGeometry().setFromPoints(linePoints)
-          const line = new THREE.LineLoop(
-            lineGeom,
-            new THREE.LineBasicMaterial({ color: '#0f172a' })
-          )
-          scene.add(line)
+          addSiteOutline(scene, mesh.site_outline)
         }
 
-        for (const block of mesh.blocks) {
-          const mass = new THREE.Mesh(
-            new THREE.BoxGeometry(block.width, block.height, block.depth),
-            material
-          )
-          mass.position.x = block.x
-          mass.position.z = block.z
-          mass.position.y = block.height / 2
-          scene.add(mass)
-        }
+        const rows = multiBlockBoxes(mesh)
+        addBoxes(scene, rows, rows.length / 6, material)
       } else if (mesh.type === 'stacked') {
         for (const segment of mesh.segments) {
           const mass = new THREE.Mesh(
@@ -160,7 +229,7 @@ export function BuildingViewer({ mesh }: BuildingViewerProps): JSX.Element {
         rootRef.current.removeChild(renderer.domElement)
       }
     }
-  }, [mesh])
+  }, [mesh, packed, overview, highlightIndex])
 
   return <div ref={rootRef} className="h-[460px] w-full rounded-2xl border border-slate-200 bg-slate-100" />
 }
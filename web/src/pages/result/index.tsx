@@ -1,10 +1,13 @@
 import { useEffect, useState } from 'react'
 import { useNavigate, useParams } from 'react-router-dom'
-import { RunRead } from '@/entities/run'
-import { getRun } from '@/shared/api/client'
+import { PackedMesh, RunOptionEvent, RunRead, RunStageEvent, RunStatusEvent } from '@/entities/run'
+import { getOptionMesh, getRun, getRunMeshes, runEventsUrl } from '@/shared/api/client'
 import { Surface } from '@/shared/ui'
 import { ResultLayout } from '@/widgets/result-layout'
 
+const POLL_INTERVAL_MS = 1000
+const PENDING_STATUSES = new Set(['queued', 'running'])
+
 export function ResultPage(): JSX.Element {
   const { runId } = useParams<{ runId: string }>()
   const navigate = useNavigate()
@@ -12,6 +15,11 @@ export function ResultPage(): JSX.Element {
   const [selectedOptionId, setSelectedOptionId] = useState<string | null>(null)
   const [error, setError] = useState('')
   const [loading, setLoading] = useState(true)
+  const [status, setStatus] = useState('')
+  const [stages, setStages] = useState<RunStageEvent[]>([])
+  const [streamedOptions, setStreamedOptions] = useState<RunOptionEvent[]>([])
+  const [packedMesh, setPackedMesh] = useState<PackedMesh | undefined>(undefined)
+  const [overviewMeshes, setOverviewMeshes] = useState<PackedMesh[]>([])
 
   useEffect(() => {
     if (!runId) {
@@ -20,41 +28,150 @@ export function ResultPage(): JSX.Element {
       return
     }
 
+    let cancelled = false
+    let timer: ReturnType<typeof setTimeout> | undefined
+
     const runFetch = async (): Promise<void> => {
-      setLoading(true)
       setError('')
       try {
         const data = await getRun(runId)
+        if (cancelled) {
+          return
+        }
         setRun(data)
-        setSelectedOptionId(data.options[0]?.id ?? null)
-      } catch (caught) {
-        setError(caught instanceof Error ? caught.message : '결과를 불러오지 못했습니다.')
-      } finally {
+        setSelectedOptionId((current) => current ?? data.options[0]?.id ?? null)
+        if (PENDING_STATUSES.has(data.status)) {
+          timer = setTimeout(runFetch, POLL_INTERVAL_MS)
+          return
+        }
         setLoading(false)
+      } catch (caught) {
+        if (!cancelled) {
+          setError(caught instanceof Error ? caught.message : '결과를 불러오지 못했습니다.')
+          setLoading(false)
+        }
       }
     }
 
-    runFetch()
+    setLoading(true)
+    setStages([])
+    setStreamedOptions([])
+
+    // Stage and option events arrive over SSE while the run executes; polling is the
+    // fallback when the stream is unavailable or drops.
+    let source: EventSource | undefined
+    if (typeof EventSource === 'undefined') {
+      runFetch()
+    } else {
+      source = new EventSource(runEventsUrl(runId))
+      source.addEventListener('status', (event) => {
+        const data = JSON.parse((event as MessageEvent<string>).data) as RunStatusEvent
+        setStatus(data.status)
+        if (!PENDING_STATUSES.has(data.status)) {
+          source?.close()
+          runFetch()
+        }
+      })
+      source.addEventListener('stage', (event) => {
+        const data = JSON.parse((event as MessageEvent<string>).data) as RunStageEvent
+        setStages((current) => [...current, data])
+      })
+      source.addEventListener('option', (event) => {
+        const data = JSON.parse((event as MessageEvent<string>).data) as RunOptionEvent
+        setStreamedOptions((current) => [...current, data])
+      })
+      source.onerror = () => {
+        source?.close()
+        if (!cancelled) {
+          runFetch()
+        }
+      }
+    }
+
+    return () => {
+      cancelled = true
+      source?.close()
+      if (timer) {
+        clearTimeout(timer)
+      }
+    }
   }, [runId])
 
+  const viewedOptionId = selectedOptionId ?? run?.options[0]?.id ?? null
+
+  useEffect(() => {
+    setPackedMesh(undefined)
+    if (!viewedOptionId) {
+      return
+    }
+    // The viewer falls back to the option's JSON mesh until (or unless) the packed one loads.
+    let cancelled = false
+    getOptionMesh(viewedOptionId)
+      .then((mesh) => {
+        if (!cancelled) {
+          setPackedMesh(mesh)
+        }
+      })
+      .catch(() => undefined)
+    return () => {
+      cancelled = true
+    }
+  }, [viewedOptionId])
+
+  const completedRunId = run?.status === 'completed' ? run.id : null
+
+  useEffect(() => {
+    setOverviewMeshes([])
+    if (!completedRunId) {
+      return
+    }
+    let cancelled = false
+    getRunMeshes(completedRunId)
+      .then((meshes) => {
+        if (!cancelled) {
+          setOverviewMeshes(meshes)
+        }
+      })
+      .catch(() => undefined)
+    return () => {
+      cancelled = true
+    }
+  }, [completedRunId])
+
   if (loading) {
     return (
       <div className="min-h-screen bg-slate-100 p-6">
         <div className="mx-auto max-w-[1400px]">
-          <Surface>
-            <p className="text-sm text-slate-600">결과를 불러오는 중입니다...</p>
+          <Surface className="space-y-3">
+            <p className="text-sm text-slate-600">
+              {PENDING_STATUSES.has(status || run?.status || '') ? `설계안을 계산 중입니다... (${status || run?.status})` : '결과를 불러오는 중입니다...'}
+            </p>
+            {stages.length > 0 ? (
+              <ul className="space-y-1 text-xs text-slate-500">
+                {stages.map((item) => (
+                  <li key={item.stage}>
+                    {item.stage} · {item.ms.toFixed(1)}ms
+                  </li>
+                ))}
+              </ul>
+            ) : null}
+            {streamedOptions.length > 0 ? (
+              <p className="text-sm font-semibold text-slate-800">
+                옵션 {streamedOptions.length}개 산출 · 최고 점수 {Math.max(...streamedOptions.map((item) => item.score)).toFixed(1)}
+              </p>
+            ) : null}
           </Surface>
         </div>
       </div>
     )
   }
 
-  if (error || !run) {
+  if (error || !run || run.status === 'failed') {
     return (
       <div className="min-h-screen bg-slate-100 p-6">
         <div className="mx-auto max-w-[1400px]">
           <Surface className="space-y-4">
-            <p className="text-sm text-rose-700">{error || '결과가 없습니다.'}</p>
+            <p className="text-sm text-rose-700">{error || run?.error_message || '결과가 없습니다.'}</p>
             <button
               type="button"
               onClick={() => navigate('/')}
@@ -68,5 +185,14 @@ export function ResultPage(): JSX.Element {
     )
   }
 
-  return <ResultLayout run={run} selectedOptionId={selectedOptionId} onSelectOption={setSelectedOptionId} onBack={() => navigate('/')} />
+  return (
+    <ResultLayout
+      run={run}
+      selectedOptionId={selectedOptionId}
+      packedMesh={packedMesh}
+      overviewMeshes={overviewMeshes}
+      onSelectOption={setSelectedOptionId}
+      onBack={() => navigate('/')}
+    />
+  )
 }
@@ -1,4 +1,4 @@
-import { ProjectRead, RunRead, UserRead } from '@/entities/run'
+import { decodeMesh, decodeMeshes, MeshLod, PackedMesh, ProjectRead, RunRead, UserRead } from '@/entities/run'
 
 const API_BASE = import.meta.env.VITE_API_BASE ?? 'http://127.0.0.1:8000/api'
 
@@ -46,3 +46,23 @@ export function runEvaluation(projectId: string, payload: Record<string, unknown
 export function getRun(runId: string): Promise<RunRead> {
   return request(`/runs/${runId}`)
 }
+
+export function runEventsUrl(runId: string): string {
+  return `${API_BASE}/runs/${runId}/events`
+}
+
+async function requestBinary(path: string): Promise<ArrayBuffer> {
+  const res = await fetch(`${API_BASE}${path}`)
+  if (!res.ok) {
+    throw new Error(`Request failed: ${res.status}`)
+  }
+  return res.arrayBuffer()
+}
+
+export async function getOptionMesh(optionId: string, lod: MeshLod = 'fine'): Promise<PackedMesh> {
+  return decodeMesh(await requestBinary(`/runs/options/${optionId}/mesh?lod=${lod}`))
+}
+
+export async function getRunMeshes(runId: string, lod: MeshLod = 'coarse'): Promise<PackedMesh[]> {
+  return decodeMeshes(await requestBinary(`/runs/${runId}/meshes?lod=${lod}`))
+}
@@ -1,15 +1,20 @@
+import { useState } from 'react'
 import { ArrowLeft, Sun, View } from 'lucide-react'
-import { BuildingViewer, OptionCards, RunRead, SolarList } from '@/entities/run'
+import { BuildingViewer, OptionCards, PackedMesh, RunRead, SolarList, StageMemory } from '@/entities/run'
 import { Button, StatusChip, Surface } from '@/shared/ui'
 
+const toMiB = (bytes: number): string => (bytes / (1024 * 1024)).toFixed(2)
+
 type ResultLayoutProps = {
   run: RunRead
   selectedOptionId: string | null
+  packedMesh?: PackedMesh
+  overviewMeshes?: PackedMesh[]
   onSelectOption: (id: string) => void
   onBack: () => void
 }
 
-export function ResultLayout({ run, selectedOptionId, onSelectOption, onBack }: ResultLayoutProps): JSX.Element {
+export function ResultLayout({ run, selectedOptionId, packedMesh, overviewMeshes = [], onSelectOption, onBack }: ResultLayoutProps): JSX.Element {
   const fallbackOptionId = run.options[0]?.id ?? null
   const effectiveOptionId = selectedOptionId ?? fallbackOptionId
   const selectedOption = run.options.find((option) => option.id === effectiveOptionId) ?? run.options[0]
@@ -23,6 +28,12 @@ export function ResultLayout({ run, selectedOptionId, onSelectOption, onBack }:
   }
   const legalBasisTags = selectedOption?.parameters.legal_basis_tags ?? []
   const runtimeProfile = selectedOption?.parameters.runtime_profile
+  const memoryProfiles: Array<[string, Record<string, StageMemory> | undefined]> = [
+    ['Pipeline memory (peak / retained MiB)', runtimeProfile?.pipeline_memory],
+    ['Optimizer memory (peak / retained MiB)', runtimeProfile?.optimizer_memory]
+  ]
+  const [showOverview, setShowOverview] = useState(false)
+  const canShowOverview = overviewMeshes.length === run.options.length && overviewMeshes.length > 1
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-slate-100 via-white to-amber-50 p-4 md:p-6">
@@ -51,11 +62,23 @@ export function ResultLayout({ run, selectedOptionId, onSelectOption, onBack }:
 
         <div className="grid gap-4 xl:grid-cols-2">
           <Surface className="space-y-3">
-            <div className="flex items-center gap-2 text-slate-900">
-              <View size={18} className="text-sky-600" />
-              <h3 className="text-lg font-semibold">3D 매스</h3>
+            <div className="flex items-center justify-between gap-2">
+              <div className="flex items-center gap-2 text-slate-900">
+                <View size={18} className="text-sky-600" />
+                <h3 className="text-lg font-semibold">3D 매스</h3>
+              </div>
+              {canShowOverview ? (
+                <Button variant="secondary" onClick={() => setShowOverview((current) => !current)}>
+                  {showOverview ? '선택안 보기' : '전체 대안 비교'}
+                </Button>
+              ) : null}
             </div>
-            <BuildingViewer mesh={selectedOption?.mesh_payload} />
+            <BuildingViewer
+              mesh={selectedOption?.mesh_payload ?? undefined}
+              packed={packedMesh}
+              overview={showOverview && canShowOverview ? overviewMeshes : undefined}
+              highlightIndex={selectedOption ? run.options.indexOf(selectedOption) : undefined}
+            />
           </Surface>
 
           <Surface className="space-y-3">
@@ -170,6 +193,23 @@ export function ResultLayout({ run, selectedOptionId, onSelectOption, onBack }:
                   ))}
                 </div>
               </div>
+              {memoryProfiles.map(([label, stages]) =>
+                stages ? (
+                  <div key={label} className="rounded-2xl bg-slate-50 p-4">
+                    <p className="mb-2 text-xs uppercase tracking-[0.08em] text-slate-500">{label}</p>
+                    <div className="space-y-1 text-sm text-slate-700">
+                      {Object.entries(stages).map(([key, value]) => (
+                        <p key={key}>
+                          {key}: {toMiB(value.peak_bytes)} / {toMiB(value.retained_bytes)}
+                        </p>
+                      ))}
+                    </div>
+                  </div>
+                ) : null
+              )}
+              {runtimeProfile?.memory_concurrent ? (
+                <p className="text-xs text-amber-700">다른 run과 동시에 측정되어 메모리 수치에 그 할당이 포함됨</p>
+              ) : null}
             </div>
           </Surface>
         ) : null}